@@ -0,0 +1,63 @@
+"""
+Benchmark for DataProcessor.process_membership_data.
+
+Compares the previous row-wise implementation (Python date objects plus
+two .apply(lambda ...) calls) against the vectorized datetime64 pipeline on
+synthetic membership data.
+
+Usage:
+    python benchmarks/bench_membership.py [rows ...]
+"""
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processor import DataProcessor
+from benchmarks.synthetic import make_membership_csv_frame
+
+
+def legacy_process_membership_data(csv_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The original row-wise implementation, kept here as the baseline.
+    """
+    df = csv_df.copy()
+    df.columns = [col.strip().lower() for col in df.columns]
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df["year"] = df["date"].apply(lambda d: d.year)
+    df["quarter"] = df["date"].apply(lambda d: f"Q{((d.month - 1) // 3) + 1}")
+    df["revenue"] = pd.to_numeric(df["revenue"], errors="coerce")
+    expected_cols = [
+        "date", "membership_id", "membership_type", "activity",
+        "revenue", "duration (minutes)", "location", "year", "quarter"
+    ]
+    return df[expected_cols]
+
+
+def timed(func, *args) -> tuple:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>8} {'legacy MB':>10} {'vectorized MB':>14}")
+    for rows in sizes:
+        raw = make_membership_csv_frame(rows)
+        legacy_time, legacy = timed(legacy_process_membership_data, raw)
+        processor = DataProcessor({"companies": []}, raw)
+        vector_time, vectorized = timed(processor.process_membership_data)
+
+        assert list(legacy["year"]) == list(vectorized["year"])
+        assert list(legacy["quarter"]) == list(vectorized["quarter"].astype(str))
+
+        legacy_mb = legacy.memory_usage(deep=True).sum() / 2 ** 20
+        vector_mb = vectorized.memory_usage(deep=True).sum() / 2 ** 20
+        print(f"{rows:>10} {legacy_time:>12.3f} {vector_time:>15.3f} {legacy_time / vector_time:>7.1f}x "
+              f"{legacy_mb:>10.1f} {vector_mb:>14.1f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [100_000, 1_000_000])
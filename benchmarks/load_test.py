@@ -0,0 +1,93 @@
+"""
+Concurrent load test for the data endpoints.
+
+Serves synthetic data (see benchmarks/synthetic.py) through the FastAPI app and
+fires requests from many concurrent clients on one event loop, the way a busy
+dashboard would. Reports throughput and latency percentiles per scenario:
+  - "hot": every client asks for the same few URLs (coalescing/caching applies);
+  - "spread": every request has a distinct page offset (each needs its own build).
+
+Usage:
+    python benchmarks/load_test.py [--rows 500000] [--concurrency 32] [--requests 400]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from benchmarks.synthetic import make_datasets
+from data_ingestion import DataIngestion
+from data_processor import DataProcessor
+
+HOT_URLS = [
+    "/api/data/company_info",
+    "/api/data/membership_activity?limit=100&sort=-revenue",
+    "/api/membership/query?membership_type=VIP&limit=50",
+    "/api/membership/aggregate?group_by=activity&membership_type=Basic",
+]
+
+
+def spread_urls(requests: int) -> list:
+    return [f"/api/data/membership_activity?limit=50&offset={i * 50}&sort=revenue" for i in range(requests)]
+
+
+async def run_scenario(app, urls: list, concurrency: int) -> dict:
+    latencies = []
+    queue = list(reversed(urls))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while queue:
+                url = queue.pop()
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, (url, response.status_code)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000, help="Membership CSV rows.")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=400, help="Requests per scenario.")
+    args = parser.parse_args(argv)
+
+    import main as app_module
+    from data_manager import DataSnapshot
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_datasets(directory, companies=100, employees_per_company=10, quarters=8,
+                              csv_rows=args.rows, pdf_pages=2, pptx_slides=3)
+        ingestion = DataIngestion(**paths, pdf_workers=1)
+        unified = DataProcessor(ingestion.load_json(), ingestion.load_csv(),
+                                ingestion.load_pdf(), ingestion.load_pptx()).merge_all_data()
+    app_module.data_manager.current = DataSnapshot(unified, report={})
+
+    scenarios = {
+        "hot": [HOT_URLS[i % len(HOT_URLS)] for i in range(args.requests)],
+        "spread": spread_urls(args.requests),
+    }
+    for name, urls in scenarios.items():
+        result = asyncio.run(run_scenario(app_module.app, urls, args.concurrency))
+        print(f"{name:<8} {result['requests']:>6} requests {result['requests_per_second']:>9.1f} req/s "
+              f"p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
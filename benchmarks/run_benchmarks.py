@@ -0,0 +1,200 @@
+"""
+Benchmark suite for the ingestion -> processing -> API pipeline.
+
+For each size tier, synthetic datasets are generated (see benchmarks/synthetic.py)
+and the suite records:
+  - wall time and peak traced memory of every ingestion and processing stage;
+  - latency percentiles and throughput of the FastAPI data endpoints, served
+    from the synthetic data through a local TestClient. The first (cold) request
+    is reported separately, and the response cache is cleared before every timed
+    request so repeated requests measure the endpoint's work, not a cache hit.
+
+Results are written as JSON so runs can be compared; pass --baseline with an
+earlier results file to print per-metric ratios against it.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes small medium] [--requests 50]
+                                        [--output bench_results.json] [--baseline old.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_datasets
+from data_ingestion import DataIngestion
+from data_processor import DataProcessor
+from data_serializer import SerializedDataCache
+
+# Dataset dimensions per size tier.
+SIZES = {
+    "small": {"companies": 10, "employees_per_company": 10, "quarters": 4,
+              "csv_rows": 10_000, "pdf_pages": 5, "pptx_slides": 5},
+    "medium": {"companies": 1_000, "employees_per_company": 20, "quarters": 8,
+               "csv_rows": 250_000, "pdf_pages": 50, "pptx_slides": 50},
+    "large": {"companies": 10_000, "employees_per_company": 20, "quarters": 8,
+              "csv_rows": 2_000_000, "pdf_pages": 200, "pptx_slides": 200},
+}
+
+# Endpoints exercised by the API benchmark.
+ENDPOINTS = [
+    "/api/data",
+    "/api/data/membership_activity?limit=100&offset=1000&sort=-revenue",
+    "/api/membership/query?membership_type=VIP&limit=100",
+    "/api/membership/aggregate?group_by=year,quarter,location",
+    "/api/membership/aggregate?group_by=activity&membership_type=Basic",
+]
+
+
+def measure(func, *args):
+    """
+    Runs func(*args) and returns (result, {"seconds", "peak_mb"}).
+
+    The call is timed on its own, then repeated under tracemalloc to find the
+    peak traced allocation (which includes NumPy/pandas buffers); tracing slows
+    Python-heavy code considerably, so it is kept out of the timed run.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {"seconds": round(seconds, 6), "peak_mb": round(peak / 2 ** 20, 3)}
+
+
+def bench_pipeline(paths: dict) -> tuple:
+    """Times every ingestion and processing stage; returns (unified dataset, stage metrics)."""
+    stages = {}
+    ingestion = DataIngestion(**paths, pdf_workers=1)
+    raw = {}
+    for source, loader in [("json", ingestion.load_json), ("csv", ingestion.load_csv),
+                           ("pdf", ingestion.load_pdf), ("pptx", ingestion.load_pptx)]:
+        raw[source], stages[f"load_{source}"] = measure(loader)
+
+    processor = DataProcessor(raw["json"], raw["csv"], raw["pdf"], raw["pptx"])
+    _, stages["process_json_data"] = measure(processor.process_json_data)
+    membership, stages["process_membership_data"] = measure(processor.process_membership_data)
+    stages["process_membership_data"]["rows"] = len(membership)
+    _, stages["process_aggregated_report"] = measure(processor.process_aggregated_report)
+    _, stages["process_pptx_data"] = measure(processor.process_pptx_data)
+    unified, stages["merge_all_data"] = measure(processor.merge_all_data)
+    cache, stages["serialize"] = measure(SerializedDataCache, unified)
+    stages["serialize"]["payload_mb"] = round(len(cache.payload) / 2 ** 20, 3)
+    return unified, stages
+
+
+def bench_api(unified: dict, requests: int) -> dict:
+    """
+    Serves the synthetic data through the FastAPI app and records latency
+    percentiles, throughput and response size per endpoint. cold_ms is the
+    first request to the endpoint; the percentiles cover the following
+    requests, each made after clearing the executor's result cache.
+    """
+    from fastapi.testclient import TestClient
+    import main
+    from data_manager import DataSnapshot
+
+    previous = main.data_manager.current
+    main.data_manager.current = DataSnapshot(unified, report={})
+    client = TestClient(main.app)
+    results = {}
+    try:
+        for endpoint in ENDPOINTS:
+            main.data_executor.clear()
+            t = time.perf_counter()
+            client.get(endpoint)
+            cold = time.perf_counter() - t
+
+            latencies = []
+            size = 0
+            for _ in range(max(1, requests - 1)):
+                main.data_executor.clear()
+                t = time.perf_counter()
+                response = client.get(endpoint)
+                latencies.append(time.perf_counter() - t)
+                size = len(response.content)
+            elapsed = sum(latencies)
+            latencies.sort()
+            results[endpoint] = {
+                "requests": len(latencies) + 1,
+                "cold_ms": round(cold * 1000, 3),
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+                "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 3),
+                "max_ms": round(latencies[-1] * 1000, 3),
+                "requests_per_second": round(len(latencies) / elapsed, 2),
+                "response_bytes": size,
+            }
+    finally:
+        main.data_manager.current = previous
+        main.data_executor.clear()
+    return results
+
+
+def compare(results: dict, baseline: dict):
+    """Prints current/baseline ratios for every timing present in both runs."""
+    for size, run in results["runs"].items():
+        base = baseline.get("runs", {}).get(size)
+        if not base:
+            continue
+        print(f"\n[{size}] ratio vs baseline (>1 is slower)")
+        for stage, metrics in run["stages"].items():
+            old = base["stages"].get(stage, {}).get("seconds")
+            if old:
+                print(f"  {stage:<28} {metrics['seconds'] / old:6.2f}x")
+        for endpoint, metrics in run["api"].items():
+            old = base.get("api", {}).get(endpoint, {})
+            for timing in ("cold_ms", "p50_ms"):
+                if old.get(timing):
+                    print(f"  {endpoint[:60]:<60} {timing[:-3]:<4} {metrics[timing] / old[timing]:6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint.")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against.")
+    args = parser.parse_args(argv)
+
+    results = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": {},
+    }
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"[{size}] generating data...")
+            paths = make_datasets(directory, **SIZES[size])
+            unified, stages = bench_pipeline(paths)
+            for stage, metrics in stages.items():
+                print(f"  {stage:<28} {metrics['seconds']:9.3f}s {metrics['peak_mb']:10.1f} MB peak")
+            api = bench_api(unified, args.requests)
+            for endpoint, metrics in api.items():
+                print(f"  {endpoint[:60]:<60} cold {metrics['cold_ms']:8.2f} ms "
+                      f"p50 {metrics['p50_ms']:8.2f} ms {metrics['requests_per_second']:8.1f} req/s")
+            results["runs"][size] = {"dimensions": SIZES[size], "stages": stages, "api": api}
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
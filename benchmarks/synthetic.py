@@ -0,0 +1,153 @@
+"""
+Synthetic dataset generators shaped like the files in datasets/, for
+benchmarking the pipeline at production scale.
+
+Each make_* function writes one file and returns its path:
+  - make_json: N companies, each with employees and quarterly performance.
+  - make_csv: N membership activity rows.
+  - make_pdf: a multi-page PDF whose pages each hold the aggregated report table.
+  - make_pptx: the three summary slides followed by extra table/text slides.
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+import pypdfium2
+from pptx import Presentation
+from pptx.util import Inches
+
+ROLES = ["Personal Trainer", "Group Fitness Instructor", "Front Desk", "Manager", "Nutritionist"]
+MEMBERSHIP_TYPES = ["Basic", "Premium", "VIP"]
+ACTIVITIES = ["Gym", "Pool", "Yoga Class", "Personal Training", "Tennis Court"]
+LOCATIONS = ["Downtown", "Eastside", "Westside", "Uptown"]
+
+# The sample report is used as the page template for synthetic PDFs.
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datasets", "dataset3.pdf")
+
+
+def make_membership_csv_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds a raw membership frame shaped like datasets/dataset2.csv after load_csv().
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365, rows), unit="D")
+    return pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d"),
+        "membership_id": np.char.add("M", rng.integers(1, 100000, rows).astype(str)),
+        "membership_type": rng.choice(MEMBERSHIP_TYPES, rows),
+        "activity": rng.choice(ACTIVITIES, rows),
+        "revenue": rng.uniform(10, 200, rows).round(2),
+        "duration (minutes)": rng.choice([30, 45, 60, 90, 120], rows),
+        "location": rng.choice(LOCATIONS, rows),
+    })
+
+
+def make_csv(path: str, rows: int, seed: int = 0) -> str:
+    """Writes a membership CSV with the same header as datasets/dataset2.csv."""
+    df = make_membership_csv_frame(rows, seed)
+    df.columns = ["Date", "Membership_ID", "Membership_Type", "Activity", "Revenue",
+                  "Duration (Minutes)", "Location"]
+    df.to_csv(path, index=False)
+    return path
+
+
+def make_json(path: str, companies: int, employees_per_company: int = 20,
+              quarters: int = 8, seed: int = 0) -> str:
+    """Writes a company JSON file shaped like datasets/dataset1.json."""
+    rng = np.random.default_rng(seed)
+    quarter_keys = [f"{2020 + q // 4}_Q{q % 4 + 1}" for q in range(quarters)]
+    data = {"companies": []}
+    for company_id in range(1, companies + 1):
+        employees = [{
+            "id": f"E{company_id:05d}{e:04d}",
+            "name": f"Employee {company_id}-{e}",
+            "role": ROLES[int(rng.integers(len(ROLES)))],
+            "cashmoneh": int(rng.integers(30000, 120000)),
+            "hired_date": str(pd.Timestamp("2015-01-01") + pd.Timedelta(days=int(rng.integers(0, 3000))))[:10],
+        } for e in range(employees_per_company)]
+        performance = {
+            key: {"revenue": int(rng.integers(1_000_000, 50_000_000)),
+                  "profit_margin": round(float(rng.uniform(5, 25)), 1)}
+            for key in quarter_keys
+        }
+        data["companies"].append({
+            "id": company_id,
+            "name": f"Company {company_id}",
+            "industry": "Sports and Leisure",
+            "revenue": int(rng.integers(10_000_000, 500_000_000)),
+            "location": LOCATIONS[company_id % len(LOCATIONS)],
+            "employees": employees,
+            "performance": performance,
+        })
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return path
+
+
+def make_pdf(path: str, pages: int) -> str:
+    """Writes a PDF made of `pages` copies of the sample aggregated report page."""
+    src = pypdfium2.PdfDocument(SAMPLE_PDF)
+    dst = pypdfium2.PdfDocument.new()
+    for _ in range(pages):
+        dst.import_pages(src, [0])
+    dst.save(path)
+    return path
+
+
+def _add_table(slide, rows: list):
+    shape = slide.shapes.add_table(len(rows), len(rows[0]), Inches(0.5), Inches(1.5), Inches(9), Inches(4))
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            shape.table.cell(r, c).text = str(value)
+
+
+def make_pptx(path: str, slides: int = 3, seed: int = 0) -> str:
+    """
+    Writes a deck whose first three slides match datasets/dataset4.pptx
+    (summary, quarterly metrics table, revenue breakdown) followed by
+    `slides - 3` extra slides alternating tables and text.
+    """
+    rng = np.random.default_rng(seed)
+    prs = Presentation()
+    layout = prs.slide_layouts[5]  # Title Only
+
+    slide = prs.slides.add_slide(layout)
+    slide.shapes.title.text = "Annual Summary"
+    box = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(3))
+    box.text_frame.text = ("Key Highlights:\nTotal Revenue: $10,400,000\n"
+                           "Total Memberships Sold: 1,520\nTop Location: Downtown")
+
+    quarterly = [["Quarter", "Revenue (in $)", "Memberships Sold", "Avg Duration (Minutes)"]]
+    quarterly += [[f"Q{q}", f"{int(rng.integers(1, 5)) * 1_000_000:,}", int(rng.integers(200, 500)),
+                   int(rng.integers(60, 120))] for q in range(1, 5)]
+    slide = prs.slides.add_slide(layout)
+    slide.shapes.title.text = "Quarterly Metrics"
+    _add_table(slide, quarterly)
+
+    slide = prs.slides.add_slide(layout)
+    slide.shapes.title.text = "Revenue Breakdown by Activity"
+    box = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(3))
+    box.text_frame.text = "Revenue Distribution:\nGym: 40%\nPool: 25%\nTennis Court: 15%\nPersonal Training: 20%"
+
+    for index in range(3, slides):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"Appendix {index}"
+        if index % 2:
+            _add_table(slide, [["Metric", "Value"]] + [[f"Metric {i}", int(rng.integers(1000))] for i in range(8)])
+        else:
+            box = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(3))
+            box.text_frame.text = "\n".join(f"Note {i}: {int(rng.integers(1000))}" for i in range(8))
+    prs.save(path)
+    return path
+
+
+def make_datasets(directory: str, companies: int, employees_per_company: int, quarters: int,
+                  csv_rows: int, pdf_pages: int, pptx_slides: int) -> dict:
+    """Writes all four synthetic files into `directory`; returns DataIngestion path arguments."""
+    os.makedirs(directory, exist_ok=True)
+    return {
+        "json_path": make_json(os.path.join(directory, "dataset1.json"), companies, employees_per_company, quarters),
+        "csv_path": make_csv(os.path.join(directory, "dataset2.csv"), csv_rows),
+        "pdf_path": make_pdf(os.path.join(directory, "dataset3.pdf"), pdf_pages),
+        "pptx_path": make_pptx(os.path.join(directory, "dataset4.pptx"), pptx_slides),
+    }
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from data_ingestion import IngestionError, run_source_tasks
+from data_processor import SOURCE_SECTIONS
+from data_sources import file_groups, merge_file_sections, process_files
+from metrics import metrics
+
+# Bump when the processing pipeline or the on-disk layout changes, so that
+# frames written by older code are not reused.
+CACHE_VERSION = 2
+
+
+def file_sha256(path: str, block_size: int = 2 ** 20) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's content, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_nested(series: pd.Series) -> bool:
+    """True if an object column holds lists or dicts (e.g. the nested employees list)."""
+    if series.dtype != object:
+        return False
+    return any(isinstance(v, (list, dict)) for v in series.dropna())
+
+
+def encode_nested_columns(df: pd.DataFrame):
+    """
+    Returns (frame, json_columns): the frame with columns holding lists or dicts
+    replaced by their JSON text, so it can be written to Arrow/Feather, and the
+    names of those columns for decode_nested_columns(). Used by every on-disk
+    format that stores frames, so they all read back the same values.
+    """
+    json_columns = [str(col) for col in df.columns if _is_nested(df[col])]
+    if json_columns:
+        df = df.assign(**{
+            col: [json.dumps(v) if v is not None else None for v in df[col]]
+            for col in json_columns
+        })
+    return df, json_columns
+
+
+def decode_nested_columns(df: pd.DataFrame, json_columns) -> pd.DataFrame:
+    """Parses the columns encoded by encode_nested_columns() back into lists and dicts, in place."""
+    for col in json_columns:
+        df[col] = [json.loads(v) if isinstance(v, str) else None for v in df[col]]
+    return df
+
+
+class ColumnarCache:
+    """
+    On-disk cache of processed frames, one directory per source.
+
+    Each source ("json", "csv", "pdf", "pptx") is stored as Arrow IPC (Feather)
+    files, one per section it produces, plus a manifest recording the size,
+    mtime and content hash of each of the source's files. A cached source is
+    reused only if its set of files and their content are unchanged; frames are
+    memory-mapped back on load.
+
+    Layout:
+      <cache_dir>/<source>/manifest.json
+      <cache_dir>/<source>/<section>.feather   (DataFrame sections)
+      <cache_dir>/<source>/<section>.json      (dict sections, e.g. presentation)
+    """
+
+    def __init__(self, cache_dir: str = ".cache"):
+        self.cache_dir = cache_dir
+
+    def _source_dir(self, source: str) -> str:
+        return os.path.join(self.cache_dir, source)
+
+    def _read_manifest(self, source: str) -> dict:
+        try:
+            with open(os.path.join(self._source_dir(source), "manifest.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def fingerprint(self, paths, manifest: dict = None) -> dict:
+        """
+        Identifies the current content of a source's files (`paths` is one path
+        or a list of them): {"files": [{"path", "size", "mtime_ns", "sha256"}],
+        "sha256": hash of them all}. A file's content hash from the manifest is
+        reused when its size and mtime are unchanged, so unchanged files are not
+        re-read on every boot.
+        """
+        paths = [paths] if isinstance(paths, str) else list(paths)
+        known = {entry["path"]: entry for entry in (manifest or {}).get("files", [])}
+        files = []
+        for path in paths:
+            stat = os.stat(path)
+            entry = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            previous = known.get(path)
+            if previous and all(previous.get(k) == v for k, v in entry.items()):
+                entry["sha256"] = previous.get("sha256")
+            else:
+                entry["sha256"] = file_sha256(path)
+            files.append(entry)
+        digest = hashlib.sha256()
+        for entry in files:
+            digest.update(f"{entry['path']}\0{entry['sha256']}\n".encode("utf-8"))
+        return {"files": files, "sha256": digest.hexdigest()}
+
+    @metrics.stage("cache_load")
+    def load(self, source: str, paths) -> dict:
+        """
+        Returns the cached sections for a source, or None if the cache is missing
+        or stale for the current content of `paths` (one path or a list).
+        """
+        manifest = self._read_manifest(source)
+        if not manifest or manifest.get("version") != CACHE_VERSION:
+            return None
+        try:
+            if manifest.get("sha256") != self.fingerprint(paths, manifest)["sha256"]:
+                return None
+        except OSError:
+            return None
+
+        sections = {}
+        source_dir = self._source_dir(source)
+        try:
+            for section, info in manifest["sections"].items():
+                file_path = os.path.join(source_dir, info["file"])
+                if info["kind"] == "dict":
+                    with open(file_path, "r") as f:
+                        sections[section] = json.load(f)
+                    continue
+                df = feather.read_table(file_path, memory_map=True).to_pandas()
+                sections[section] = decode_nested_columns(df, info.get("json_columns", []))
+        except (OSError, ValueError, KeyError, pa.ArrowException):
+            return None
+        return sections
+
+    @metrics.stage("cache_save")
+    def save(self, source: str, fingerprint: dict, sections: dict):
+        """
+        Writes the processed sections for a source, tagged with the fingerprint
+        of the source file taken before it was parsed. Files are written under
+        temporary names and moved into place, and the manifest is written last,
+        so a crashed or concurrent writer never leaves a valid-looking partial cache.
+        """
+        source_dir = self._source_dir(source)
+        os.makedirs(source_dir, exist_ok=True)
+        manifest = {"version": CACHE_VERSION, "sections": {}}
+        manifest.update(fingerprint)
+
+        for section, value in sections.items():
+            if isinstance(value, pd.DataFrame):
+                value, json_columns = encode_nested_columns(value)
+                info = {"kind": "frame", "file": f"{section}.feather", "json_columns": json_columns}
+                self._atomic_write(source_dir, info["file"],
+                                   lambda f, df=value: feather.write_feather(df, f, compression="uncompressed"))
+            else:
+                info = {"kind": "dict", "file": f"{section}.json"}
+                self._atomic_write(source_dir, info["file"],
+                                   lambda f, obj=value: f.write(json.dumps(obj).encode("utf-8")))
+            manifest["sections"][section] = info
+
+        self._atomic_write(source_dir, "manifest.json",
+                           lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+
+    @staticmethod
+    def _atomic_write(directory: str, name: str, write):
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, os.path.join(directory, name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def _merge_file_results(source: str, groups: list, file_results: list) -> dict:
+    """Combines the task results for the file groups of one source into a single source result."""
+    failed = [(group, result) for group, result in zip(groups, file_results) if not result["ok"]]
+    seconds = [result["seconds"] for result in file_results if result["seconds"] is not None]
+    result = {
+        "source": source, "ok": not failed, "data": None, "error": None, "traceback": None,
+        "seconds": sum(seconds) if seconds else None, "files": sum(len(group) for group in groups),
+    }
+    if failed:
+        if len(groups) == 1:
+            result["error"] = failed[0][1]["error"]
+        else:
+            result["error"] = "; ".join(f"{', '.join(group)}: {failure['error']}" for group, failure in failed)
+        result["traceback"] = "\n".join(failure["traceback"] or "" for _, failure in failed)
+        return result
+    try:
+        result["data"] = merge_file_sections([file_result["data"] for file_result in file_results])
+    except Exception as e:
+        result.update(ok=False, error=f"{type(e).__name__}: {e}")
+    return result
+
+
+def build_sources(ingestion, sources=None, cache: ColumnarCache = None,
+                  csv_memory_limit_mb: float = None, parallel: bool = True,
+                  max_workers: int = None) -> dict:
+    """
+    Produces the processed sections for each source (all of them by default).
+    Sources whose files are unchanged are read from the cache. The files of the
+    other sources (a source path may be a glob pattern matching many files) are
+    read through their format adapters and processed concurrently in one
+    process pool, one task per file where the source allows it (see
+    data_sources.file_groups()); each source's sections are then merged in file
+    order and written back to the cache. A file's raw form only lives in the
+    task processing it. When csv_memory_limit_mb is given, CSV files are streamed in chunks.
+
+    Returns {source: result} in SOURCE_SECTIONS order. Each result is a dict with
+    "source", "ok", "data" (the sections), "error", "traceback", "seconds" and
+    "cached" (True if the sections came from the cache).
+    """
+    sources = [source for source in SOURCE_SECTIONS if sources is None or source in sources]
+    results = {}
+    fingerprints = {}
+    files = {}
+    tasks = {}
+    for source in sources:
+        start = time.perf_counter()
+        paths = ingestion.source_files(source)
+        sections = cache.load(source, paths) if cache is not None else None
+        if sections is not None:
+            results[source] = {
+                "source": source, "ok": True, "data": sections, "error": None,
+                "traceback": None, "seconds": time.perf_counter() - start, "cached": True,
+            }
+            continue
+        if cache is not None:
+            try:
+                fingerprints[source] = cache.fingerprint(paths)
+            except OSError:
+                # Missing or unreadable file: let the loader report the error.
+                fingerprints[source] = None
+        files[source] = file_groups(source, paths)
+        for index, group in enumerate(files[source]):
+            tasks[(source, index)] = (process_files, (ingestion, source, group, csv_memory_limit_mb))
+
+    if tasks:
+        workers = max_workers or min(len(tasks), max(len(SOURCE_SECTIONS), os.cpu_count() or 1))
+        file_results = run_source_tasks(tasks, max_workers=workers, parallel=parallel)
+    for source, groups in files.items():
+        result = _merge_file_results(source, groups, [file_results[(source, index)] for index in range(len(groups))])
+        result["cached"] = False
+        if result["ok"] and fingerprints.get(source) is not None:
+            try:
+                cache.save(source, fingerprints[source], result["data"])
+            except (OSError, pa.ArrowException) as e:
+                result["cache_error"] = f"{type(e).__name__}: {e}"
+        results[source] = result
+    return {source: results[source] for source in sources}
+
+
+def merge_sections(results: dict) -> dict:
+    """
+    Combines build_sources() results into the unified dataset, with keys in the
+    same order as DataProcessor.merge_all_data(). Raises IngestionError if any
+    source failed.
+    """
+    if not all(result["ok"] for result in results.values()):
+        raise IngestionError(results)
+    unified = {}
+    for result in results.values():
+        unified.update(result["data"])
+    return {key: unified[key] for sections in SOURCE_SECTIONS.values() for key in sections if key in unified}
+
+
+def build_unified(ingestion, cache: ColumnarCache = None, csv_memory_limit_mb: float = None,
+                  parallel: bool = True, max_workers: int = None) -> dict:
+    """
+    Builds the unified dataset (same keys as DataProcessor.merge_all_data()),
+    reusing cached frames for every source whose file has not changed and
+    re-parsing only the sources that did.
+    """
+    results = build_sources(ingestion, cache=cache, csv_memory_limit_mb=csv_memory_limit_mb,
+                            parallel=parallel, max_workers=max_workers)
+    return merge_sections(results)
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+
+def _result_bytes(result) -> int:
+    """Approximate memory held by a cached result: bytes, DataFrames and tuples/lists of them."""
+    if isinstance(result, (bytes, bytearray, memoryview)):
+        return len(result)
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=False).sum())
+    if isinstance(result, (tuple, list)):
+        return sum(_result_bytes(item) for item in result)
+    return 0
+
+
+class CoalescingExecutor:
+    """
+    Runs CPU-heavy response builders (pandas filtering, paging, JSON encoding)
+    off the event loop in a bounded thread pool.
+
+    Calls are identified by a key. Concurrent calls with the same key share one
+    computation, and the latest `cache_size` results totalling at most
+    `cache_bytes` are kept, so a burst of identical cache-miss requests costs a
+    single computation. A result larger than `cache_bytes` is never kept. Keys should
+    include something that changes with the data (e.g. the snapshot's ETag) so
+    that stale results are never served. Failed computations are not kept;
+    every waiting caller receives the exception.
+    """
+
+    def __init__(self, max_workers: int = None, cache_size: int = 256, cache_bytes: int = 256 * 1024 * 1024):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.cache_size = cache_size
+        self.cache_bytes = cache_bytes
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="data-executor")
+        # Re-entrant: a future that is already done runs its callback in the submitting thread.
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self._results = OrderedDict()
+        self._total_bytes = 0
+
+    async def run(self, key, func, *args):
+        """Returns func(*args), computed in the pool unless a result for `key` is cached or in flight."""
+        return await self._run(key, func, args, keep=True)
+
+    async def run_uncached(self, key, func, *args):
+        """Like run(), sharing in-flight computations, but the result is not kept afterwards."""
+        return await self._run(key, func, args, keep=False)
+
+    async def _run(self, key, func, args: tuple, keep: bool):
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key][0]
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._pool.submit(func, *args)
+                self._inflight[key] = future
+                future.add_done_callback(lambda done, key=key: self._finish(key, done, keep))
+        # Shielded: a cancelled waiter (e.g. a disconnected client) must not cancel the
+        # shared computation that other coalesced callers are still waiting on.
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _finish(self, key, future, keep: bool):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if not keep or future.cancelled() or future.exception() is not None or not self.cache_size:
+                return
+            result = future.result()
+            size = _result_bytes(result)
+            if size > self.cache_bytes:
+                return
+            if key in self._results:
+                self._total_bytes -= self._results.pop(key)[1]
+            self._results[key] = (result, size)
+            self._total_bytes += size
+            while len(self._results) > self.cache_size or self._total_bytes > self.cache_bytes:
+                self._total_bytes -= self._results.popitem(last=False)[1][1]
+
+    @property
+    def cached_bytes(self) -> int:
+        """Approximate size of the cached results."""
+        return self._total_bytes
+
+    def clear(self):
+        """Drops all cached results."""
+        with self._lock:
+            self._results.clear()
+            self._total_bytes = 0
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,114 @@
+import gzip
+import io
+import json
+import pandas as pd
+import pyarrow as pa
+from data_serializer import encode_json, iter_frame_records
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered.
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Response bodies smaller than this are sent uncompressed.
+MIN_COMPRESS_BYTES = 1024
+
+
+def _parse_header_values(header: str) -> list:
+    """
+    Parses an Accept or Accept-Encoding header into (value, q) pairs, in the
+    order given. Values with q=0 are kept: they are explicit refusals.
+    """
+    values = []
+    for part in (header or "").split(","):
+        value, *params = [p.strip() for p in part.split(";")]
+        if not value:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        values.append((value.lower(), q))
+    return values
+
+
+def negotiate_media_type(accept: str) -> str:
+    """
+    Picks the response format for table data from an Accept header:
+    ARROW_MEDIA_TYPE, NDJSON_MEDIA_TYPE or (by default) JSON_MEDIA_TYPE.
+    The highest q wins; ties go to the type listed first.
+    """
+    best, best_q = JSON_MEDIA_TYPE, 0.0
+    for value, q in _parse_header_values(accept):
+        if value in (ARROW_MEDIA_TYPE, NDJSON_MEDIA_TYPE, JSON_MEDIA_TYPE) and q > best_q:
+            best, best_q = value, q
+    return best
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """
+    Returns "br" or "gzip" if the client accepts it (br only when the brotli
+    package is installed), preferring the higher q and then br; None otherwise.
+    An encoding listed with q=0 is refused even if "*" is accepted.
+    """
+    offered = dict(_parse_header_values(accept_encoding))
+    supported = (["br"] if brotli else []) + ["gzip"]
+    quality = {encoding: offered.get(encoding, offered.get("*", 0.0)) for encoding in supported}
+    candidates = [encoding for encoding, q in quality.items() if q > 0]
+    if not candidates:
+        return None
+    return max(candidates, key=quality.get)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compresses a response body with "gzip" or "br"."""
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of a compressed representation; distinct per encoding as required for strong ETags."""
+    return etag if not encoding else etag[:-1] + "-" + encoding + '"'
+
+
+def _arrow_compatible(df: pd.DataFrame) -> pd.DataFrame:
+    """Encodes object columns holding lists or dicts (e.g. nested employees) as JSON strings."""
+    nested = {
+        col: [json.dumps(v) if isinstance(v, (list, dict)) else v for v in df[col]]
+        for col in df.columns
+        if df[col].dtype == object and any(isinstance(v, (list, dict)) for v in df[col].dropna())
+    }
+    return df.assign(**nested) if nested else df
+
+
+def encode_arrow(df: pd.DataFrame) -> bytes:
+    """
+    Encodes a DataFrame as an Arrow IPC stream (one record batch per 64k rows).
+    Categoricals become dictionary arrays and datetimes timestamps, so clients
+    can read the columns without parsing; nested values are sent as JSON strings.
+    """
+    table = pa.Table.from_pandas(_arrow_compatible(df), preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=65536)
+    return sink.getvalue()
+
+
+def iter_ndjson(df: pd.DataFrame, chunk_rows: int = 10_000):
+    """
+    Yields a DataFrame as newline-delimited JSON, one row object per line,
+    encoding chunk_rows rows at a time so rows can be sent while later ones
+    are still being encoded.
+    """
+    for rows in iter_frame_records(df, chunk_rows):
+        yield b"".join(encode_json(row) + b"\n" for row in rows)
@@ -1,8 +1,370 @@
+import hashlib
+import io
 import json
+import os
+import posixpath
+import tempfile
+import time
+import traceback
+import zipfile
 import pandas as pd
-import pdfplumber
 import re
-from pptx import Presentation
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from data_sources import adapter_for, combine_raw, expand_paths
+from metrics import metrics
+
+# The PDF and PPTX parsers (pdfplumber, lxml) are imported by the functions that
+# read those files, so they are loaded only along with their source.
+
+try:
+    import ijson
+    if ijson.backend != "yajl2_c":
+        # The pure-Python ijson backends are slower than the built-in fallback below.
+        ijson = None
+except ImportError:  # Optional: without it JSON is streamed with the standard library decoder.
+    ijson = None
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = " \t\n\r"
+
+
+class IngestionError(RuntimeError):
+    """
+    Raised when one or more sources fail to load. `results` holds the
+    per-source result dicts returned by run_source_tasks().
+    """
+    def __init__(self, results: dict):
+        self.results = results
+        failed = [r for r in results.values() if not r["ok"]]
+        super().__init__("; ".join(f"{r['source']}: {r['error']}" for r in failed))
+
+
+def _timed_call(source: str, func, args: tuple) -> dict:
+    """
+    Runs one source task and captures its outcome as a result dict instead of raising.
+    Module-level so it can be sent to worker processes. Stage metrics recorded by
+    the task are returned under "stages" for run_source_tasks() to merge.
+    """
+    start = time.perf_counter()
+    stages = []
+    try:
+        data, stages = metrics.capture_stages(func, *args)
+        error = None
+        error_traceback = None
+    except Exception as e:
+        data = None
+        error = f"{type(e).__name__}: {e}"
+        error_traceback = traceback.format_exc()
+    return {
+        "source": source,
+        "ok": error is None,
+        "data": data,
+        "error": error,
+        "traceback": error_traceback,
+        "seconds": time.perf_counter() - start,
+        "stages": stages,
+    }
+
+
+def run_source_tasks(tasks: dict, max_workers: int = None, parallel: bool = True) -> dict:
+    """
+    Runs one task per source, concurrently in a process pool when `parallel`
+    is set and there is more than one task.
+
+    Parameters:
+      tasks: {source: (func, args)}; func and args must be picklable.
+      max_workers: Pool size (defaults to the number of tasks).
+
+    Returns {source: result} in the order of `tasks`, where each result is a dict
+    with "source", "ok", "data", "error", "traceback" and "seconds" (time spent
+    in the task itself). Failures are reported in the result, never raised.
+    """
+    if not parallel or len(tasks) <= 1:
+        results = {source: _timed_call(source, func, args) for source, (func, args) in tasks.items()}
+    else:
+        results = _run_in_pool(tasks, max_workers)
+    for result in results.values():
+        metrics.merge_stages(result.pop("stages", None))
+    return results
+
+
+def _run_in_pool(tasks: dict, max_workers: int = None) -> dict:
+    with ProcessPoolExecutor(max_workers=max_workers or len(tasks)) as pool:
+        futures = {
+            source: pool.submit(_timed_call, source, func, args)
+            for source, (func, args) in tasks.items()
+        }
+        results = {}
+        for source, future in futures.items():
+            try:
+                results[source] = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. the result could not be pickled).
+                results[source] = {
+                    "source": source, "ok": False, "data": None,
+                    "error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc(),
+                    "seconds": None,
+                }
+    return results
+
+
+def _pdf_table_rows(table) -> list:
+    """
+    Converts one page's extracted table into row dicts keyed by the page's
+    header row. Rows whose length does not match the header are skipped.
+    """
+    rows = []
+    if table:
+        headers = table[0]
+        for row in table[1:]:
+            if len(row) == len(headers):
+                rows.append(dict(zip(headers, row)))
+    return rows
+
+
+def _pdf_page_key(page, index: int) -> str:
+    """
+    Page cache key: page index plus a hash of the page's content streams and
+    size. Unchanged pages keep their key when other pages are appended.
+    """
+    from pdfminer.pdftypes import resolve1
+
+    digest = hashlib.sha256(repr(page.page_obj.mediabox).encode())
+    for stream in page.page_obj.contents:
+        digest.update(resolve1(stream).get_data())
+    return f"{index}-{digest.hexdigest()[:32]}"
+
+
+def _extract_pdf_pages(pdf_path: str, page_indexes: list) -> dict:
+    """
+    Extracts the tables of a shard of pages. Runs in a worker process.
+    Returns {page index: rows}.
+    """
+    import pdfplumber
+
+    results = {}
+    with pdfplumber.open(pdf_path) as pdf:
+        for index in page_indexes:
+            page = pdf.pages[index]
+            results[index] = _pdf_table_rows(page.extract_table())
+            page.close()
+    return results
+
+
+class _JsonTokenStream:
+    """
+    Reads JSON values one at a time from a text file, keeping only a window of
+    the file in memory. Values are decoded with the C-accelerated standard
+    decoder; a value cut off by the end of the window is decoded again once
+    more of the file has been read.
+    """
+
+    def __init__(self, f, read_size: int):
+        self.f = f
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(self.read_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it ("" at the end of the file)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _JSON_WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'end of file'}' in JSON stream")
+        self.pos += 1
+
+    def value(self):
+        """Decodes and consumes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the end of the window may continue in the next read.
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(f, key: str, read_size: int = 1 << 20):
+    """
+    Yields the items of the array stored under `key` in the top-level object of
+    the JSON text file `f`, one at a time. Other top-level values are decoded and
+    discarded. Raises KeyError if the object has no such key.
+    """
+    stream = _JsonTokenStream(f, read_size)
+    stream.expect("{")
+    found = False
+    if stream.peek() == "}":
+        stream.pos += 1
+    else:
+        while True:
+            name = stream.value()
+            stream.expect(":")
+            if name == key and stream.peek() == "[":
+                found = True
+                stream.pos += 1
+                if stream.peek() == "]":
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.peek() != ",":
+                            break
+                        stream.pos += 1
+                    stream.expect("]")
+            else:
+                stream.value()
+            if stream.peek() != ",":
+                break
+            stream.pos += 1
+        stream.expect("}")
+    if not found:
+        raise KeyError(key)
+
+
+_PPTX_NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_A_RUN = f"{{{_PPTX_NS['a']}}}r"
+_A_BREAK = f"{{{_PPTX_NS['a']}}}br"
+_A_FIELD = f"{{{_PPTX_NS['a']}}}fld"
+_P_SHAPE = f"{{{_PPTX_NS['p']}}}sp"
+_P_GRAPHIC_FRAME = f"{{{_PPTX_NS['p']}}}graphicFrame"
+
+
+def _pptx_slide_paths(deck: zipfile.ZipFile) -> list:
+    """Zip member names of the deck's slides, in presentation order."""
+    from lxml import etree
+
+    presentation = etree.fromstring(deck.read("ppt/presentation.xml"))
+    rels = etree.fromstring(deck.read("ppt/_rels/presentation.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iterfind("rel:Relationship", _PPTX_NS)}
+    paths = []
+    for slide_id in presentation.iterfind("p:sldIdLst/p:sldId", _PPTX_NS):
+        target = targets[slide_id.get(f"{{{_PPTX_NS['r']}}}id")]
+        paths.append(target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("ppt", target)))
+    return paths
+
+
+def _pptx_text(text_body) -> str:
+    """Text of an a:txBody: paragraphs joined by newlines, line breaks as vertical tabs (as python-pptx)."""
+    if text_body is None:
+        return ""
+    paragraphs = []
+    for paragraph in text_body.iterfind("a:p", _PPTX_NS):
+        parts = []
+        for child in paragraph:
+            if child.tag in (_A_RUN, _A_FIELD):
+                parts.append(child.findtext("a:t", "", _PPTX_NS))
+            elif child.tag == _A_BREAK:
+                parts.append("\v")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def _pptx_slide_content(slide_xml: bytes) -> dict:
+    """
+    Reads the top-level shapes of one slide: {"texts": [...], "tables": [...]},
+    with texts of text shapes and tables as 2D lists of cell texts, in shape order.
+    """
+    from lxml import etree
+
+    slide = etree.fromstring(slide_xml)
+    content = {"texts": [], "tables": []}
+    tree = slide.find("p:cSld/p:spTree", _PPTX_NS)
+    for shape in (tree if tree is not None else []):
+        if shape.tag == _P_GRAPHIC_FRAME:
+            table = shape.find("a:graphic/a:graphicData/a:tbl", _PPTX_NS)
+            if table is not None:
+                content["tables"].append([
+                    [_pptx_text(cell.find("a:txBody", _PPTX_NS)) for cell in row.iterfind("a:tc", _PPTX_NS)]
+                    for row in table.iterfind("a:tr", _PPTX_NS)
+                ])
+        elif shape.tag == _P_SHAPE:
+            text_body = shape.find("p:txBody", _PPTX_NS)
+            if text_body is not None:
+                content["texts"].append(_pptx_text(text_body))
+    return content
+
+
+_TOTAL_REVENUE = re.compile(r"Total Revenue:\s*\$([\d,]+)")
+_TOTAL_MEMBERSHIPS = re.compile(r"Total Memberships Sold:\s*([\d,]+)")
+_TOP_LOCATION = re.compile(r"Top Location:\s*([\w\s]+)")
+_REVENUE_SHARE = re.compile(r"([\w\s]+):\s*(\d+)%", re.IGNORECASE)
+
+
+def _extract_summary_metrics(content: dict) -> dict:
+    text_content = "\n".join(content["texts"])
+    summary = {}
+    revenue_match = _TOTAL_REVENUE.search(text_content)
+    if revenue_match:
+        summary["Total Revenue"] = int(revenue_match.group(1).replace(",", ""))
+    memberships_match = _TOTAL_MEMBERSHIPS.search(text_content)
+    if memberships_match:
+        summary["Total Memberships Sold"] = int(memberships_match.group(1).replace(",", ""))
+    location_match = _TOP_LOCATION.search(text_content)
+    if location_match:
+        summary["Top Location"] = location_match.group(1).strip()
+    return summary
+
+
+def _extract_quarterly_metrics(content: dict) -> list:
+    if not content["tables"]:
+        return []
+    headers, *rows = content["tables"][0]
+    return [dict(zip(headers, row)) for row in rows]
+
+
+def _extract_revenue_breakdown(content: dict) -> dict:
+    text = "".join(text + "\n" for text in content["texts"])
+    return {activity.strip(): int(pct) for activity, pct in _REVENUE_SHARE.findall(text)}
+
+
+class PptxSlideRule:
+    """
+    Extracts one section of the PPTX data from one slide. `extract` receives
+    the slide content ({"texts": [...], "tables": [...]}, see
+    _pptx_slide_content) and returns the section value; `empty` builds the
+    value used when the deck has no such slide. Bump `version` when `extract`
+    changes so that memoized results are not reused.
+    """
+
+    def __init__(self, section: str, slide_index: int, extract, empty=dict, version: int = 1):
+        self.section = section
+        self.slide_index = slide_index
+        self.extract = extract
+        self.empty = empty
+        self.version = version
+
+
+def _load_source(ingestion, source: str):
+    return ingestion.load_source(source)
+
 
 class DataIngestion:
     """
@@ -11,47 +373,257 @@ class DataIngestion:
       - CSV (datasets/dataset2.csv)
       - PDF (datasets/dataset3.pdf)
       - PPTX (datasets/dataset4.pptx)
+
+    Each path may also be a glob pattern (e.g. "exports/membership-*.csv") to
+    read many files of one source; every file is read by the adapter registered
+    for its extension (see data_sources) and the results are combined.
     """
+    # Columns the membership pipeline reads from the CSV, and their dtypes when streaming.
+    CSV_COLUMNS = [
+        "date", "membership_id", "membership_type", "activity",
+        "revenue", "duration (minutes)", "location"
+    ]
+    CSV_DTYPES = {
+        "membership_id": "object",
+        "membership_type": "category",
+        "activity": "category",
+        "location": "category",
+    }
+    # Memory budget used to size CSV chunks when none is given.
+    DEFAULT_CSV_MEMORY_LIMIT_MB = 256
+    # Number of PDF pages extracted per worker task.
+    PDF_PAGES_PER_SHARD = 8
+    # Sections read from the PPTX deck. Only the slides named here are read.
+    PPTX_RULES = (
+        PptxSlideRule("summary_metrics", 0, _extract_summary_metrics),
+        PptxSlideRule("quarterly_metrics", 1, _extract_quarterly_metrics, empty=list),
+        PptxSlideRule("revenue_breakdown", 2, _extract_revenue_breakdown),
+    )
+
     def __init__(self, json_path='datasets/dataset1.json', csv_path='datasets/dataset2.csv',
-                 pdf_path='datasets/dataset3.pdf', pptx_path='datasets/dataset4.pptx'):
+                 pdf_path='datasets/dataset3.pdf', pptx_path='datasets/dataset4.pptx',
+                 pdf_workers: int = None, pdf_page_cache_dir: str = None,
+                 pptx_slide_cache_dir: str = None):
+        """
+        pdf_workers: Processes used for PDF table extraction (defaults to the CPU count;
+          1 extracts in-process).
+        pdf_page_cache_dir: Optional directory for per-page PDF extraction results.
+        pptx_slide_cache_dir: Optional directory for per-slide PPTX extraction results.
+        """
         self.json_path = json_path
         self.csv_path = csv_path
         self.pdf_path = pdf_path
         self.pptx_path = pptx_path
+        self.pdf_workers = pdf_workers
+        self.pdf_page_cache_dir = pdf_page_cache_dir
+        self.pptx_slide_cache_dir = pptx_slide_cache_dir
+
+    def source_path(self, source: str) -> str:
+        """
+        Returns the path configured for a source ("json", "csv", "pdf" or "pptx").
+        It may be a glob pattern (e.g. "exports/membership-*.csv"); see source_files().
+        """
+        paths = {"json": self.json_path, "csv": self.csv_path, "pdf": self.pdf_path, "pptx": self.pptx_path}
+        if source not in paths:
+            raise ValueError(f"Unknown source: {source}")
+        return paths[source]
+
+    def source_files(self, source: str) -> list:
+        """The files of a source: its path, or the files its glob pattern matches, sorted."""
+        return expand_paths(self.source_path(source))
+
+    def load_source(self, source: str):
+        """
+        Loads the raw form of a source by name through the adapters of its files
+        (see data_sources); the files of a glob pattern are combined into one.
+        """
+        raws = [adapter_for(source, path).load(self, path) for path in self.source_files(source)]
+        return combine_raw(source, raws)
+
+    def load_all(self, sources=None, max_workers: int = None, parallel: bool = True) -> dict:
+        """
+        Loads several sources at once (all four by default), running the loaders
+        concurrently in a process pool. Returns {source: result} as described in
+        run_source_tasks(); a failing loader is reported there instead of raising.
+        """
+        sources = sources or ["json", "csv", "pdf", "pptx"]
+        tasks = {source: (_load_source, (self, source)) for source in sources}
+        return run_source_tasks(tasks, max_workers=max_workers, parallel=parallel)
 
     # JSON
-    def load_json(self) -> dict:
-        with open(self.json_path, 'r') as f:
+    @metrics.stage("load_json", rows=lambda data: len(data.get("companies", [])))
+    def load_json(self, path: str = None) -> dict:
+        with open(path or self.json_path, 'r') as f:
             data = json.load(f)
         return data
 
+    def iter_json_companies(self, path: str = None):
+        """
+        Streams the company objects of the JSON file one at a time instead of
+        loading the whole document, so memory is bounded by the largest company.
+        Uses ijson's C backend when it is installed.
+        """
+        if ijson is not None:
+            with open(path or self.json_path, "rb") as f:
+                yield from ijson.items(f, "companies.item", use_float=True)
+            return
+        with open(path or self.json_path, "r") as f:
+            yield from iter_json_array(f, "companies")
+
     # CSV
-    def load_csv(self) -> pd.DataFrame:
-        df = pd.read_csv(self.csv_path)
+    @metrics.stage("load_csv")
+    def load_csv(self, path: str = None) -> pd.DataFrame:
+        df = pd.read_csv(path or self.csv_path)
         # Normalize column names (lowercase)
         df.columns = [col.strip().lower() for col in df.columns]
         return df
 
+    def _csv_read_options(self, path: str = None) -> dict:
+        """
+        Builds pd.read_csv options for streaming: lowercase column names,
+        only the columns the membership pipeline uses, explicit dtypes and a
+        parsed 'date' column.
+        """
+        header = pd.read_csv(path or self.csv_path, nrows=0).columns
+        names = [col.strip().lower() for col in header]
+        usecols = [col for col in names if col in self.CSV_COLUMNS]
+        return {
+            "header": 0,
+            "names": names,
+            "usecols": usecols,
+            "dtype": {col: dtype for col, dtype in self.CSV_DTYPES.items() if col in usecols},
+            "parse_dates": ["date"] if "date" in usecols else False,
+        }
+
+    def csv_chunksize(self, memory_limit_mb: float = None, sample_rows: int = 1000, path: str = None) -> int:
+        """
+        Chooses a CSV chunk size (in rows) that keeps one parsed chunk within the
+        memory ceiling. The in-memory size per row is measured on a sample of the
+        file; half of the budget is reserved for the parser's own buffers.
+        """
+        if memory_limit_mb is None:
+            memory_limit_mb = self.DEFAULT_CSV_MEMORY_LIMIT_MB
+        path = path or self.csv_path
+        sample = pd.read_csv(path, nrows=sample_rows, **self._csv_read_options(path))
+        if sample.empty:
+            return sample_rows
+        bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+        return max(1, int(memory_limit_mb * 2 ** 20 / 2 / bytes_per_row))
+
+    def iter_csv_chunks(self, chunksize: int = None, memory_limit_mb: float = None, path: str = None):
+        """
+        Streams the CSV (or the file at `path`) as typed DataFrame chunks instead
+        of loading it whole. The chunk size is taken from `chunksize`, or derived
+        from `memory_limit_mb`.
+        """
+        path = path or self.csv_path
+        options = self._csv_read_options(path)
+        if chunksize is None:
+            chunksize = self.csv_chunksize(memory_limit_mb, path=path)
+        with pd.read_csv(path, chunksize=chunksize, **options) as reader:
+            for chunk in reader:
+                yield chunk
+
+    @metrics.stage("read_csv_tail", rows=lambda result: len(result[0]))
+    def read_csv_tail(self, offset: int) -> tuple:
+        """
+        Reads the complete lines appended to the CSV after byte `offset`, using
+        the same column names and dtypes as iter_csv_chunks().
+        Returns (DataFrame of new rows, offset just past the last complete line).
+        """
+        with open(self.csv_path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        options = self._csv_read_options()
+        options["header"] = None
+        if not data[:end].strip():
+            empty = pd.read_csv(self.csv_path, nrows=0, **{**options, "header": 0})
+            return empty, offset + end
+        df = pd.read_csv(io.BytesIO(data[:end]), **options)
+        return df, offset + end
+
     # PDF
-    def load_pdf(self) -> list:
+    @metrics.stage("load_pdf")
+    def load_pdf(self, path: str = None) -> list:
         """
         Extract table data from the PDF.
         Returns a list of dictionaries (one per row).
         """
-        all_rows = []
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                table = page.extract_table()
-                if table:
-                    headers = table[0]
-                    for row in table[1:]:
-                        if len(row) == len(headers):
-                            row_dict = dict(zip(headers, row))
-                            all_rows.append(row_dict)
-        return all_rows
+        return list(self.iter_pdf_rows(path))
+
+    def iter_pdf_rows(self, path: str = None):
+        """
+        Yields the PDF table rows (one dict per row) page by page, in page order.
+
+        Pages already in the page cache are not extracted again. When more than
+        one shard of PDF_PAGES_PER_SHARD pages needs extracting and pdf_workers
+        allows it, the shards are extracted in a process pool and rows are
+        yielded as soon as the shard holding the next page is done.
+        """
+        import pdfplumber
+
+        path = path or self.pdf_path
+        with pdfplumber.open(path) as pdf:
+            keys = [_pdf_page_key(page, index) for index, page in enumerate(pdf.pages)]
+            cached = {}
+            for index, key in enumerate(keys):
+                rows = self._read_pdf_page_cache(key)
+                if rows is not None:
+                    cached[index] = rows
+            missing = [index for index in range(len(keys)) if index not in cached]
+
+            shard_size = self.PDF_PAGES_PER_SHARD
+            shards = [missing[i:i + shard_size] for i in range(0, len(missing), shard_size)]
+            workers = self.pdf_workers if self.pdf_workers is not None else (os.cpu_count() or 1)
+
+            if workers <= 1 or len(shards) <= 1:
+                for index in range(len(keys)):
+                    if index in cached:
+                        yield from cached[index]
+                        continue
+                    page = pdf.pages[index]
+                    rows = _pdf_table_rows(page.extract_table())
+                    page.close()
+                    self._write_pdf_page_cache(keys[index], rows)
+                    yield from rows
+                return
+
+            with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+                # map() yields shard results in submission (page) order.
+                shard_results = pool.map(_extract_pdf_pages, repeat(path), shards)
+                extracted = {}
+                for index in range(len(keys)):
+                    if index in cached:
+                        yield from cached[index]
+                        continue
+                    while index not in extracted:
+                        extracted.update(next(shard_results))
+                    rows = extracted.pop(index)
+                    self._write_pdf_page_cache(keys[index], rows)
+                    yield from rows
+
+    def _read_pdf_page_cache(self, key: str):
+        if not self.pdf_page_cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.pdf_page_cache_dir, key + ".json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_pdf_page_cache(self, key: str, rows: list):
+        if not self.pdf_page_cache_dir:
+            return
+        os.makedirs(self.pdf_page_cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.pdf_page_cache_dir, prefix=f".{key}.")
+        with os.fdopen(fd, "w") as f:
+            json.dump(rows, f)
+        os.replace(tmp_path, os.path.join(self.pdf_page_cache_dir, key + ".json"))
 
     # PPTX
-    def load_pptx(self) -> dict:
+    @metrics.stage("load_pptx")
+    def load_pptx(self, path: str = None) -> dict:
         """
         Parse the PPTX slides individually. Returns a dictionary with:
           {
@@ -59,83 +631,46 @@ class DataIngestion:
             "quarterly_metrics": [...],
             "revenue_breakdown": {...}
           }
+
+        The deck is read as a zip archive and only the slides used by
+        PPTX_RULES are decompressed and parsed. Results are memoized per
+        slide by a hash of its XML in pptx_slide_cache_dir, so an unchanged
+        slide is not parsed again when other slides of the deck change.
         """
-        return self._parse_pptx_slides(self.pptx_path)
-
-    def _load_pptx_all_slides(self, filepath):
-        """
-        Helper: returns a list of dicts, each with:
-          - 'slide_index': the slide number
-          - 'tables': list of 2D arrays (rows in each table)
-          - 'texts': list of text from text-based shapes
-        """
-        prs = Presentation(filepath)
-        slides_data = []
-
-        for slide_index, slide in enumerate(prs.slides):
-            slide_info = {
-                "slide_index": slide_index,
-                "tables": [],
-                "texts": []
-            }
-            for shape in slide.shapes:
-                if shape.has_table:
-                    table_data = []
-                    for row in shape.table.rows:
-                        cells = [cell.text for cell in row.cells]
-                        table_data.append(cells)
-                    slide_info["tables"].append(table_data)
-                elif shape.has_text_frame:
-                    slide_info["texts"].append(shape.text)
-            slides_data.append(slide_info)
-
-        return slides_data
-
-    def _parse_pptx_slides(self, filepath):
-        """
-        Parse each slide's content (text, tables) and apply different regex
-        or logic depending on the slide index.
-        """
-        slides_data = self._load_pptx_all_slides(filepath)
-        parsed_data = {
-            "summary_metrics": {},
-            "quarterly_metrics": [],
-            "revenue_breakdown": {}
-        }
+        parsed_data = {}
+        with zipfile.ZipFile(path or self.pptx_path) as deck:
+            slide_paths = _pptx_slide_paths(deck)
+            contents = {}
+            for rule in self.PPTX_RULES:
+                if rule.slide_index >= len(slide_paths):
+                    parsed_data[rule.section] = rule.empty()
+                    continue
+                slide_xml = deck.read(slide_paths[rule.slide_index])
+                digest = hashlib.sha256(slide_xml).hexdigest()[:32]
+                key = f"{rule.section}-v{rule.version}-{digest}"
+                value = self._read_pptx_slide_cache(key)
+                if value is None:
+                    if rule.slide_index not in contents:
+                        contents[rule.slide_index] = _pptx_slide_content(slide_xml)
+                    value = rule.extract(contents[rule.slide_index])
+                    self._write_pptx_slide_cache(key, value)
+                parsed_data[rule.section] = value
+        return parsed_data
 
-        for slide_info in slides_data:
-            slide_index = slide_info["slide_index"]
-            text_content = "\n".join(slide_info["texts"])
-
-            if slide_index == 0:
-                revenue_match = re.search(r"Total Revenue:\s*\$([\d,]+)", text_content)
-                if revenue_match:
-                    val = revenue_match.group(1).replace(",", "")
-                    parsed_data["summary_metrics"]["Total Revenue"] = int(val)
-
-                memberships_match = re.search(r"Total Memberships Sold:\s*([\d,]+)", text_content)
-                if memberships_match:
-                    val = memberships_match.group(1).replace(",", "")
-                    parsed_data["summary_metrics"]["Total Memberships Sold"] = int(val)
-
-                location_match = re.search(r"Top Location:\s*([\w\s]+)", text_content)
-                if location_match:
-                    parsed_data["summary_metrics"]["Top Location"] = location_match.group(1).strip()
-
-            elif slide_index == 1:
-                if slide_info["tables"]:
-                    table = slide_info["tables"][0]
-                    headers = table[0]
-                    for row in table[1:]:
-                        row_dict = dict(zip(headers, row))
-                        parsed_data["quarterly_metrics"].append(row_dict)
-
-            elif slide_index == 2:
-                revenue_breakdown_text = ""
-                for text in slide_info["texts"]:
-                    revenue_breakdown_text += text + "\n"
-                pairs = re.findall(r"([\w\s]+):\s*(\d+)%", revenue_breakdown_text, re.IGNORECASE)
-                for activity, pct in pairs:
-                    parsed_data["revenue_breakdown"][activity.strip()] = int(pct)
+    def _read_pptx_slide_cache(self, key: str):
+        if not self.pptx_slide_cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.pptx_slide_cache_dir, key + ".json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
 
-        return parsed_data
+    def _write_pptx_slide_cache(self, key: str, value):
+        if not self.pptx_slide_cache_dir:
+            return
+        os.makedirs(self.pptx_slide_cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.pptx_slide_cache_dir, prefix=f".{key}.")
+        with os.fdopen(fd, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, os.path.join(self.pptx_slide_cache_dir, key + ".json"))
@@ -0,0 +1,580 @@
+import contextlib
+import copy
+import hashlib
+import logging
+import os
+import sys
+import threading
+import pandas as pd
+from data_cache import build_sources, merge_sections
+from data_ingestion import IngestionError
+from data_processor import DataProcessor, SOURCE_SECTIONS, compact_sections, concat_categorical_frames
+from data_query import CompanyIndex, MembershipAggregates, MembershipQueryEngine
+from data_serializer import SerializedDataCache
+from metrics import resident_memory_bytes
+
+logger = logging.getLogger(__name__)
+
+# Bytes read at a time when hashing the already-read part of the CSV.
+CSV_HASH_BLOCK_BYTES = 1 << 20
+
+
+def _deep_size(value) -> int:
+    """Approximate deep size in bytes of plain Python data (dicts, lists, scalars) or a DataFrame."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(k) + _deep_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_deep_size(v) for v in value)
+    return size
+
+
+def _strip_data(results: dict) -> dict:
+    """Per-source results without the loaded data, for reporting."""
+    return {
+        source: {key: value for key, value in result.items() if key != "data"}
+        for source, result in results.items()
+    }
+
+
+class DataSnapshot:
+    """
+    A consistent, read-only view of the loaded data and everything derived from it
+    (pre-encoded JSON, query indexes). Request handlers take the current snapshot
+    once and use only that object, so a reload never shows them a mix of old
+    and new data.
+    """
+
+    def __init__(self, unified: dict, report: dict, generation: int = 1,
+                 previous: "DataSnapshot" = None, changed_sources=None, keep_raw: bool = True,
+                 data_cache: SerializedDataCache = None):
+        """
+        Parameters:
+          unified: Unified dataset (see DataProcessor.merge_all_data()).
+          report: Per-source load results without data (see build_sources()).
+          generation: Increases by one with every reload.
+          previous: Snapshot being replaced; derived state of unchanged sources is reused.
+          changed_sources: Sources that differ from `previous` (all if None).
+          keep_raw: Keep raw sources loaded by raw_source() for later requests.
+          data_cache: Already encoded payload for `unified` (e.g. attached from a
+            SharedDatasetStore); encoded from `unified` if None.
+        """
+        self.unified = unified
+        self.report = report
+        self.generation = generation
+        self.keep_raw = keep_raw
+
+        if previous is None or changed_sources is None:
+            self.data_cache = data_cache if data_cache is not None else SerializedDataCache(unified)
+            self._index_membership()
+            self._index_companies()
+            self._raw = {}
+            return
+
+        changed_keys = [key for source in changed_sources for key in SOURCE_SECTIONS[source]]
+        self.data_cache = previous.data_cache.copy()
+        self.data_cache.rebuild(unified, changed=changed_keys)
+        if "csv" in changed_sources:
+            self._index_membership()
+        else:
+            self.membership_engine = previous.membership_engine
+            self.membership_aggregates = previous.membership_aggregates
+        if "json" in changed_sources:
+            self._index_companies()
+        else:
+            self.company_index = previous.company_index
+        self._raw = {source: raw for source, raw in previous._raw.items() if source not in changed_sources}
+
+    def _index_membership(self):
+        # Left unset while the membership source is not loaded (see DataManager's lazy_sources).
+        membership = self.unified.get("membership_activity")
+        self.membership_engine = MembershipQueryEngine(membership) if membership is not None else None
+        self.membership_aggregates = MembershipAggregates(membership) if membership is not None else None
+
+    def _index_companies(self):
+        # Left unset while the company source is not loaded (see DataManager's lazy_sources).
+        companies, employees = self.unified.get("company_info"), self.unified.get("employee_data")
+        self.company_index = CompanyIndex(companies, employees) if companies is not None else None
+
+    def missing_sources(self, sources=None) -> list:
+        """Sources (of `sources`, all if None) whose sections this snapshot does not hold."""
+        return [
+            source for source in (SOURCE_SECTIONS if sources is None else sources)
+            if any(key not in self.unified for key in SOURCE_SECTIONS[source])
+        ]
+
+    def with_appended_membership(self, rows: pd.DataFrame) -> "DataSnapshot":
+        """
+        Returns the next snapshot with processed membership `rows` appended.
+        Only the new rows are encoded, indexed and aggregated; the existing
+        encoded bytes, sorted date index and aggregate table are extended.
+        """
+        snapshot = copy.copy(self)
+        combined = concat_categorical_frames([self.unified["membership_activity"], rows])
+        snapshot.unified = dict(self.unified)
+        snapshot.unified["membership_activity"] = combined
+        snapshot.generation = self.generation + 1
+        snapshot.data_cache = self.data_cache.copy()
+        snapshot.data_cache.append_rows("membership_activity", rows)
+        snapshot.membership_engine = self.membership_engine.appended(combined)
+        snapshot.membership_aggregates = self.membership_aggregates.updated(rows)
+        snapshot._raw = {source: raw for source, raw in self._raw.items() if source != "csv"}
+        return snapshot
+
+    def raw_source(self, ingestion, source: str):
+        """
+        Loads a raw source on first use for the /api/data/<format> endpoints and,
+        if keep_raw is set, keeps it for the lifetime of this snapshot.
+        """
+        if source in self._raw:
+            return self._raw[source]
+        raw = ingestion.load_source(source)
+        if self.keep_raw:
+            self._raw[source] = raw
+        return raw
+
+    def memory_report(self) -> dict:
+        """
+        Reports the memory held by this snapshot: per section, its in-memory size
+        (deep, including strings) and encoded JSON size, with per-column dtypes
+        and sizes for table sections; plus the raw sources held and the process's
+        resident memory.
+        """
+        sections = {}
+        for key, value in self.unified.items():
+            encoded_bytes = len(self.data_cache.section(key))
+            if isinstance(value, pd.DataFrame):
+                usage = value.memory_usage(deep=True, index=False)
+                sections[key] = {
+                    "rows": len(value),
+                    "bytes": int(usage.sum()),
+                    "encoded_bytes": encoded_bytes,
+                    "columns": {
+                        str(col): {"dtype": str(value[col].dtype), "bytes": int(usage[col])}
+                        for col in value.columns
+                    },
+                }
+            else:
+                sections[key] = {"rows": None, "bytes": _deep_size(value), "encoded_bytes": encoded_bytes}
+        raw = {source: _deep_size(data) for source, data in self._raw.items()}
+        return {
+            "generation": self.generation,
+            "sections": sections,
+            "sections_bytes": sum(section["bytes"] for section in sections.values()),
+            "encoded_bytes": len(self.data_cache.payload),
+            "raw_sources": raw,
+            "resident_memory_bytes": resident_memory_bytes(),
+        }
+
+
+class DataManager:
+    """
+    Owns the current DataSnapshot and rebuilds it when dataset files change.
+    With `compact` set, sections are stored with compact dtypes (see
+    compact_frame()) and raw sources are not kept after a request used them.
+
+    Reloads run off the request path (in the watcher thread or a caller's thread),
+    rebuild only the affected sources, and publish the new snapshot with a single
+    reference assignment. If a reload fails, the previous snapshot stays in place
+    and the failure is kept in `last_reload_error`.
+
+    With a `shared_store` (SharedDatasetStore), worker processes on one host
+    share a single copy of the data: only the process holding the store's
+    loader lock parses the sources, every published snapshot is written to the
+    store, and the other processes attach to it read-only and follow its
+    generation counter. Changes made by any process (reloads, appended rows)
+    are applied on top of the latest published generation.
+
+    Sources in `lazy_sources` are left out of the first load and parsed when
+    first needed (see ensure_loaded()); their sections are absent from the
+    snapshot until then. Lazy loading is not used with a shared store, whose
+    loader publishes complete snapshots. status() reports, per source, whether
+    it is pending, loading, ready, lazy (not loaded yet) or failed.
+    """
+
+    # Seconds a worker waits for the loader's first snapshot before giving up.
+    SHARED_ATTACH_TIMEOUT = 600
+
+    def __init__(self, ingestion, cache=None, csv_memory_limit_mb: float = None, compact: bool = False,
+                 shared_store=None, lazy_sources=None):
+        self.ingestion = ingestion
+        self.cache = cache
+        self.csv_memory_limit_mb = csv_memory_limit_mb
+        self.compact = compact
+        self.shared_store = shared_store
+        self._follower = None
+        self._stop_following = threading.Event()
+        self.lazy_sources = set(lazy_sources or ()) if shared_store is None else set()
+        self.current = None
+        self.last_reload_error = None
+        self.load_error = None
+        self.source_state = {source: "lazy" if source in self.lazy_sources else "pending" for source in SOURCE_SECTIONS}
+        self.source_errors = {}
+        self._reload_lock = threading.Lock()
+        self._lazy_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._loader = None
+        self._watcher = None
+        # Byte offset up to which the CSV has been read, and a SHA-256 of the bytes before it.
+        self._csv_offset = None
+        self._csv_hash = None
+
+    def _hash_csv(self, start: int, end: int, digest):
+        """Feeds bytes [start, end) of the CSV into `digest` and returns it."""
+        with open(self.ingestion.csv_path, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                block = f.read(min(remaining, CSV_HASH_BLOCK_BYTES))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+        return digest
+
+    def _mark_csv_read(self, offset: int, appended: bool = False):
+        """
+        Records that the CSV was read up to `offset`. With `appended`, only the
+        bytes past the previous offset are hashed onto the previous hash;
+        otherwise the whole prefix is hashed.
+        """
+        if appended:
+            digest = self._hash_csv(self._csv_offset, offset, self._csv_hash.copy())
+        else:
+            digest = self._hash_csv(0, offset, hashlib.sha256())
+        self._csv_offset, self._csv_hash = offset, digest
+
+    def _csv_was_appended(self) -> bool:
+        """True if the CSV only grew past the last-read offset (every earlier byte is unchanged)."""
+        if self._csv_offset is None:
+            return False
+        try:
+            if os.path.getsize(self.ingestion.csv_path) <= self._csv_offset:
+                return False
+            prefix = self._hash_csv(0, self._csv_offset, hashlib.sha256())
+        except OSError:
+            return False
+        return prefix.digest() == self._csv_hash.digest()
+
+    def _build(self, sources=None) -> tuple:
+        csv_size = None
+        # Appended CSV lines are only tracked for a single CSV file, not a glob pattern.
+        if (sources is None or "csv" in sources) and self.ingestion.source_files("csv") == [self.ingestion.csv_path]:
+            try:
+                csv_size = os.path.getsize(self.ingestion.csv_path)
+            except OSError:
+                pass
+        building = [source for source in SOURCE_SECTIONS if sources is None or source in sources]
+        for source in building:
+            if self.source_state[source] != "ready":
+                self.source_state[source] = "loading"
+        results = build_sources(self.ingestion, sources=sources, cache=self.cache,
+                                csv_memory_limit_mb=self.csv_memory_limit_mb)
+        for source, result in results.items():
+            if result["ok"]:
+                self.source_errors.pop(source, None)
+            else:
+                self.source_errors[source] = result["error"]
+        try:
+            unified = merge_sections(results)
+        except IngestionError:
+            for source in building:
+                if self.source_state[source] == "loading":
+                    self.source_state[source] = "failed" if source in self.source_errors else "pending"
+            raise
+        if self.compact:
+            unified = compact_sections(unified)
+        if csv_size is not None:
+            self._mark_csv_read(csv_size)
+        return unified, _strip_data(results)
+
+    def _shared_lock(self):
+        return self.shared_store.publish_lock() if self.shared_store is not None else contextlib.nullcontext()
+
+    def _sync_shared(self):
+        """Moves to the latest generation in the shared store if another process published a newer one."""
+        if self.shared_store is None:
+            return
+        generation = self.shared_store.current_generation()
+        if self.current is None or generation > self.current.generation:
+            snapshot = self.shared_store.attach(generation, keep_raw=not self.compact)
+            if snapshot is not None:
+                self.current = snapshot
+
+    def _set_current(self, snapshot: DataSnapshot, changed=None):
+        """
+        Makes `snapshot` current; with a shared store it is published there first
+        and takes the store's generation number. `changed` lists the section keys
+        that differ from the current snapshot (all if None).
+        """
+        if self.shared_store is not None:
+            snapshot.generation = self.shared_store.publish(snapshot, changed)
+        self.current = snapshot
+
+    def _mark_loaded(self):
+        """Updates source_state from the sections held by the current snapshot."""
+        missing = self.current.missing_sources()
+        for source in SOURCE_SECTIONS:
+            if source not in missing:
+                self.source_state[source] = "ready"
+            elif source in self.lazy_sources and self.source_state[source] == "pending":
+                self.source_state[source] = "lazy"
+
+    def load(self) -> DataSnapshot:
+        """
+        Loads every source except the lazy ones and publishes the first snapshot.
+        Raises IngestionError if any source fails. With a shared store, a process
+        that is not the loader attaches to the loader's snapshot instead
+        (RuntimeError if none appears within SHARED_ATTACH_TIMEOUT seconds).
+        """
+        with self._reload_lock:
+            if self.shared_store is not None and not self.shared_store.try_acquire_loader():
+                self.shared_store.wait_for_generation(self.SHARED_ATTACH_TIMEOUT)
+                self._sync_shared()
+                if self.current is None:
+                    raise RuntimeError("No shared dataset was published by the loader process")
+                self._mark_loaded()
+                return self.current
+            unified, report = self._build([source for source in SOURCE_SECTIONS if source not in self.lazy_sources])
+            with self._shared_lock():
+                self._set_current(DataSnapshot(unified, report, keep_raw=not self.compact))
+            self._mark_loaded()
+            return self.current
+
+    def start_loading(self, watch_interval: float = 0):
+        """
+        Runs load() in a background thread, so a server can accept requests
+        (and answer health checks) while the sources are parsed. Once loaded,
+        the files are watched every `watch_interval` seconds if it is positive.
+        A failed load is kept in `load_error`; the watcher still starts, so
+        fixing the files loads the data.
+        """
+        def run():
+            try:
+                self.load()
+            except Exception as e:
+                self.load_error = e
+                logger.exception("Error loading datasets")
+            finally:
+                self._loaded.set()
+            if watch_interval > 0:
+                self.start_watching(watch_interval)
+
+        self._loader = threading.Thread(target=run, name="dataset-loader", daemon=True)
+        self._loader.start()
+
+    def wait_until_loaded(self, timeout: float = None) -> bool:
+        """Waits for the load started by start_loading(); True if data is available."""
+        self._loaded.wait(timeout)
+        return self.current is not None
+
+    def ensure_loaded(self, sources) -> DataSnapshot:
+        """
+        Returns the current snapshot after loading those of `sources` it does
+        not hold yet, i.e. lazy sources on their first use. Raises IngestionError
+        if one of them fails to load, RuntimeError if nothing is loaded yet.
+        """
+        if self.current is None:
+            raise RuntimeError("Datasets are not loaded yet")
+        if not self.current.missing_sources(sources):
+            return self.current
+        with self._lazy_lock:
+            missing = self.current.missing_sources(sources)
+            if missing:
+                snapshot = self.reload(missing)
+                if snapshot.missing_sources(missing):
+                    raise self.last_reload_error or RuntimeError(f"Could not load: {', '.join(missing)}")
+            return self.current
+
+    def status(self) -> dict:
+        """
+        Readiness report: {"ready", "generation", "sources": {source: {"state",
+        "error"}}}. Ready once a snapshot is published, even while lazy sources
+        are not loaded yet.
+        """
+        return {
+            "ready": self.current is not None,
+            "generation": self.current.generation if self.current is not None else None,
+            "sources": {
+                source: {"state": state, "error": self.source_errors.get(source)}
+                for source, state in self.source_state.items()
+            },
+        }
+
+    def reload(self, sources=None) -> DataSnapshot:
+        """
+        Rebuilds the given sources (all if None), keeps the other sections of the
+        current snapshot, and atomically publishes the result. Returns the
+        snapshot in effect afterwards.
+        """
+        with self._reload_lock, self._shared_lock():
+            self._sync_shared()
+            previous = self.current
+            if previous is None:
+                # Nothing loaded yet (the first load failed): load as load() would.
+                unified, report = self._build([source for source in SOURCE_SECTIONS if source not in self.lazy_sources])
+                self._set_current(DataSnapshot(unified, report, keep_raw=not self.compact))
+                self._mark_loaded()
+                self.load_error = None
+                return self.current
+
+            sources = [source for source in SOURCE_SECTIONS if sources is None or source in sources]
+            if "csv" in sources and self._csv_was_appended():
+                sources.remove("csv")
+                self._append_csv_tail()
+                previous = self.current
+                if not sources:
+                    return previous
+            try:
+                changed, changed_report = self._build(sources)
+            except IngestionError as e:
+                self.last_reload_error = e
+                return previous
+
+            unified = dict(previous.unified)
+            unified.update(changed)
+            report = dict(previous.report)
+            report.update(changed_report)
+            self._set_current(DataSnapshot(unified, report, previous.generation + 1,
+                                           previous=previous, changed_sources=sources, keep_raw=not self.compact),
+                              changed=[key for source in sources for key in SOURCE_SECTIONS[source]])
+            self._mark_loaded()
+            self.last_reload_error = None
+            return self.current
+
+    def _append_csv_tail(self):
+        """Processes only the lines appended to the CSV since it was last read."""
+        rows, offset = self.ingestion.read_csv_tail(self._csv_offset)
+        if not rows.empty:
+            self._publish_appended(rows)
+        self._mark_csv_read(offset, appended=True)
+
+    def _publish_appended(self, raw_rows: pd.DataFrame):
+        processed = DataProcessor(None, csv_df=raw_rows).process_membership_data()
+        self._set_current(self.current.with_appended_membership(processed), changed=["membership_activity"])
+
+    def append_membership_rows(self, rows: pd.DataFrame) -> DataSnapshot:
+        """
+        Appends raw membership rows (CSV columns, any case) to the current data.
+        Only the new rows go through the membership pipeline. The rows are held
+        in memory; a full reload of the CSV replaces them.
+        Raises ValueError if required columns are missing.
+        """
+        columns = [col.strip().lower() for col in rows.columns]
+        missing = [col for col in ["date", "membership_id", "membership_type", "activity",
+                                   "duration (minutes)", "location"] if col not in columns]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+        with self._reload_lock, self._shared_lock():
+            self._sync_shared()
+            self._publish_appended(rows)
+            return self.current
+
+    def start_watching(self, interval: float = 2.0):
+        """
+        Starts a background DatasetWatcher that reloads changed sources. With a
+        shared store only the loader process watches the files; every process
+        also follows the store's generations and takes over as loader if the
+        loader process exits.
+        """
+        if self.shared_store is not None:
+            if self._follower is None:
+                self._stop_following.clear()
+                self._follower = threading.Thread(target=self._follow, args=(interval,),
+                                                  name="shared-dataset-follower", daemon=True)
+                self._follower.start()
+            if not self.shared_store.is_loader:
+                return
+        if self._watcher is None:
+            self._watcher = DatasetWatcher(self.ingestion, self.reload, interval=interval)
+            self._watcher.start()
+
+    def _follow(self, interval: float):
+        while not self._stop_following.wait(interval):
+            try:
+                if self._watcher is None and self.shared_store.try_acquire_loader():
+                    self.start_watching(interval)
+                if self.shared_store.current_generation() > self.current.generation:
+                    with self._reload_lock:
+                        self._sync_shared()
+            except Exception:
+                logger.exception("Error following shared dataset")
+
+    def stop_watching(self):
+        """Stops the background watcher and shared-store follower, if running."""
+        if self._follower is not None:
+            self._stop_following.set()
+            self._follower.join()
+            self._follower = None
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+
+class DatasetWatcher:
+    """
+    Polls the source files of a DataIngestion and calls `on_change(sources)` with
+    the sources whose files changed. A change is reported only once the file's
+    size and mtime have stayed the same for one full interval, so files that are
+    still being written are not picked up half-way.
+    """
+
+    def __init__(self, ingestion, on_change, interval: float = 2.0):
+        self.ingestion = ingestion
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._seen = self._stat_all()
+
+    def _stat_all(self) -> dict:
+        stats = {}
+        for source in SOURCE_SECTIONS:
+            try:
+                # Every file of a glob pattern; files appearing or disappearing count as a change.
+                stats[source] = tuple(
+                    (path, stat.st_size, stat.st_mtime_ns)
+                    for path in self.ingestion.source_files(source) for stat in [os.stat(path)]
+                )
+            except OSError:
+                stats[source] = None
+        return stats
+
+    def poll(self, pending: dict) -> list:
+        """
+        Checks the files once. `pending` maps sources seen changing to their latest
+        stat; returns the sources whose change has settled and should be reloaded.
+        """
+        current = self._stat_all()
+        ready = []
+        for source, stat in current.items():
+            if stat == self._seen.get(source):
+                pending.pop(source, None)
+            elif pending.get(source) == stat and stat is not None:
+                ready.append(source)
+            else:
+                pending[source] = stat
+        for source in ready:
+            self._seen[source] = pending.pop(source)
+        return ready
+
+    def _run(self):
+        pending = {}
+        while not self._stop.wait(self.interval):
+            ready = self.poll(pending)
+            if ready:
+                try:
+                    self.on_change(ready)
+                except Exception:
+                    logger.exception("Error reloading datasets")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="dataset-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
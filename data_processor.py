@@ -1,4 +1,16 @@
+import datetime
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+from metrics import metrics
+
+# Sections of the unified dataset produced from each raw source, in merge order.
+SOURCE_SECTIONS = {
+    "json": ["company_info", "employee_data", "company_performance"],
+    "csv": ["membership_activity"],
+    "pdf": ["aggregated_performance"],
+    "pptx": ["presentation"],
+}
 
 
 class DataProcessor:
@@ -6,48 +18,71 @@ class DataProcessor:
     Processes and merges data from multiple sources into a unified composite structure.
     """
 
+    # Low-cardinality membership columns stored as pandas categoricals.
+    MEMBERSHIP_CATEGORY_COLUMNS = ["membership_type", "activity", "location"]
+    QUARTER_LABELS = ["Q1", "Q2", "Q3", "Q4"]
+    # Constructor argument holding each raw source.
+    SOURCE_ARGUMENTS = {"json": "json_data", "csv": "csv_df", "pdf": "pdf_data", "pptx": "pptx_data"}
+
     def __init__(self, json_data: dict, csv_df: pd.DataFrame = None,
-                 pdf_data: list = None, pptx_data: dict = None):
+                 pdf_data: list = None, pptx_data: dict = None, csv_chunks=None, json_companies=None):
         """
         Parameters:
           json_data: Dictionary containing company data (with nested employees and performance).
           csv_df: DataFrame for detailed membership activity.
           pdf_data: List of dictionaries representing the aggregated quarterly performance report.
           pptx_data: Dictionary with presentation summary (summary_metrics, quarterly_metrics, revenue_breakdown).
+          csv_chunks: Optional iterable of membership DataFrame chunks (see
+            DataIngestion.iter_csv_chunks), used instead of csv_df. It is consumed once.
+          json_companies: Optional iterable of company dicts (see
+            DataIngestion.iter_json_companies), used instead of json_data. It is consumed once.
         """
         self.json_data = json_data
         self.csv_df = csv_df
+        self.csv_chunks = csv_chunks
+        self.json_companies = json_companies
         self.pdf_data = pdf_data
         self.pptx_data = pptx_data
 
+    @metrics.stage("process_json_data", rows=lambda result: len(result["companies"]))
     def process_json_data(self) -> dict:
         """
-        Processes the company JSON data:
-          - Flattens company-level data.
-          - Extracts employee records.
+        Processes the company JSON data in a single pass over the companies:
+          - Flattens company-level data (nested dicts become prefix_key columns).
+          - Extracts employee records, tagged with their company id.
           - Converts the performance dict (per company) into a list of records.
+        The companies are taken from json_data or, if it is None, from json_companies,
+        so a streamed file is never held in memory as a whole document. The tables
+        match pd.json_normalize of the companies (and of their employees).
         """
-        # Normalize company-level data
-        companies = pd.json_normalize(self.json_data["companies"], sep="_")
-
-        # Normalize employees data (keeping a reference to the company id)
-        employees = pd.json_normalize(
-            self.json_data["companies"],
-            "employees",
-            ["id"],
-            meta_prefix="company_"
-        )
-
-        # Process performance: convert each company's performance dict into a list of records.
+        companies_source = self.json_companies if self.json_data is None else self.json_data["companies"]
+        company_rows = []
+        employee_rows = []
+        employee_company_ids = []
         performance_records = []
-        for company in self.json_data["companies"]:
+        for company in companies_source:
+            company_rows.append(_flatten_record(company, "_"))
             comp_id = company.get("id")
+
+            # Employees; like json_normalize, every company must have the key.
+            employees = company["employees"] or []
+            for employee in employees:
+                employee_rows.append(_flatten_record(employee, ".") if isinstance(employee, dict) else employee)
+            employee_company_ids.extend([comp_id] * len(employees))
+
+            # Performance: one record per quarter.
             perf = company.get("performance")
             if isinstance(perf, dict):
-                for quarter, metrics in perf.items():
+                for quarter, quarter_metrics in perf.items():
                     record = {"company_id": comp_id, "quarter": quarter}
-                    record.update(metrics)
+                    record.update(quarter_metrics)
                     performance_records.append(record)
+
+        companies = pd.DataFrame(company_rows)
+        employees = pd.DataFrame(employee_rows)
+        if "company_id" in employees.columns:
+            raise ValueError("Conflicting metadata name company_id, need distinguishing prefix ")
+        employees["company_id"] = np.array(employee_company_ids, dtype=object)
         performance = pd.DataFrame(performance_records)
 
         return {
@@ -56,23 +91,50 @@ class DataProcessor:
             "performance": performance
         }
 
+    @metrics.stage("process_membership_data")
     def process_membership_data(self) -> pd.DataFrame:
         """
         Processes detailed membership activity from CSV.
-        Converts the 'date' column to a Python date object, then extracts year and quarter
-        using standard Python methods.
+        The 'date' column is kept as datetime64 and year/quarter are derived with
+        vectorized datetime accessors. Low-cardinality columns become categoricals.
+        When the processor was given csv_chunks, the chunks are processed one at a time.
+        """
+        if self.csv_df is None and self.csv_chunks is not None:
+            return self.process_membership_chunks(self.csv_chunks)
+        return self._process_membership_frame(self.csv_df.copy())
+
+    def process_membership_chunks(self, chunks) -> pd.DataFrame:
+        """
+        Processes membership activity chunk by chunk. Each chunk is transformed in
+        place (no copy) and the compact results are concatenated once at the end.
         """
-        df = self.csv_df.copy()
+        processed = [self._process_membership_frame(chunk) for chunk in chunks]
+        if not processed:
+            return self._process_membership_frame(pd.DataFrame(columns=[
+                "date", "membership_id", "membership_type", "activity",
+                "revenue", "duration (minutes)", "location"
+            ]))
+        return concat_categorical_frames(processed)
 
+    def _process_membership_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies the membership transformations to a frame the processor owns,
+        modifying it in place.
+        """
         # Standardize column names to lowercase.
         df.columns = [col.strip().lower() for col in df.columns]
 
-        # Convert the 'date' column to datetime then extract the date portion.
-        df["date"] = pd.to_datetime(df["date"]).dt.date
+        # Parse dates as datetime64, truncated to the day.
+        df["date"] = pd.to_datetime(df["date"]).dt.normalize()
+
+        # Extract year and quarter without leaving datetime64.
+        year = df["date"].dt.year
+        df["year"] = year.astype("int16") if not year.isna().any() else year
+        quarter_codes = df["date"].dt.quarter.fillna(0).astype("int8") - 1
+        df["quarter"] = pd.Categorical.from_codes(quarter_codes, categories=self.QUARTER_LABELS)
 
-        # Extract year and quarter from the Python date objects.
-        df["year"] = df["date"].apply(lambda d: d.year)
-        df["quarter"] = df["date"].apply(lambda d: f"Q{((d.month - 1) // 3) + 1}")
+        for col in self.MEMBERSHIP_CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
 
         # Process revenue
         if "revenue" in df.columns:
@@ -86,6 +148,7 @@ class DataProcessor:
         ]
         return df[expected_cols]
 
+    @metrics.stage("process_aggregated_report")
     def process_aggregated_report(self) -> pd.DataFrame:
         """
         Processes the aggregated quarterly performance report from the PDF.
@@ -101,6 +164,7 @@ class DataProcessor:
         df["Avg Duration (Minutes)"] = pd.to_numeric(df["Avg Duration (Minutes)"], errors="coerce")
         return df
 
+    @metrics.stage("process_pptx_data")
     def process_pptx_data(self) -> dict:
         """
         Processes the PPTX data which is already structured as a composite dictionary.
@@ -114,7 +178,7 @@ class DataProcessor:
         # Convert revenue in quarterly_metrics to float, if present.
         if "quarterly_metrics" in pptx:
             for record in pptx["quarterly_metrics"]:
-                if "Revenue (in $)" in record:
+                if isinstance(record.get("Revenue (in $)"), str):
                     record["Revenue (in $)"] = float(record["Revenue (in $)"].replace(",", ""))
         return pptx
 
@@ -145,8 +209,130 @@ class DataProcessor:
             "presentation": presentation
         }
 
+    def process_source(self, source: str) -> dict:
+        """
+        Processes a single raw source and returns only the unified sections it
+        produces (see SOURCE_SECTIONS), so one source can be rebuilt on its own.
+        """
+        if source == "json":
+            json_data = self.process_json_data()
+            return {
+                "company_info": json_data["companies"],
+                "employee_data": json_data["employees"],
+                "company_performance": json_data["performance"]
+            }
+        if source == "csv":
+            return {"membership_activity": self.process_membership_data()}
+        if source == "pdf":
+            return {"aggregated_performance": self.process_aggregated_report()}
+        if source == "pptx":
+            return {"presentation": self.process_pptx_data()}
+        raise ValueError(f"Unknown source: {source}")
+
     def process_all(self) -> dict:
         """
         Single entry point to process and merge all data sources.
         """
         return self.merge_all_data()
+
+
+def _flatten_record(record: dict, sep: str) -> dict:
+    """
+    Flattens one JSON record the way pd.json_normalize does: top-level values
+    that are not dicts come first, followed by the nested dicts' values under
+    keys joined with `sep`. Lists are kept as they are. A record without nested
+    dicts is returned as is rather than copied.
+    """
+    if not any(isinstance(value, dict) for value in record.values()):
+        return record
+    flat = {key: value for key, value in record.items() if not isinstance(value, dict)}
+
+    def add_nested(value: dict, prefix: str):
+        for key, item in value.items():
+            name = f"{prefix}{sep}{key}"
+            if isinstance(item, dict):
+                add_nested(item, name)
+            else:
+                flat[name] = item
+
+    for key, value in record.items():
+        if isinstance(value, dict):
+            add_nested(value, key)
+    return flat
+
+
+def concat_categorical_frames(frames: list) -> pd.DataFrame:
+    """
+    Concatenates frames that share columns, keeping categorical columns
+    categorical even when each frame has its own set of categories. The merged
+    categories are sorted, as astype("category") sorts them, so the result does
+    not depend on where the frames were split.
+    """
+    first = frames[0]
+    columns = {}
+    for col in first.columns:
+        if isinstance(first[col].dtype, pd.CategoricalDtype):
+            columns[col] = union_categoricals([frame[col] for frame in frames], sort_categories=True,
+                                              ignore_order=True)
+        elif isinstance(first[col].dtype, pd.StringDtype):
+            # Keep compact string columns (see compact_frame()) compact.
+            columns[col] = pd.concat([frame[col].astype(first[col].dtype) for frame in frames], ignore_index=True)
+        else:
+            columns[col] = pd.concat([frame[col] for frame in frames], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def _parse_iso_dates(series: pd.Series):
+    """The series as datetime64, or None if any value is not a valid date (e.g. "2024-02-30")."""
+    try:
+        return pd.to_datetime(series, format="%Y-%m-%d", errors="raise")
+    except (ValueError, OverflowError):
+        return None
+
+
+# An object column becomes categorical when it has at most this share of distinct values.
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+_ISO_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns `df` with smaller dtypes that encode to the same JSON:
+      - string columns of valid ISO dates ("YYYY-MM-DD") and Python dates become datetime64;
+      - other repetitive string columns become categoricals, the rest pyarrow-backed strings;
+      - integer columns are downcast to the smallest integer type holding their values;
+      - float columns are downcast to float32 only where that loses nothing.
+    Columns holding lists or dicts (e.g. the nested employees list) are left as they are.
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            values = series.dropna()
+            if values.empty:
+                continue
+            if values.map(type).isin([datetime.date]).all():
+                columns[col] = pd.to_datetime(series)
+            elif not values.map(lambda v: isinstance(v, str)).all():
+                continue
+            elif values.str.match(_ISO_DATE_PATTERN).all() and (dates := _parse_iso_dates(series)) is not None:
+                columns[col] = dates
+            elif values.nunique() <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+                columns[col] = series.astype("category")
+            else:
+                columns[col] = series.astype("string[pyarrow]")
+        elif pd.api.types.is_integer_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            downcast = pd.to_numeric(series, downcast="integer")
+            if downcast.dtype != series.dtype:
+                columns[col] = downcast
+        elif series.dtype == np.float64:
+            downcast = series.astype(np.float32)
+            if downcast.astype(np.float64).equals(series):
+                columns[col] = downcast
+    return df.assign(**columns) if columns else df
+
+
+def compact_sections(sections: dict) -> dict:
+    """Applies compact_frame() to every DataFrame in a dict of unified sections."""
+    return {key: compact_frame(value) if isinstance(value, pd.DataFrame) else value
+            for key, value in sections.items()}
@@ -0,0 +1,593 @@
+import numpy as np
+import pandas as pd
+
+
+def parse_fields(fields: str, columns) -> list:
+    """
+    Parses a comma-separated `fields=` projection into a list of column names.
+    Raises ValueError if any requested column does not exist.
+    """
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in columns]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return selected
+
+
+def parse_sort(sort: str, columns) -> tuple:
+    """
+    Parses a comma-separated `sort=` expression such as "year,-revenue".
+    A leading '-' sorts that column in descending order.
+    Returns (columns, ascending flags). Raises ValueError for unknown columns.
+    """
+    by, ascending = [], []
+    for key in sort.split(","):
+        key = key.strip()
+        if not key:
+            continue
+        desc = key.startswith("-")
+        name = key[1:] if desc else key
+        if name not in columns:
+            raise ValueError(f"Unknown sort field: {name}")
+        by.append(name)
+        ascending.append(not desc)
+    return by, ascending
+
+
+def select_page(df: pd.DataFrame, fields: str = None, sort: str = None,
+                offset: int = 0, limit: int = None) -> tuple:
+    """
+    Applies sort, pagination and column projection to a section DataFrame.
+    Sorting is stable so that pages stay consistent across requests.
+    Returns (page DataFrame, total row count).
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset and limit must be non-negative")
+
+    columns = parse_fields(fields, df.columns) if fields else None
+    if sort:
+        by, ascending = parse_sort(sort, df.columns)
+        if by:
+            df = df.sort_values(by=by, ascending=ascending, kind="stable")
+
+    end = None if limit is None else offset + limit
+    page = df.iloc[offset:end]
+    if columns is not None:
+        page = page[columns]
+    return page, len(df)
+
+
+def _check_group_by(group_by: list):
+    """Raises ValueError if a grouping column is listed more than once."""
+    duplicates = sorted({col for col in group_by if group_by.count(col) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate group_by value(s): {', '.join(duplicates)}")
+
+
+class MembershipQueryEngine:
+    """
+    Server-side filtering and aggregation over the membership activity frame.
+
+    Indexes are built once from the processed frame:
+      - categorical codes for the low-cardinality columns (membership_type,
+        activity, location), so equality filters compare small integers;
+      - a sorted date index, so date ranges are answered with a binary search
+        instead of a scan over every row.
+    """
+
+    CATEGORY_COLUMNS = ["membership_type", "activity", "location"]
+    GROUP_COLUMNS = ["year", "quarter", "location", "membership_type", "activity"]
+    METRIC_COLUMNS = ["revenue", "duration (minutes)"]
+    AGGREGATIONS = ["sum", "mean", "count"]
+
+    def __init__(self, df: pd.DataFrame):
+        if not df.index.equals(pd.RangeIndex(len(df))):
+            df = df.reset_index(drop=True)
+        self.df = df
+        self._index_categories()
+
+        dates = self._dates(self.df)
+        self._date_order = np.argsort(dates, kind="stable")
+        self._sorted_dates = dates[self._date_order]
+
+    def _index_categories(self):
+        self._categories = {}
+        self._codes = {}
+        for col in self.CATEGORY_COLUMNS:
+            cat = pd.Categorical(self.df[col])
+            self._categories[col] = cat.categories
+            self._codes[col] = cat.codes
+
+    @staticmethod
+    def _dates(df: pd.DataFrame) -> np.ndarray:
+        return pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[ns]")
+
+    def appended(self, df: pd.DataFrame) -> "MembershipQueryEngine":
+        """
+        Returns an engine for `df`, a frame whose leading rows are this engine's
+        rows followed by newly appended ones. The sorted date index is extended
+        by merging in the new dates instead of re-sorting every row; this engine
+        is left unchanged.
+        """
+        n_old = len(self.df)
+        engine = MembershipQueryEngine.__new__(MembershipQueryEngine)
+        engine.df = df.reset_index(drop=True) if not df.index.equals(pd.RangeIndex(len(df))) else df
+        engine._index_categories()
+
+        new_dates = self._dates(engine.df.iloc[n_old:])
+        new_order = np.argsort(new_dates, kind="stable")
+        new_sorted = new_dates[new_order]
+        insert_at = np.searchsorted(self._sorted_dates, new_sorted, side="right")
+        engine._sorted_dates = np.insert(self._sorted_dates, insert_at, new_sorted)
+        engine._date_order = np.insert(self._date_order, insert_at, new_order + n_old)
+        return engine
+
+    def categories(self, column: str) -> list:
+        """Returns the distinct values of an indexed categorical column."""
+        return list(self._categories[column])
+
+    def _date_positions(self, date_from=None, date_to=None) -> np.ndarray:
+        """Row positions whose date falls in [date_from, date_to] (inclusive)."""
+        lo, hi = 0, len(self._sorted_dates)
+        if date_from is not None:
+            start = pd.Timestamp(date_from).to_datetime64()
+            lo = np.searchsorted(self._sorted_dates, start, side="left")
+        if date_to is not None:
+            end = (pd.Timestamp(date_to) + pd.Timedelta(days=1)).to_datetime64()
+            hi = np.searchsorted(self._sorted_dates, end, side="left")
+        return np.sort(self._date_order[lo:max(lo, hi)])
+
+    def positions(self, membership_type=None, activity=None, location=None,
+                  date_from=None, date_to=None, search=None) -> np.ndarray:
+        """
+        Returns the row positions matching all of the given filters.
+        Categorical filters accept a single value or a list of values; `search`
+        keeps rows whose membership ID, type, activity or location contains the
+        text (case-insensitive).
+        """
+        filters = {"membership_type": membership_type, "activity": activity, "location": location}
+        if date_from is not None or date_to is not None:
+            positions = self._date_positions(date_from, date_to)
+        else:
+            positions = np.arange(len(self.df))
+
+        for col, values in filters.items():
+            if values is None:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            wanted = self._categories[col].get_indexer(list(values))
+            wanted = wanted[wanted >= 0]
+            positions = positions[np.isin(self._codes[col][positions], wanted)]
+        if search:
+            positions = positions[self._search_mask(search, positions)]
+        return positions
+
+    def _search_mask(self, text: str, positions: np.ndarray) -> np.ndarray:
+        """Which of `positions` contain `text` in a searchable column; categories are matched once per value."""
+        needle = text.lower()
+        ids = self.df["membership_id"].iloc[positions].astype("string").str.lower()
+        mask = ids.str.contains(needle, regex=False).fillna(False).to_numpy(dtype=bool)
+        for col in self.CATEGORY_COLUMNS:
+            names = self._categories[col].astype(str).str.lower()
+            hits = np.flatnonzero(names.str.contains(needle, regex=False))
+            mask |= np.isin(self._codes[col][positions], hits)
+        return mask
+
+    def filter(self, **filters) -> pd.DataFrame:
+        """Returns the membership rows matching the given filters."""
+        if all(v is None for v in filters.values()):
+            return self.df
+        return self.df.iloc[self.positions(**filters)]
+
+    def aggregate(self, group_by=None, metrics=None, aggregations=None, **filters) -> pd.DataFrame:
+        """
+        Groups the filtered rows and aggregates the metric columns.
+        Output columns are named "<metric>_<aggregation>", e.g. "revenue_sum".
+        Raises ValueError for unsupported group, metric or aggregation names.
+        """
+        group_by = list(group_by or ["year", "quarter"])
+        metrics = list(metrics or self.METRIC_COLUMNS)
+        aggregations = list(aggregations or self.AGGREGATIONS)
+        for name, allowed in ((group_by, self.GROUP_COLUMNS),
+                              (metrics, self.METRIC_COLUMNS),
+                              (aggregations, self.AGGREGATIONS)):
+            unknown = [n for n in name if n not in allowed]
+            if unknown:
+                raise ValueError(f"Unsupported value(s): {', '.join(unknown)}")
+        _check_group_by(group_by)
+
+        if all(v is None for v in filters.values()):
+            positions, rows = None, self.df
+        else:
+            positions = self.positions(**filters)
+            rows = self.df.iloc[positions]
+
+        # Group categorical columns by their precomputed codes rather than by string value.
+        keys = []
+        for col in group_by:
+            if col in self._codes:
+                codes = self._codes[col] if positions is None else self._codes[col][positions]
+                values = pd.Categorical.from_codes(codes, self._categories[col])
+                keys.append(pd.Series(values, index=rows.index, name=col))
+            else:
+                keys.append(rows[col])
+        result = rows[metrics].groupby(keys, observed=True, sort=True).agg(aggregations)
+        result.columns = [f"{metric}_{agg}" for metric, agg in result.columns]
+        return result.reset_index()
+
+
+class MembershipAggregates:
+    """
+    Materialized rollup cube of the membership activity frame: revenue and
+    duration totals and row counts per year, quarter, location, membership
+    type and activity.
+
+    The base table stores sums and non-null counts, so it can be updated from
+    newly appended rows alone, and means can be rolled up. Coarser groupings
+    (cuboids, e.g. per year and location) are computed from the smallest finer
+    cuboid already materialized, never from the row-level data, and kept for
+    later queries. Rows with a null dimension value are kept under a null key,
+    so coarser groupings still count them; groups whose own key is null are
+    left out of results, as MembershipQueryEngine.aggregate() leaves them out.
+    """
+
+    DIMENSIONS = MembershipQueryEngine.GROUP_COLUMNS
+    METRIC_COLUMNS = MembershipQueryEngine.METRIC_COLUMNS
+
+    def __init__(self, df: pd.DataFrame = None, table: pd.DataFrame = None):
+        if table is None:
+            table = self._summarize(df)
+        self.table = table
+        # dimensions (in DIMENSIONS order) -> summed table
+        self._cuboids = {tuple(self.DIMENSIONS): table}
+
+    @classmethod
+    def _summarize(cls, df: pd.DataFrame) -> pd.DataFrame:
+        named = {}
+        for metric in cls.METRIC_COLUMNS:
+            named[f"{metric}_sum"] = (metric, "sum")
+            named[f"{metric}_count"] = (metric, "count")
+        named["rows"] = (cls.METRIC_COLUMNS[0], "size")
+        table = df.groupby(cls.DIMENSIONS, observed=True, sort=True, dropna=False).agg(**named)
+        table.index = table.index.set_levels(
+            [level.astype(object) for level in table.index.levels]
+        )
+        return table
+
+    def updated(self, rows: pd.DataFrame) -> "MembershipAggregates":
+        """
+        Returns the aggregates with `rows` (newly appended, processed rows) added.
+        Only the new rows are grouped; this object is left unchanged.
+        """
+        delta = self._summarize(rows)
+        if delta.empty:
+            return self
+        table = pd.concat([self.table, delta]).groupby(level=self.DIMENSIONS, sort=True, dropna=False).sum()
+        return MembershipAggregates(table=table)
+
+    def covers(self, group_by) -> bool:
+        """True if a grouping can be answered from the materialized table."""
+        return set(group_by) <= set(self.DIMENSIONS)
+
+    def cuboid(self, dimensions) -> pd.DataFrame:
+        """
+        Returns the summed table grouped by `dimensions` (a non-empty subset of
+        DIMENSIONS), indexed in DIMENSIONS order. Raises ValueError for other
+        dimensions.
+        """
+        key = tuple(d for d in self.DIMENSIONS if d in set(dimensions))
+        if not key or len(key) != len(set(dimensions)):
+            raise ValueError(f"Cannot roll up by: {', '.join(dimensions)}")
+        table = self._cuboids.get(key)
+        if table is None:
+            parent = min((t for k, t in self._cuboids.items() if set(key) <= set(k)), key=len)
+            table = parent.groupby(level=list(key), sort=True, dropna=False).sum()
+            self._cuboids[key] = table
+        keys = table.index.to_frame(index=False)
+        return table[keys.notna().all(axis=1).to_numpy()]
+
+    def rollup(self, group_by=None, metrics=None, aggregations=None) -> pd.DataFrame:
+        """
+        Answers an unfiltered MembershipQueryEngine.aggregate() call from the
+        materialized cube. Output columns use the same "<metric>_<aggregation>" names.
+        """
+        group_by = list(group_by or ["year", "quarter"])
+        metrics = list(metrics or self.METRIC_COLUMNS)
+        aggregations = list(aggregations or MembershipQueryEngine.AGGREGATIONS)
+        if not self.covers(group_by):
+            raise ValueError(f"Cannot roll up by: {', '.join(group_by)}")
+        _check_group_by(group_by)
+        unknown = [m for m in metrics if m not in self.METRIC_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unsupported value(s): {', '.join(unknown)}")
+
+        totals = self.cuboid(group_by)
+        if list(totals.index.names) != group_by:
+            totals = totals.reorder_levels(group_by).sort_index()
+        result = pd.DataFrame(index=totals.index)
+        for metric in metrics:
+            for agg in aggregations:
+                if agg == "sum":
+                    result[f"{metric}_sum"] = totals[f"{metric}_sum"]
+                elif agg == "count":
+                    result[f"{metric}_count"] = totals[f"{metric}_count"]
+                elif agg == "mean":
+                    result[f"{metric}_mean"] = totals[f"{metric}_sum"] / totals[f"{metric}_count"]
+                else:
+                    raise ValueError(f"Unsupported value(s): {agg}")
+        return result.reset_index()
+
+
+def _lookup_key(value):
+    """Hash index key of a column value or lookup parameter: ids match as text ("1" finds 1 and 1.0)."""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value)
+
+
+class CompanyIndex:
+    """
+    Point and range lookups over the company and employee frames.
+
+    Indexes are built once from the processed frames:
+      - hash indexes (dicts of row positions) for company ids, employee ids,
+        employees' company_id and role, so each lookup is a dict access;
+      - a sorted hired_date index, so date ranges are answered with a binary
+        search.
+    Ids are matched as text, so query parameters can be passed as they arrive.
+    """
+
+    def __init__(self, companies: pd.DataFrame, employees: pd.DataFrame):
+        self.companies = companies if companies.index.equals(pd.RangeIndex(len(companies))) \
+            else companies.reset_index(drop=True)
+        self.employees = employees if employees.index.equals(pd.RangeIndex(len(employees))) \
+            else employees.reset_index(drop=True)
+        self._company_ids = self._hash_index(self.companies, "id")
+        self._employee_ids = self._hash_index(self.employees, "id")
+        self._employer_ids = self._hash_index(self.employees, "company_id")
+        self._roles = self._hash_index(self.employees, "role")
+
+        if "hired_date" in self.employees.columns:
+            dates = pd.to_datetime(self.employees["hired_date"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+        else:
+            dates = np.full(len(self.employees), np.datetime64("NaT"), dtype="datetime64[ns]")
+        self._hired_dates = dates
+        dated = np.flatnonzero(~np.isnat(dates))
+        self._hired_order = dated[np.argsort(dates[dated], kind="stable")]
+        self._sorted_hired_dates = dates[self._hired_order]
+
+    @staticmethod
+    def _hash_index(df: pd.DataFrame, column: str) -> dict:
+        """{key: sorted row positions} for the non-null values of a column."""
+        if column not in df.columns:
+            return {}
+        codes, uniques = pd.factorize(df[column])
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        index = {}
+        for code, value in enumerate(uniques):
+            rows = order[bounds[code]:bounds[code + 1]]
+            key = _lookup_key(value)
+            # Values with the same text (e.g. 1 and "1") share one entry.
+            index[key] = np.union1d(index[key], rows) if key in index else rows
+        return index
+
+    def _lookup(self, index: dict, values) -> np.ndarray:
+        if isinstance(values, (str, int)):
+            values = [values]
+        found = [index[key] for key in map(_lookup_key, values) if key in index]
+        if not found:
+            return np.array([], dtype=int)
+        return found[0] if len(found) == 1 else np.unique(np.concatenate(found))
+
+    def company(self, company_id) -> pd.DataFrame:
+        """Returns the company rows with the given id (normally one)."""
+        return self.companies.iloc[self._lookup(self._company_ids, company_id)]
+
+    def employee(self, employee_id) -> pd.DataFrame:
+        """Returns the employee rows with the given id (normally one)."""
+        return self.employees.iloc[self._lookup(self._employee_ids, employee_id)]
+
+    def _hired_positions(self, hired_from=None, hired_to=None) -> np.ndarray:
+        """Row positions whose hired_date falls in [hired_from, hired_to] (inclusive)."""
+        lo, hi = 0, len(self._sorted_hired_dates)
+        if hired_from is not None:
+            start = pd.Timestamp(hired_from).to_datetime64()
+            lo = np.searchsorted(self._sorted_hired_dates, start, side="left")
+        if hired_to is not None:
+            end = (pd.Timestamp(hired_to) + pd.Timedelta(days=1)).to_datetime64()
+            hi = np.searchsorted(self._sorted_hired_dates, end, side="left")
+        return np.sort(self._hired_order[lo:max(lo, hi)])
+
+    def employee_positions(self, company_id=None, role=None, hired_from=None, hired_to=None) -> np.ndarray:
+        """
+        Returns the employee row positions matching all of the given filters.
+        company_id and role accept a single value or a list of values.
+        """
+        dated = hired_from is not None or hired_to is not None
+        candidates = None
+        for index, values in ((self._employer_ids, company_id), (self._roles, role)):
+            if values is None:
+                continue
+            positions = self._lookup(index, values)
+            candidates = positions if candidates is None else np.intersect1d(candidates, positions)
+        if candidates is None:
+            return self._hired_positions(hired_from, hired_to) if dated else np.arange(len(self.employees))
+        if dated:
+            # Check the few hash-matched rows against the range rather than intersecting with it.
+            dates = self._hired_dates[candidates]
+            keep = ~np.isnat(dates)
+            if hired_from is not None:
+                keep &= dates >= pd.Timestamp(hired_from).to_datetime64()
+            if hired_to is not None:
+                keep &= dates < (pd.Timestamp(hired_to) + pd.Timedelta(days=1)).to_datetime64()
+            candidates = candidates[keep]
+        return candidates
+
+    def filter_employees(self, **filters) -> pd.DataFrame:
+        """Returns the employee rows matching the given filters."""
+        if all(v is None for v in filters.values()):
+            return self.employees
+        return self.employees.iloc[self.employee_positions(**filters)]
+
+
+def performance_pivot(df: pd.DataFrame, value: str = "revenue") -> dict:
+    """
+    Pivots company performance records (company_id, quarter, value) into a
+    dense company x quarter grid for charting:
+      {"companies": [...], "quarters": [...],
+       <value>: rows of values per company (0 where missing),
+       "missing": rows of flags for cells with no record or a null value,
+       "zero": rows of flags for cells whose value is 0}
+    Companies and quarters keep their order of first appearance. If a company
+    has several records for one quarter, the first one is used.
+    """
+    if df.empty or not {"company_id", "quarter", value} <= set(df.columns):
+        empty = np.zeros((0, 0))
+        return {"companies": [], "quarters": [], value: empty, "missing": empty.astype(bool),
+                "zero": empty.astype(bool)}
+
+    company_codes, companies = pd.factorize(df["company_id"])
+    quarter_codes, quarters = pd.factorize(df["quarter"])
+    values = pd.to_numeric(df[value], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+    # One flat cell index per record; records without a company or quarter are dropped.
+    cells = company_codes * len(quarters) + quarter_codes
+    valid = np.flatnonzero((company_codes >= 0) & (quarter_codes >= 0))
+    _, first = np.unique(cells[valid], return_index=True)
+    records = valid[first]
+
+    grid = np.full(len(companies) * len(quarters), np.nan)
+    grid[cells[records]] = values[records]
+    grid = grid.reshape(len(companies), len(quarters))
+    missing = np.isnan(grid)
+    return {
+        "companies": companies.tolist(),
+        "quarters": quarters.tolist(),
+        value: np.where(missing, 0.0, grid),
+        "missing": missing,
+        "zero": grid == 0,
+    }
+
+
+# Reconciled metric -> column of the PDF report and PPTX quarterly metrics.
+RECONCILED_METRICS = {
+    "revenue": "Revenue (in $)",
+    "memberships_sold": "Memberships Sold",
+    "avg_duration": "Avg Duration (Minutes)",
+}
+
+
+def _reported_number(value):
+    """Number reported by a source (strings may contain thousands separators); None if missing."""
+    if isinstance(value, str):
+        value = value.replace(",", "").strip()
+    value = pd.to_numeric(value, errors="coerce")
+    return None if pd.isna(value) else float(value)
+
+
+def _check(source: str, metric: str, reported, computed, tolerance: float, **labels) -> dict:
+    """
+    Compares a value reported by `source` with the one computed from the cube.
+    Numbers match when they differ by at most `tolerance` relative to the
+    reported value; other values must be equal.
+    """
+    check = {"source": source, **labels, "metric": metric, "reported": reported, "computed": computed,
+             "difference": None}
+    if reported is None or computed is None:
+        check["match"] = False
+    elif isinstance(reported, str):
+        check["match"] = reported == computed
+    else:
+        check["difference"] = computed - reported
+        check["match"] = bool(abs(check["difference"]) <= tolerance * abs(reported))
+    return check
+
+
+def _period_metrics(totals: pd.DataFrame) -> dict:
+    """Reconciled metrics per index entry of a cuboid."""
+    revenue, duration = (f"{metric}_sum" for metric in MembershipQueryEngine.METRIC_COLUMNS)
+    duration_count = f"{MembershipQueryEngine.METRIC_COLUMNS[1]}_count"
+    return {
+        key: {
+            "revenue": float(row[revenue]),
+            "memberships_sold": float(row["rows"]),
+            "avg_duration": float(row[duration] / row[duration_count]) if row[duration_count] else None,
+        }
+        for key, row in totals.iterrows()
+    }
+
+
+def reconcile(aggregates: MembershipAggregates, aggregated_performance: pd.DataFrame, presentation: dict,
+              year: int = None, tolerance: float = 0.01) -> dict:
+    """
+    Diffs the membership cube against the pre-aggregated sources:
+      - the PDF report (aggregated_performance), per year and quarter;
+      - the PPTX quarterly metrics, per quarter of `year`, and its summary
+        metrics (total revenue and memberships sold, top location by revenue)
+        and revenue breakdown (percent of revenue per activity) for `year`.
+    The deck does not state its year; `year` defaults to the latest year of
+    the cube. Memberships sold are compared with row counts.
+
+    Returns {"year", "tolerance", "checks": [...], "mismatches"}, each check
+    holding the source, its labels, metric, reported and computed values,
+    their difference and whether they match. Periods present on only one
+    side are reported as mismatches with a None value.
+    """
+    periods = {}
+    if len(aggregates.table):
+        periods = _period_metrics(aggregates.cuboid(["year", "quarter"]))
+    checks = []
+
+    reported = {}
+    for row in aggregated_performance.to_dict(orient="records"):
+        reported[(int(row["Year"]), str(row["Quarter"]))] = row
+    for period in sorted(set(reported) | set(periods)):
+        computed = periods.get(period, {})
+        row = reported.get(period, {})
+        for metric, column in RECONCILED_METRICS.items():
+            checks.append(_check("pdf", metric, _reported_number(row.get(column)), computed.get(metric),
+                                 tolerance, year=period[0], quarter=period[1]))
+
+    if year is None and periods:
+        year = max(period[0] for period in periods)
+    presentation = presentation or {}
+    quarters = {quarter: metrics for (period_year, quarter), metrics in periods.items() if period_year == year}
+    reported = {str(row.get("Quarter")): row for row in presentation.get("quarterly_metrics", [])}
+    for quarter in sorted(set(reported) | set(quarters)):
+        computed = quarters.get(quarter, {})
+        row = reported.get(quarter, {})
+        for metric, column in RECONCILED_METRICS.items():
+            checks.append(_check("pptx", metric, _reported_number(row.get(column)), computed.get(metric),
+                                 tolerance, year=year, quarter=quarter))
+
+    summary = presentation.get("summary_metrics", {})
+    by_location, by_activity = {}, {}
+    if year is not None and quarters:
+        by_location = aggregates.cuboid(["year", "location"]).loc[year, "revenue_sum"]
+        by_activity = aggregates.cuboid(["year", "activity"]).loc[year, "revenue_sum"]
+    total_revenue = sum(metrics["revenue"] for metrics in quarters.values()) if quarters else None
+    total_sold = sum(metrics["memberships_sold"] for metrics in quarters.values()) if quarters else None
+    top_location = str(by_location.idxmax()) if len(by_location) else None
+    for metric, reported_value, computed in (
+        ("total_revenue", _reported_number(summary.get("Total Revenue")), total_revenue),
+        ("total_memberships_sold", _reported_number(summary.get("Total Memberships Sold")), total_sold),
+        ("top_location", summary.get("Top Location"), top_location),
+    ):
+        checks.append(_check("pptx", metric, reported_value, computed, tolerance, year=year))
+
+    breakdown = presentation.get("revenue_breakdown", {})
+    for activity in sorted(set(breakdown) | {str(a) for a in getattr(by_activity, "index", [])}):
+        share = None
+        if total_revenue:
+            share = float(by_activity.get(activity, 0.0)) / total_revenue * 100
+        checks.append(_check("pptx", "revenue_share", _reported_number(breakdown.get(activity)), share,
+                             tolerance, year=year, activity=activity))
+
+    return {
+        "year": year,
+        "tolerance": tolerance,
+        "checks": checks,
+        "mismatches": sum(not check["match"] for check in checks),
+    }
@@ -0,0 +1,318 @@
+import datetime
+import decimal
+import hashlib
+import json
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
+from metrics import metrics
+
+
+# Sections of the unified dataset, in the order they appear in /api/data.
+SECTION_KEYS = [
+    "company_info", "employee_data", "company_performance",
+    "membership_activity", "aggregated_performance", "presentation"
+]
+
+
+def format_date_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Renders datetime64 columns that only hold calendar dates (no time of day)
+    as "YYYY-MM-DD" strings, matching how Python date objects are encoded.
+    """
+    formatted = {}
+    for col in df.select_dtypes(include=["datetime"]).columns:
+        values = df[col].dropna()
+        if (values == values.dt.normalize()).all():
+            formatted[col] = df[col].dt.strftime("%Y-%m-%d")
+    return df.assign(**formatted) if formatted else df
+
+
+def convert_if_dataframe(item):
+    """
+    Converts a pandas DataFrame to a list of dictionaries,
+    replacing NaN/NA with None. If the item is not a DataFrame,
+    returns it unchanged.
+    """
+    if isinstance(item, pd.DataFrame):
+        return format_date_columns(item).replace({pd.NA: None, np.nan: None}).to_dict(orient="records")
+    return item
+
+
+# Rows encoded per orjson call by encode_frame(); bounds the transient row dicts.
+FRAME_ENCODE_CHUNK_ROWS = 10_000
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _encode_default(value):
+    """Handles the values orjson does not encode natively."""
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, pd.DataFrame):
+        return convert_if_dataframe(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _column_values(series: pd.Series) -> list:
+    """
+    A column as a list of values orjson encodes directly. Float NaN needs no
+    replacing (orjson writes it as null); date-only datetimes become "YYYY-MM-DD".
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = series.dropna()
+        if (values == values.dt.normalize()).all():
+            return series.dt.strftime("%Y-%m-%d").astype(object).where(series.notna(), None).tolist()
+        return [None if value is pd.NaT else value.isoformat() for value in series]
+    return series.tolist()
+
+
+def iter_frame_records(df: pd.DataFrame, chunk_rows: int = None):
+    """
+    Yields a DataFrame as lists of row dicts, chunk_rows rows at a time
+    (FRAME_ENCODE_CHUNK_ROWS by default), built from column lists whose
+    values encode_json() handles directly.
+    """
+    chunk_rows = chunk_rows or FRAME_ENCODE_CHUNK_ROWS
+    columns = [str(col) for col in df.columns]
+    for start in range(0, len(df), chunk_rows):
+        part = df.iloc[start:start + chunk_rows]
+        values = [_column_values(part.iloc[:, i]) for i in range(len(columns))]
+        yield [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    """
+    Encodes a DataFrame as a JSON array of row objects, column by column.
+    Values go from the column arrays straight into orjson, FRAME_ENCODE_CHUNK_ROWS
+    rows at a time, instead of through a records list and jsonable_encoder.
+    The output decodes to the same data as encode_json(convert_if_dataframe(df)).
+    """
+    chunks = [orjson.dumps(rows, default=_encode_default, option=_ORJSON_OPTIONS)[1:-1]
+              for rows in iter_frame_records(df)]
+    return b"[" + b",".join(chunks) + b"]"
+
+
+def encode_json(obj) -> bytes:
+    """
+    Encodes an object to compact UTF-8 JSON bytes with orjson. NumPy scalars
+    and arrays, dates and NaN/NA (as null) are handled natively; DataFrames,
+    at the top level or as values of a top-level dict, go through encode_frame().
+    """
+    if isinstance(obj, pd.DataFrame):
+        return encode_frame(obj)
+    if isinstance(obj, dict) and any(isinstance(value, pd.DataFrame) for value in obj.values()):
+        return b"{" + b",".join(
+            orjson.dumps(str(key)) + b":" + encode_json(value) for key, value in obj.items()
+        ) + b"}"
+    return orjson.dumps(obj, default=_encode_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with encode_json(), so handlers can return DataFrames
+    and NumPy values inside the content without converting them first.
+    """
+
+    def render(self, content) -> bytes:
+        return encode_json(content)
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Returns a strong ETag (quoted) derived from the content of the body.
+    """
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class _JoinedBytes(ABC):
+    """
+    Bytes assembled from parts on first use and kept afterwards: a list section
+    built from appended encoded arrays, or the joined /api/data payload.
+    Subclasses implement _join().
+    """
+
+    def __init__(self, parts: tuple):
+        self._parts = parts
+        self._value = None
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _join(self, parts: tuple) -> bytes:
+        """Returns the bytes made from `parts`."""
+
+    def parts(self) -> tuple:
+        """The parts, or the joined bytes as the only part once joined."""
+        with self._lock:
+            return (self._value,) if self._value is not None else self._parts
+
+    def get(self) -> bytes:
+        with self._lock:
+            if self._value is None:
+                self._value = self._join(self._parts)
+                self._parts = None
+            return self._value
+
+
+class _AppendedArray(_JoinedBytes):
+    """A JSON array made of several encoded arrays ("[...]"), in order."""
+
+    def _join(self, parts: tuple) -> bytes:
+        items = [memoryview(part)[1:-1] for part in parts if len(part) > 2]
+        return b"".join([b"[", b",".join(items), b"]"])
+
+
+class _Payload(_JoinedBytes):
+    """The {"data": {...}} body, from ((key, section), ...) parts."""
+
+    def _join(self, parts: tuple) -> bytes:
+        joined = [b'{"data":{']
+        for i, (key, body) in enumerate(parts):
+            joined += [b"," if i else b"", json.dumps(key).encode("utf-8"), b":", _resolve(body)]
+        joined.append(b"}}")
+        return b"".join(joined)
+
+
+def _resolve(value):
+    return value.get() if isinstance(value, _JoinedBytes) else value
+
+
+class SerializedDataCache:
+    """
+    Holds the unified dataset pre-encoded as JSON bytes.
+
+    Each section of the merge_all_data() output is encoded once when the cache
+    is built, so requests only copy ready-made bytes instead of converting
+    DataFrames on every hit. The cache is rebuilt explicitly whenever the
+    underlying data is reloaded.
+
+    Appended rows cost time proportional to the rows only: their encoded bytes
+    are kept beside the section's and joined on its next read, and ETags are
+    derived from the previous ETag and the new bytes. The full payload is
+    joined when first requested, and its ETag is derived from the section ETags.
+    """
+
+    def __init__(self, unified: dict = None):
+        self.generation = 0
+        empty = b'{"data":{}}'
+        self._state = ({}, {}, empty, make_etag(empty))
+        if unified is not None:
+            self.rebuild(unified)
+
+    @metrics.stage("serialize")
+    def rebuild(self, unified: dict, changed=None):
+        """
+        Encodes the sections of the unified dataset and swaps in the result.
+        If `changed` lists section keys, only those are re-encoded and the other
+        sections keep their current bytes. The new state is assigned in one step,
+        so readers never observe a partially rebuilt cache.
+        """
+        previous_sections, previous_etags = self._state[0], self._state[1]
+        sections, etags = {}, {}
+        for key in SECTION_KEYS:
+            if changed is not None and key not in changed and key in previous_sections:
+                sections[key], etags[key] = previous_sections[key], previous_etags[key]
+            else:
+                sections[key] = encode_json(unified.get(key))
+                etags[key] = make_etag(sections[key])
+
+        self._publish(sections, etags)
+
+    @metrics.stage("serialize_append")
+    def append_rows(self, key: str, rows: pd.DataFrame):
+        """
+        Appends rows to a list-valued section by encoding only the new rows,
+        instead of re-encoding the section. The bytes are joined on the next read
+        and the ETags are derived without rehashing the existing section.
+        """
+        sections, etags = dict(self._state[0]), dict(self._state[1])
+        if rows.empty:
+            return
+        delta = encode_json(rows)
+        current = sections[key]
+        parts = current.parts() if isinstance(current, _AppendedArray) else (current,)
+        sections[key] = _AppendedArray(parts + (delta,))
+        etags[key] = make_etag(etags[key].encode("utf-8") + delta)
+        self._publish(sections, etags)
+
+    def _publish(self, sections: dict, etags: dict):
+        payload = _Payload(tuple(sections.items()))
+        etag = make_etag(json.dumps(list(etags.items())).encode("utf-8"))
+        self._state = (sections, etags, payload, etag)
+        self.generation += 1
+
+    def section_offsets(self) -> dict:
+        """Returns {key: (start, end)}: where each section's bytes sit inside the payload."""
+        offsets = {}
+        position = len(b'{"data":{')
+        for i, (key, body) in enumerate(self._state[0].items()):
+            body = _resolve(body)
+            position += (1 if i else 0) + len(json.dumps(key).encode("utf-8")) + 1
+            offsets[key] = (position, position + len(body))
+            position += len(body)
+        return offsets
+
+    @classmethod
+    def from_payload(cls, payload, offsets: dict, etags: dict, etag: str) -> "SerializedDataCache":
+        """
+        Builds a cache around an already encoded payload (e.g. a read-only
+        memory map) without copying it: sections are memoryview slices of the
+        payload at `offsets` (see section_offsets()).
+        """
+        view = memoryview(payload)
+        cache = cls()
+        sections = {key: view[start:end] for key, (start, end) in offsets.items()}
+        cache._state = (sections, dict(etags), view, etag)
+        cache.generation = 1
+        return cache
+
+    def copy(self) -> "SerializedDataCache":
+        """Returns an independent cache holding the same encoded state."""
+        clone = SerializedDataCache()
+        clone._state, clone.generation = self._state, self.generation
+        return clone
+
+    @property
+    def payload(self) -> bytes:
+        """The full {"data": {...}} response body (bytes, or a memoryview for shared caches)."""
+        return _resolve(self._state[2])
+
+    @property
+    def etag(self) -> str:
+        """ETag of the full response body."""
+        return self._state[3]
+
+    def section(self, key: str) -> bytes:
+        """Returns the encoded JSON for a single section (bytes, or a memoryview for shared caches)."""
+        return _resolve(self._state[0][key])
+
+    def section_etag(self, key: str) -> str:
+        """Returns the ETag for a single section."""
+        return self._state[1][key]
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Checks an If-None-Match header value against an ETag.
+    Supports '*', comma-separated lists and weak validators (W/"...").
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,227 @@
+import glob
+import os
+from abc import ABC, abstractmethod
+from itertools import chain
+import pandas as pd
+from data_processor import DataProcessor, SOURCE_SECTIONS, concat_categorical_frames
+
+
+class SourceAdapter(ABC):
+    """
+    Reads one file format for a source as a stream of record batches.
+
+    Every adapter of a source yields the same kind of batch, so files of
+    different formats can feed one source and be processed the same way:
+      - "json": lists of company dicts (with nested employees and performance)
+      - "csv":  DataFrames of membership rows (CSV columns, any case)
+      - "pdf":  lists of aggregated report row dicts
+      - "pptx": presentation dicts (summary_metrics, quarterly_metrics, revenue_breakdown)
+
+    Subclasses set `source` and `extensions` and implement iter_batches();
+    load() returns the raw form of one file for the /api/data/<format> endpoints.
+    Register adapters with register_adapter().
+    """
+
+    source = None
+    extensions = ()
+
+    @abstractmethod
+    def iter_batches(self, ingestion, path: str, memory_limit_mb: float = None):
+        """Yields the record batches of one file."""
+
+    def load(self, ingestion, path: str):
+        return combine_raw(self.source, list(self.iter_batches(ingestion, path)))
+
+
+class JsonCompaniesAdapter(SourceAdapter):
+    source = "json"
+    extensions = (".json",)
+    # Companies per batch.
+    BATCH_SIZE = 1000
+
+    def iter_batches(self, ingestion, path: str, memory_limit_mb: float = None):
+        batch = []
+        for company in ingestion.iter_json_companies(path):
+            batch.append(company)
+            if len(batch) == self.BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def load(self, ingestion, path: str):
+        return ingestion.load_json(path)
+
+
+class MembershipCsvAdapter(SourceAdapter):
+    source = "csv"
+    extensions = (".csv",)
+
+    def iter_batches(self, ingestion, path: str, memory_limit_mb: float = None):
+        # With a memory limit the file is streamed in typed chunks, otherwise read whole.
+        if memory_limit_mb:
+            yield from ingestion.iter_csv_chunks(memory_limit_mb=memory_limit_mb, path=path)
+        else:
+            yield ingestion.load_csv(path)
+
+    def load(self, ingestion, path: str):
+        return ingestion.load_csv(path)
+
+
+class AggregatedReportPdfAdapter(SourceAdapter):
+    source = "pdf"
+    extensions = (".pdf",)
+
+    def iter_batches(self, ingestion, path: str, memory_limit_mb: float = None):
+        yield ingestion.load_pdf(path)
+
+    def load(self, ingestion, path: str):
+        return ingestion.load_pdf(path)
+
+
+class PresentationPptxAdapter(SourceAdapter):
+    source = "pptx"
+    extensions = (".pptx",)
+
+    def iter_batches(self, ingestion, path: str, memory_limit_mb: float = None):
+        yield ingestion.load_pptx(path)
+
+    def load(self, ingestion, path: str):
+        return ingestion.load_pptx(path)
+
+
+# Sources whose files are processed independently (see file_groups()).
+PER_FILE_SOURCES = {"csv", "pdf"}
+
+# (source, extension) -> adapter
+_ADAPTERS = {}
+
+
+def register_adapter(adapter: SourceAdapter):
+    """
+    Makes `adapter` read files with its extensions for its source, replacing
+    any adapter registered for the same source and extension.
+    """
+    if adapter.source not in SOURCE_SECTIONS:
+        raise ValueError(f"Unknown source: {adapter.source}")
+    for extension in adapter.extensions:
+        _ADAPTERS[(adapter.source, extension.lower())] = adapter
+
+
+def adapter_for(source: str, path: str) -> SourceAdapter:
+    """Returns the adapter reading `path` for `source`; raises ValueError if there is none."""
+    extension = os.path.splitext(path)[1].lower()
+    adapter = _ADAPTERS.get((source, extension))
+    if adapter is None:
+        raise ValueError(f"No {source} adapter for '{extension or path}' files")
+    return adapter
+
+
+for _adapter in (JsonCompaniesAdapter(), MembershipCsvAdapter(),
+                 AggregatedReportPdfAdapter(), PresentationPptxAdapter()):
+    register_adapter(_adapter)
+
+
+def expand_paths(pattern: str) -> list:
+    """
+    Files matched by a source path, sorted. A path without glob characters is
+    returned as is, and so is a pattern matching nothing, so that reading it
+    fails with an error naming it.
+    """
+    if not glob.has_magic(pattern):
+        return [pattern]
+    return sorted(glob.glob(pattern, recursive=True)) or [pattern]
+
+
+def process_batches(source: str, batches) -> dict:
+    """
+    Runs the processing pipeline of `source` over a stream of record batches
+    (see SourceAdapter) and returns the sections it produces. Batches are
+    consumed one at a time where the pipeline allows it.
+    """
+    if source == "json":
+        processor = DataProcessor(None, json_companies=chain.from_iterable(batches))
+    elif source == "csv":
+        processor = DataProcessor(None, csv_chunks=batches)
+    elif source == "pdf":
+        processor = DataProcessor(None, pdf_data=list(chain.from_iterable(batches)))
+    elif source == "pptx":
+        processor = DataProcessor(None, pptx_data=combine_raw("pptx", list(batches)))
+    else:
+        raise ValueError(f"Unknown source: {source}")
+    return processor.process_source(source)
+
+
+def process_files(ingestion, source: str, paths: list, memory_limit_mb: float = None) -> dict:
+    """
+    Reads files of a source through their adapters, one file after the other,
+    and returns the processed sections.
+    """
+    batches = chain.from_iterable(
+        adapter_for(source, path).iter_batches(ingestion, path, memory_limit_mb=memory_limit_mb) for path in paths
+    )
+    return process_batches(source, batches)
+
+
+def file_groups(source: str, paths: list) -> list:
+    """
+    Splits the files of a source into groups that can be processed in parallel
+    and merged with merge_file_sections(). Membership CSVs and PDF reports get
+    one group per file, as their pipelines set every column's dtype. Company
+    JSON and decks are processed as one stream, so that column types are
+    inferred over all companies and decks are merged before processing.
+    """
+    if source in PER_FILE_SOURCES:
+        return [[path] for path in paths]
+    return [paths]
+
+
+def _merge_values(values: list):
+    """Merges dict sections of several files: lists are concatenated, dicts updated, other values replaced."""
+    merged = {}
+    for value in values:
+        for key, item in value.items():
+            if isinstance(item, list) and isinstance(merged.get(key), list):
+                merged[key] = merged[key] + item
+            elif isinstance(item, dict) and isinstance(merged.get(key), dict):
+                merged[key] = {**merged[key], **item}
+            else:
+                merged[key] = item
+    return merged
+
+
+def combine_raw(source: str, raws: list):
+    """Combines the raw forms (or batches) of several files of a source into one."""
+    if source == "json":
+        if len(raws) == 1 and isinstance(raws[0], dict):
+            return raws[0]
+        return {"companies": [company for raw in raws for company in
+                              (raw["companies"] if isinstance(raw, dict) else raw)]}
+    if len(raws) == 1:
+        return raws[0]
+    if source == "csv":
+        return pd.concat(raws, ignore_index=True)
+    if source == "pdf":
+        return [row for raw in raws for row in raw]
+    return _merge_values(raws)
+
+
+def merge_file_sections(parts: list) -> dict:
+    """
+    Merges the processed sections of several files of one source, in file
+    order: frames are concatenated (categoricals stay categorical when the
+    files share columns) and dict sections merged.
+    """
+    if len(parts) == 1:
+        return parts[0]
+    merged = {}
+    for key, first in parts[0].items():
+        values = [part[key] for part in parts]
+        if isinstance(first, pd.DataFrame):
+            if all(list(value.columns) == list(first.columns) for value in values):
+                merged[key] = concat_categorical_frames(values)
+            else:
+                merged[key] = pd.concat(values, ignore_index=True, sort=False)
+        else:
+            merged[key] = _merge_values(values)
+    return merged
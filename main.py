@@ -1,49 +1,150 @@
+import os
+import contextlib
 import pandas as pd
 from fastapi import FastAPI
-import uvicorn
-import numpy as np
+import datetime
 from data_ingestion import DataIngestion
-from data_processor import DataProcessor
-from fastapi.encoders import jsonable_encoder
-from fastapi import Request
-from fastapi.responses import HTMLResponse
+from data_cache import ColumnarCache
+from data_manager import DataManager
+from data_processor import SOURCE_SECTIONS
+from shared_dataset import SharedDatasetStore
+from data_serializer import SECTION_KEYS, FastJSONResponse, encode_json, etag_matches, make_etag
+from data_query import performance_pivot, reconcile, select_page
+from data_executor import CoalescingExecutor
+from data_formats import (ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE, MIN_COMPRESS_BYTES, NDJSON_MEDIA_TYPE,
+                          compress, encode_arrow, encoded_etag, iter_ndjson, negotiate_encoding,
+                          negotiate_media_type)
+from metrics import metrics, MetricsMiddleware
+from fastapi import HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
 
-app = FastAPI(title="AI Application Developer Intern Assessment API")
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Loads the datasets in the background once the server starts, so it accepts
+    requests (and health checks) right away, then watches the dataset files
+    while the server runs, reloading changed sources in the background.
+    """
+    data_manager.start_loading(watch_interval=DATASET_WATCH_INTERVAL)
+    yield
+    data_manager.stop_watching()
+    data_executor.shutdown()
+
+
+app = FastAPI(title="AI Application Developer Intern Assessment API", lifespan=lifespan,
+              default_response_class=FastJSONResponse)
+# Request latency, status and response size per route, exposed on /metrics.
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 templates = Jinja2Templates(directory="templates")
 
 
+# Processed frames are cached on disk under DATA_CACHE_DIR and reused until a
+# source file changes. Set DATA_CACHE_DIR to an empty string to disable the cache.
+DATA_CACHE_DIR = os.environ.get("DATA_CACHE_DIR", ".cache")
+data_store = ColumnarCache(DATA_CACHE_DIR) if DATA_CACHE_DIR else None
+
 ingestion = DataIngestion(
     json_path="datasets/dataset1.json",
     csv_path="datasets/dataset2.csv",
     pdf_path="datasets/dataset3.pdf",
-    pptx_path="datasets/dataset4.pptx"
+    pptx_path="datasets/dataset4.pptx",
+    pdf_page_cache_dir=os.path.join(DATA_CACHE_DIR, "pdf_pages") if DATA_CACHE_DIR else None,
+    pptx_slide_cache_dir=os.path.join(DATA_CACHE_DIR, "pptx_slides") if DATA_CACHE_DIR else None
 )
 
-# Load data
-json_data = ingestion.load_json()
-try:
-    csv_df = ingestion.load_csv()
-except Exception as e:
-    print("Error loading CSV:", e)
-    csv_df = None
-pdf_data = ingestion.load_pdf()
-pptx_data = ingestion.load_pptx()
+# Set CSV_MEMORY_LIMIT_MB to stream the membership CSV in bounded-memory chunks
+# instead of loading it whole. The raw /api/data/csv endpoint is unavailable in that mode.
+CSV_MEMORY_LIMIT_MB = os.environ.get("CSV_MEMORY_LIMIT_MB")
+
+# Set COMPACT_MEMORY=1 to store sections with compact dtypes (categoricals, downcast
+# numbers, datetime64) and to drop raw sources once a request has used them.
+COMPACT_MEMORY = os.environ.get("COMPACT_MEMORY", "0").strip().lower() not in ("", "0", "false", "no", "off")
+
+# Set SHARED_DATASET_DIR (a local directory) when running several workers, e.g.
+# `uvicorn main:app --workers 4`: one worker parses the sources and the others
+# memory-map its published snapshot instead of holding their own copy.
+SHARED_DATASET_DIR = os.environ.get("SHARED_DATASET_DIR", "")
+
+# Set LAZY_SOURCES to a comma-separated list of sources (json, csv, pdf, pptx) to
+# parse them on the first request that needs them instead of at startup.
+LAZY_SOURCES = [source.strip() for source in os.environ.get("LAZY_SOURCES", "").split(",") if source.strip()]
+
+# Data is loaded when the server starts (see lifespan()): unchanged sources come from
+# the cache, the rest are parsed in parallel. Until then, and if loading fails, data
+# endpoints answer 503; /readyz reports the state of every source.
+data_manager = DataManager(
+    ingestion,
+    cache=data_store,
+    csv_memory_limit_mb=float(CSV_MEMORY_LIMIT_MB) if CSV_MEMORY_LIMIT_MB else None,
+    compact=COMPACT_MEMORY,
+    shared_store=SharedDatasetStore(SHARED_DATASET_DIR) if SHARED_DATASET_DIR else None,
+    lazy_sources=LAZY_SOURCES
+)
+
+# Source of each section, for loading lazy sources on first use.
+SECTION_SOURCES = {key: source for source, keys in SOURCE_SECTIONS.items() for key in keys}
+
+# Paged, filtered and aggregated responses are built in a bounded thread pool of
+# API_WORKERS threads so the event loop stays free; identical concurrent requests share one build.
+# Built results are kept for reuse up to API_CACHE_MB megabytes in total.
+API_WORKERS = os.environ.get("API_WORKERS")
+API_CACHE_MB = float(os.environ.get("API_CACHE_MB", "256"))
+data_executor = CoalescingExecutor(max_workers=int(API_WORKERS) if API_WORKERS else None,
+                                   cache_bytes=int(API_CACHE_MB * 1024 * 1024))
+
+# Seconds between checks of datasets/ for changed files; 0 disables hot reload.
+DATASET_WATCH_INTERVAL = float(os.environ.get("DATASET_WATCH_INTERVAL", "2"))
 
-processor = DataProcessor(json_data, csv_df, pdf_data, pptx_data)
-unified = processor.merge_all_data()
 
-def convert_if_dataframe(item):
+def require_snapshot(*sources):
     """
-    Converts a pandas DataFrame to a list of dictionaries,
-    replacing NaN/NA with None. If the item is not a DataFrame,
-    returns it unchanged.
+    Returns the current snapshot holding the sections of `sources`, loading
+    lazy sources on their first use. Raises 503 (with Retry-After) while the
+    datasets are loading or when they, or one of `sources`, failed to load.
     """
-    if isinstance(item, pd.DataFrame):
-        return item.replace({pd.NA: None, np.nan: None}).to_dict(orient="records")
-    return item
+    if data_manager.current is None:
+        detail = "Datasets are loading"
+        if data_manager.load_error is not None:
+            detail = f"Datasets failed to load: {data_manager.load_error}"
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
+    try:
+        return data_manager.ensure_loaded(sources)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=f"Could not load {', '.join(sources)}: {e}",
+                            headers={"Retry-After": "5"})
+
+
+async def current_snapshot(*sources):
+    """require_snapshot() for async handlers: lazy sources are loaded off the event loop."""
+    snapshot = data_manager.current
+    if snapshot is not None and not snapshot.missing_sources(sources):
+        return snapshot
+    return await data_executor.run_uncached(("load", sources), require_snapshot, *sources)
+
+
+async def cached_response(request: Request, body: bytes, etag: str,
+                          media_type: str = JSON_MEDIA_TYPE, headers: dict = None) -> Response:
+    """
+    Serves pre-encoded bytes with an ETag, answering 304 Not Modified
+    when the client already holds the current version. JSON bodies are
+    compressed with gzip or brotli when the client accepts it; compressed
+    bodies are built off the event loop and reused until the content changes.
+    """
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding", **(headers or {})}
+    encoding = None
+    if media_type == JSON_MEDIA_TYPE and len(body) >= MIN_COMPRESS_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    etag = encoded_etag(etag, encoding)
+    headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        body = await data_executor.run(("compressed", etag), compress, body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
 
 @app.get("/performance", response_class=HTMLResponse)
 async def performance_page(request: Request):
@@ -59,7 +160,8 @@ async def aggregated_page(request: Request):
 
 @app.get("/presentation", response_class=HTMLResponse)
 async def presentation_page(request: Request):
-    return templates.TemplateResponse("presentation.html", {"request": request, "presentation": unified.get("presentation")})
+    snapshot = await current_snapshot("pptx")
+    return templates.TemplateResponse("presentation.html", {"request": request, "presentation": snapshot.unified.get("presentation")})
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
@@ -67,52 +169,397 @@ async def index(request: Request):
     return templates.TemplateResponse("performance.html", {"request": request})
 
 
+@app.get("/metrics")
+def get_metrics():
+    """
+    Return pipeline stage and request metrics in the Prometheus text format.
+    """
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/healthz")
+async def healthz():
+    """
+    Liveness probe: the server is up and answering, whether or not the
+    datasets are loaded.
+    """
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness probe: 200 once the datasets are loaded (lazy sources may still be
+    unloaded), 503 while they load or if loading failed. The body reports the
+    state of every source (pending, loading, ready, lazy or failed) and its last error.
+    """
+    status = data_manager.status()
+    return FastJSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+# Response builders below run in data_executor, off the event loop. Each returns
+# encoded JSON bytes and raises ValueError for invalid parameters.
+
+def build_raw_body(snapshot, source: str) -> bytes:
+    return encode_json({"data": snapshot.raw_source(ingestion, source)})
+
+
+def select_section_page(snapshot, section: str, limit, offset, fields, sort) -> tuple:
+    page, total = select_page(snapshot.unified[section], fields=fields, sort=sort, offset=offset, limit=limit)
+    return page, {"total": total, "offset": offset, "limit": limit}
+
+
+def select_membership_page(snapshot, filters: dict, limit, offset, fields, sort) -> tuple:
+    membership_engine = snapshot.membership_engine
+    rows = membership_engine.filter(**filters)
+    page, total = select_page(rows, fields=fields, sort=sort, offset=offset, limit=limit)
+    return page, {"total": total, "unfiltered_total": len(membership_engine.df), "offset": offset, "limit": limit}
+
+
+def select_employee_page(snapshot, filters: dict, limit, offset, fields, sort) -> tuple:
+    company_index = snapshot.company_index
+    rows = company_index.filter_employees(**filters)
+    page, total = select_page(rows, fields=fields, sort=sort, offset=offset, limit=limit)
+    return page, {"total": total, "unfiltered_total": len(company_index.employees), "offset": offset, "limit": limit}
+
+
+def build_table_body(media_type: str, select, *args) -> tuple:
+    """Runs a select_* function and encodes the page as Arrow IPC or JSON; returns (body, metadata)."""
+    page, meta = select(*args)
+    if media_type == ARROW_MEDIA_TYPE:
+        return encode_arrow(page), meta
+    return encode_json({"data": page, **meta}), meta
+
+
+def build_membership_aggregate_body(snapshot, group_by, metric_names, aggregations, filters: dict) -> bytes:
+    if all(v is None for v in filters.values()) and snapshot.membership_aggregates.covers(group_by or []):
+        # Unfiltered groupings are rolled up from the materialized cube.
+        result = snapshot.membership_aggregates.rollup(
+            group_by=group_by,
+            metrics=metric_names,
+            aggregations=aggregations
+        )
+    else:
+        result = snapshot.membership_engine.aggregate(
+            group_by=group_by,
+            metrics=metric_names,
+            aggregations=aggregations,
+            **filters
+        )
+    return encode_json({"data": result})
+
+
+def build_performance_pivot_body(snapshot) -> bytes:
+    return encode_json(performance_pivot(snapshot.unified["company_performance"]))
+
+
+def build_reconciliation_body(snapshot, year, tolerance: float) -> bytes:
+    return encode_json(reconcile(snapshot.membership_aggregates, snapshot.unified["aggregated_performance"],
+                                 snapshot.unified["presentation"], year=year, tolerance=tolerance))
+
+
+async def raw_body(snapshot, source: str) -> bytes:
+    """Encoded raw source; not kept in the executor's result cache in compact mode."""
+    run = data_executor.run_uncached if COMPACT_MEMORY else data_executor.run
+    return await run(response_key(snapshot, "raw", source), build_raw_body, snapshot, source)
+
+
+def response_key(snapshot, *params) -> tuple:
+    """Executor key for a response: changes whenever the snapshot's data does."""
+    return (snapshot.data_cache.etag,) + params
+
+
+async def table_response(request: Request, key: tuple, select, *args) -> Response:
+    """
+    Serves a page of table rows in the format negotiated from the Accept header:
+    JSON (default), Arrow IPC stream or NDJSON. NDJSON is streamed as rows are
+    encoded. The total row count is also sent in X-Total-Count, since Arrow and
+    NDJSON bodies carry only the rows.
+    """
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    try:
+        if media_type == NDJSON_MEDIA_TYPE:
+            page, meta = await data_executor.run(key + ("rows",), select, *args)
+        else:
+            body, meta = await data_executor.run(key + (media_type,), build_table_body, media_type, select, *args)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Total-Count": str(meta["total"])}
+    if media_type == NDJSON_MEDIA_TYPE:
+        return StreamingResponse(iter_ndjson(page), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    return await cached_response(request, body, make_etag(body), media_type, headers)
+
+
+@app.get("/api/memory")
+def get_memory_report():
+    """
+    Return the memory held per section (in-memory and encoded sizes, per-column
+    dtypes) along with raw sources held and the process's resident memory.
+    """
+    report = require_snapshot().memory_report()
+    report["compact"] = COMPACT_MEMORY
+    return report
+
+
 @app.get("/api/data")
-def get_all_data():
+async def get_all_data(request: Request):
     """
     Return the unified composite dataset in JSON format.
+    The payload is encoded once up front and served with ETag support.
     """
-    # Create a new dictionary to hold the converted data.
-    data = {
-        "company_info": convert_if_dataframe(unified.get("company_info")),
-        "employee_data": convert_if_dataframe(unified.get("employee_data")),
-        "company_performance": convert_if_dataframe(unified.get("company_performance")),
-        "membership_activity": convert_if_dataframe(unified.get("membership_activity")),
-        "aggregated_performance": convert_if_dataframe(unified.get("aggregated_performance")),
-        "presentation": unified.get("presentation")  # Already a dict.
-    }
-    return {"data": jsonable_encoder(data)}
+    data_cache = (await current_snapshot(*SOURCE_SECTIONS)).data_cache
+    return await cached_response(request, data_cache.payload, data_cache.etag)
 
 @app.get("/api/data/pdf")
-def get_pdf_data():
+async def get_pdf_data():
     """
     Return the PDF table data as-is.
     """
-    return {"data": pdf_data}
+    snapshot = await current_snapshot()
+    body = await raw_body(snapshot, "pdf")
+    return Response(content=body, media_type="application/json")
 
 @app.get("/api/data/pptx")
-def get_pptx_data():
+async def get_pptx_data():
     """
     Return the parsed PPTX data, which includes summary metrics, quarterly metrics, revenue breakdown.
     """
-    return {"data": pptx_data}
+    snapshot = await current_snapshot("pptx")
+    body = b"".join([b'{"data":', snapshot.data_cache.section("presentation"), b"}"])
+    return Response(content=body, media_type="application/json")
 
 @app.get("/api/data/json")
-def get_json_data():
+async def get_json_data():
     """
     Return the raw JSON data.
     """
-    return {"data": json_data}
+    snapshot = await current_snapshot()
+    body = await raw_body(snapshot, "json")
+    return Response(content=body, media_type="application/json")
 
 @app.get("/api/data/csv")
-def get_csv_data():
+async def get_csv_data():
     """
     Return the CSV data, with NaN replaced by None.
     """
-    if csv_df is not None:
-        return {"data": csv_df.replace({np.nan: None}).to_dict(orient="records")}
-    else:
-        return {"error": "CSV data not available"}
+    if CSV_MEMORY_LIMIT_MB:
+        raise HTTPException(status_code=503,
+                            detail="CSV data not available: the raw CSV is not kept when CSV_MEMORY_LIMIT_MB is set")
+    snapshot = await current_snapshot()
+    try:
+        body = await raw_body(snapshot, "csv")
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"CSV data not available: {type(e).__name__}: {e}")
+    return Response(content=body, media_type="application/json")
+
+def split_param(value: str):
+    """
+    Splits a comma-separated query parameter into a list, or returns None if empty.
+    """
+    if not value:
+        return None
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+@app.get("/api/membership/query")
+async def query_membership(
+    request: Request,
+    membership_type: str = None,
+    activity: str = None,
+    location: str = None,
+    date_from: datetime.date = None,
+    date_to: datetime.date = None,
+    search: str = None,
+    limit: int = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    fields: str = None,
+    sort: str = None
+):
+    """
+    Return membership activity rows filtered server-side.
+    membership_type, activity and location accept comma-separated values;
+    date_from/date_to bound the date range (inclusive); search matches text in
+    the ID, type, activity and location columns. Supports the same
+    limit/offset/fields/sort options and response formats as /api/data/{section}.
+    """
+    snapshot = await current_snapshot("csv")
+    filters = {
+        "membership_type": split_param(membership_type),
+        "activity": split_param(activity),
+        "location": split_param(location),
+        "date_from": date_from,
+        "date_to": date_to,
+        "search": search or None
+    }
+    key = response_key(snapshot, "membership_query", repr(filters), limit, offset, fields, sort)
+    return await table_response(request, key, select_membership_page, snapshot, filters,
+                                limit, offset, fields, sort)
+
+@app.get("/api/membership/aggregate")
+async def aggregate_membership(
+    request: Request,
+    group_by: str = "year,quarter",
+    metrics: str = None,
+    agg: str = None,
+    membership_type: str = None,
+    activity: str = None,
+    location: str = None,
+    date_from: datetime.date = None,
+    date_to: datetime.date = None
+):
+    """
+    Return grouped membership metrics computed server-side.
+    group_by: any of year, quarter, location, membership_type, activity.
+    metrics: revenue and/or "duration (minutes)"; agg: sum, mean and/or count.
+    Accepts the same filters as /api/membership/query.
+    """
+    snapshot = await current_snapshot("csv")
+    filters = {
+        "membership_type": split_param(membership_type),
+        "activity": split_param(activity),
+        "location": split_param(location),
+        "date_from": date_from,
+        "date_to": date_to
+    }
+    key = response_key(snapshot, "membership_aggregate", group_by, metrics, agg, repr(filters))
+    try:
+        body = await data_executor.run(key, build_membership_aggregate_body, snapshot, split_param(group_by),
+                                       split_param(metrics), split_param(agg), filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await cached_response(request, body, make_etag(body))
+
+@app.get("/api/performance/pivot")
+async def get_performance_pivot(request: Request):
+    """
+    Return company performance as a chart-ready company x quarter revenue grid
+    (see data_query.performance_pivot()). The grid is built once per version
+    of the company_performance section and served with ETag support.
+    """
+    snapshot = await current_snapshot("json")
+    key = (snapshot.data_cache.section_etag("company_performance"), "performance_pivot")
+    body = await data_executor.run(key, build_performance_pivot_body, snapshot)
+    return await cached_response(request, body, make_etag(body))
+
+@app.get("/api/reconciliation")
+async def get_reconciliation(request: Request, year: int = None, tolerance: float = Query(0.01, ge=0)):
+    """
+    Diff the membership rollup cube against the PDF report and the PPTX
+    metrics (see data_query.reconcile()). year: the year the deck reports on
+    (default: latest year of the membership data); tolerance: allowed relative
+    difference. Computed once per version of the three sections.
+    """
+    snapshot = await current_snapshot("csv", "pdf", "pptx")
+    data_cache = snapshot.data_cache
+    key = tuple(data_cache.section_etag(section) for section in
+                ("membership_activity", "aggregated_performance", "presentation"))
+    key += ("reconciliation", year, tolerance)
+    body = await data_executor.run(key, build_reconciliation_body, snapshot, year, tolerance)
+    return await cached_response(request, body, make_etag(body))
+
+@app.get("/api/companies/{company_id}")
+async def get_company(company_id: str):
+    """
+    Return the company with the given id, looked up in the company id index.
+    """
+    snapshot = await current_snapshot("json")
+    rows = snapshot.company_index.company(company_id)
+    if rows.empty:
+        raise HTTPException(status_code=404, detail=f"Unknown company: {company_id}")
+    return FastJSONResponse({"data": rows})
+
+@app.get("/api/employees/{employee_id}")
+async def get_employee(employee_id: str):
+    """
+    Return the employee with the given id, looked up in the employee id index.
+    """
+    snapshot = await current_snapshot("json")
+    rows = snapshot.company_index.employee(employee_id)
+    if rows.empty:
+        raise HTTPException(status_code=404, detail=f"Unknown employee: {employee_id}")
+    return FastJSONResponse({"data": rows})
+
+@app.get("/api/employees")
+async def query_employees(
+    request: Request,
+    company_id: str = None,
+    role: str = None,
+    hired_from: datetime.date = None,
+    hired_to: datetime.date = None,
+    limit: int = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    fields: str = None,
+    sort: str = None
+):
+    """
+    Return employee records filtered through the company index.
+    company_id and role accept comma-separated values; hired_from/hired_to
+    bound the hire date (inclusive). Supports the same limit/offset/fields/sort
+    options and response formats as /api/data/{section}.
+    """
+    snapshot = await current_snapshot("json")
+    filters = {
+        "company_id": split_param(company_id),
+        "role": split_param(role),
+        "hired_from": hired_from,
+        "hired_to": hired_to
+    }
+    key = response_key(snapshot, "employees", repr(filters), limit, offset, fields, sort)
+    return await table_response(request, key, select_employee_page, snapshot, filters,
+                                limit, offset, fields, sort)
+
+@app.post("/api/membership/rows")
+def append_membership_rows(rows: list[dict]):
+    """
+    Append membership activity rows (same columns as the CSV) to the dataset.
+    Only the new rows are processed; indexes, aggregates and the encoded
+    payloads are extended rather than rebuilt.
+    """
+    snapshot = require_snapshot("csv")
+    if not rows:
+        return {"appended": 0, "total": len(snapshot.membership_engine.df)}
+    try:
+        snapshot = data_manager.append_membership_rows(pd.DataFrame(rows))
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"appended": len(rows), "total": len(snapshot.membership_engine.df)}
+
+@app.get("/api/data/{section}")
+async def get_section_data(
+    request: Request,
+    section: str,
+    limit: int = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    fields: str = None,
+    sort: str = None
+):
+    """
+    Return a single section of the unified dataset.
+    Table sections support pagination (limit/offset), column projection
+    (fields=a,b) and sorting (sort=a,-b). The full, unmodified section is
+    served straight from the pre-encoded cache; pages are built off the
+    event loop. Table sections are also available as Arrow IPC or NDJSON
+    (see table_response()).
+    """
+    if section not in SECTION_KEYS:
+        raise HTTPException(status_code=404, detail=f"Unknown section: {section}")
+    snapshot = await current_snapshot(SECTION_SOURCES[section])
+    item = snapshot.unified.get(section)
+    data_cache = snapshot.data_cache
+
+    if not isinstance(item, pd.DataFrame):
+        body = b"".join([b'{"data":', data_cache.section(section), b"}"])
+        return await cached_response(request, body, data_cache.section_etag(section))
+
+    if (limit is None and not offset and not fields and not sort
+            and negotiate_media_type(request.headers.get("accept")) == JSON_MEDIA_TYPE):
+        body = b"".join([b'{"data":', data_cache.section(section),
+                         b',"total":', str(len(item)).encode(), b',"offset":0,"limit":null}'])
+        return await cached_response(request, body, data_cache.section_etag(section))
+
+    return await table_response(request, response_key(snapshot, "section", section, limit, offset, fields, sort),
+                                select_section_page, snapshot, section, limit, offset, fields, sort)
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,252 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import pandas as pd
+
+logger = logging.getLogger("metrics")
+
+
+def resident_memory_bytes() -> int:
+    """Resident set size of this process, or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _row_count(result):
+    """Rows in a stage result: the length of a DataFrame or list, otherwise None."""
+    if isinstance(result, (pd.DataFrame, list)):
+        return len(result)
+    return None
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Metrics:
+    """
+    In-process registry of pipeline stage timings and HTTP request metrics,
+    rendered in the Prometheus text exposition format.
+
+    Stages (ingestion, processing, caching, serialization) are recorded with
+    duration, row count and resident memory delta; requests with a latency
+    histogram, status counts and response sizes per route. When `enabled` is
+    False every recording call returns immediately, so the instrumentation can
+    stay in place in production. With `log` set, each stage and request is also
+    written to the "metrics" logger as one JSON object per line.
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, enabled: bool = True, log: bool = False):
+        self.enabled = enabled
+        self.log = log
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """Discards everything recorded so far."""
+        with self._lock:
+            # stage -> {"count", "seconds", "rows", "last_seconds", "last_memory_delta"}
+            self._stages = {}
+            # (method, route, status) -> count
+            self._request_counts = {}
+            # (method, route) -> {"buckets": [...], "count", "seconds", "bytes"}
+            self._requests = {}
+
+    def stage(self, name: str, rows=None):
+        """
+        Decorator recording each call of the wrapped function as stage `name`.
+        `rows` optionally maps the function's result to its row count; by
+        default DataFrame and list results are counted.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                memory = resident_memory_bytes()
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                seconds = time.perf_counter() - start
+                self.record_stage(name, seconds, (rows or _row_count)(result), resident_memory_bytes() - memory)
+                return result
+            return wrapper
+        return decorator
+
+    def record_stage(self, name: str, seconds: float, rows: int = None, memory_delta: int = 0):
+        """Records one completed stage (see stage())."""
+        if not self.enabled:
+            return
+        event = {"stage": name, "seconds": seconds, "rows": rows, "memory_delta": memory_delta}
+        captured = getattr(self._local, "captured", None)
+        if captured is not None:
+            captured.append(event)
+            return
+        self._add_stage(event)
+
+    def _add_stage(self, event: dict):
+        with self._lock:
+            stats = self._stages.setdefault(event["stage"], {
+                "count": 0, "seconds": 0.0, "rows": None, "last_seconds": 0.0, "last_memory_delta": 0,
+            })
+            stats["count"] += 1
+            stats["seconds"] += event["seconds"]
+            if event["rows"] is not None:
+                stats["rows"] = (stats["rows"] or 0) + event["rows"]
+            stats["last_seconds"] = event["seconds"]
+            stats["last_memory_delta"] = event["memory_delta"]
+        if self.log:
+            logger.info(json.dumps({"event": "stage", **event}))
+
+    def capture_stages(self, func, *args):
+        """
+        Runs func(*args) with this thread's stage events collected instead of
+        recorded. Returns (result, events); pass the events to merge_stages()
+        in the process that owns the registry. Used for tasks running in
+        worker processes, whose registry is discarded with the process.
+        """
+        if not self.enabled:
+            return func(*args), []
+        self._local.captured = events = []
+        try:
+            result = func(*args)
+        finally:
+            self._local.captured = None
+        return result, events
+
+    def merge_stages(self, events: list):
+        """Records stage events collected by capture_stages()."""
+        if self.enabled:
+            for event in events or []:
+                self._add_stage(event)
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, size: int):
+        """Records one HTTP request: latency, status and response body size."""
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (method, route, status)
+            self._request_counts[key] = self._request_counts.get(key, 0) + 1
+            stats = self._requests.setdefault((method, route), {
+                "buckets": [0] * len(self.LATENCY_BUCKETS), "count": 0, "seconds": 0.0, "bytes": 0,
+            })
+            for i, bound in enumerate(self.LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats["buckets"][i] += 1
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["bytes"] += size
+        if self.log:
+            logger.info(json.dumps({"event": "request", "method": method, "route": route,
+                                    "status": status, "seconds": seconds, "bytes": size}))
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            stages = {name: dict(stats) for name, stats in self._stages.items()}
+            request_counts = dict(self._request_counts)
+            requests = {key: dict(stats, buckets=list(stats["buckets"])) for key, stats in self._requests.items()}
+
+        lines = [
+            "# HELP app_metrics_enabled Whether metrics are being recorded.",
+            "# TYPE app_metrics_enabled gauge",
+            f"app_metrics_enabled {int(self.enabled)}",
+            "# HELP app_process_resident_memory_bytes Resident memory of the API process.",
+            "# TYPE app_process_resident_memory_bytes gauge",
+            f"app_process_resident_memory_bytes {resident_memory_bytes()}",
+        ]
+
+        stage_metrics = [
+            ("app_stage_calls_total", "counter", "Completed runs of each pipeline stage.", "count"),
+            ("app_stage_duration_seconds_total", "counter", "Time spent in each pipeline stage.", "seconds"),
+            ("app_stage_last_duration_seconds", "gauge", "Duration of the latest run of each stage.", "last_seconds"),
+            ("app_stage_rows_total", "counter", "Rows produced by each pipeline stage.", "rows"),
+            ("app_stage_last_memory_delta_bytes", "gauge",
+             "Change in resident memory across the latest run of each stage.", "last_memory_delta"),
+        ]
+        for metric, kind, help_text, field in stage_metrics:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            lines += [f"{metric}{_labels(stage=name)} {stats[field]}"
+                      for name, stats in sorted(stages.items()) if stats[field] is not None]
+
+        lines += ["# HELP app_http_requests_total HTTP requests by route and status.",
+                  "# TYPE app_http_requests_total counter"]
+        for (method, route, status), count in sorted(request_counts.items()):
+            lines.append(f"app_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        lines += ["# HELP app_http_request_duration_seconds HTTP request latency by route.",
+                  "# TYPE app_http_request_duration_seconds histogram"]
+        for (method, route), stats in sorted(requests.items()):
+            for bound, count in zip(self.LATENCY_BUCKETS, stats["buckets"]):
+                lines.append(f"app_http_request_duration_seconds_bucket"
+                             f"{_labels(method=method, route=route, le=bound)} {count}")
+            lines.append(f"app_http_request_duration_seconds_bucket"
+                         f"{_labels(method=method, route=route, le='+Inf')} {stats['count']}")
+            lines.append(f"app_http_request_duration_seconds_sum{_labels(method=method, route=route)} {stats['seconds']}")
+            lines.append(f"app_http_request_duration_seconds_count{_labels(method=method, route=route)} {stats['count']}")
+
+        lines += ["# HELP app_http_response_size_bytes HTTP response body size by route.",
+                  "# TYPE app_http_response_size_bytes summary"]
+        for (method, route), stats in sorted(requests.items()):
+            lines.append(f"app_http_response_size_bytes_sum{_labels(method=method, route=route)} {stats['bytes']}")
+            lines.append(f"app_http_response_size_bytes_count{_labels(method=method, route=route)} {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and response size of every HTTP
+    request, labelled with the matched route template (e.g. /api/data/{section})
+    so that path parameters do not create new series. Passes requests straight
+    through when metrics are disabled.
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+
+        async def send_and_measure(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            route = scope.get("route")
+            self.metrics.record_request(scope["method"], getattr(route, "path", "<unmatched>"),
+                                        response["status"], time.perf_counter() - start, response["bytes"])
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.environ.get(name, default).strip().lower() not in ("", "0", "false", "no", "off")
+
+
+# Process-wide registry. METRICS_ENABLED=0 turns recording off; METRICS_LOG=1
+# also writes every stage and request to the "metrics" logger as JSON lines.
+metrics = Metrics(enabled=_env_flag("METRICS_ENABLED", "1"), log=_env_flag("METRICS_LOG", "0"))
+if metrics.log and not logger.handlers:
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
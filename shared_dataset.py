@@ -0,0 +1,216 @@
+import contextlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+import pyarrow as pa
+from data_cache import decode_nested_columns, encode_nested_columns
+from data_manager import DataSnapshot
+from data_serializer import SECTION_KEYS, SerializedDataCache
+
+# Arrow strings are kept as pyarrow-backed pandas strings so they stay in the mapped file.
+_ARROW_STRING_TYPES = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+
+
+class SharedDatasetStore:
+    """
+    A read-only copy of the current DataSnapshot on local disk, shared by all
+    worker processes on a host through memory maps.
+
+    One process (the loader, elected with a file lock) parses the sources and
+    publishes each snapshot as a numbered generation: table sections as Arrow
+    IPC files and the pre-encoded JSON payload as one file. Other workers attach
+    to the latest generation by memory-mapping those files, so the operating
+    system keeps a single copy of the pages for all of them, and watch the
+    generation counter to pick up new snapshots.
+
+    Layout:
+      <root>/CURRENT                  {"generation": N}, replaced atomically
+      <root>/gen-<N>/manifest.json    sections, payload offsets, ETags, load report
+      <root>/gen-<N>/<section>.arrow  table sections (Arrow IPC file format)
+      <root>/gen-<N>/<section>.json   dict sections (e.g. presentation)
+      <root>/gen-<N>/payload.json     the /api/data body; sections are slices of it
+      <root>/loader.lock, publish.lock
+    """
+
+    # Generations kept on disk; older ones are removed after a publish. Workers
+    # still mapping a removed generation keep reading it until they move on.
+    KEEP_GENERATIONS = 3
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._loader_lock = None
+
+    def _generation_dir(self, generation: int) -> str:
+        return os.path.join(self.root, f"gen-{generation:06d}")
+
+    # Locking
+    def try_acquire_loader(self) -> bool:
+        """
+        Tries to become the loader process. The lock is held until the process
+        exits, at which point another worker can take over.
+        """
+        import fcntl
+        if self._loader_lock is not None:
+            return True
+        f = open(os.path.join(self.root, "loader.lock"), "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._loader_lock = f
+        return True
+
+    @property
+    def is_loader(self) -> bool:
+        return self._loader_lock is not None
+
+    @contextlib.contextmanager
+    def publish_lock(self):
+        """Serializes publishers across processes."""
+        import fcntl
+        with open(os.path.join(self.root, "publish.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    # Generations
+    def current_generation(self) -> int:
+        """The latest published generation, or 0 if nothing has been published."""
+        try:
+            with open(os.path.join(self.root, "CURRENT"), "r") as f:
+                return int(json.load(f)["generation"])
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def publish(self, snapshot: DataSnapshot, changed=None) -> int:
+        """
+        Writes `snapshot` as the next generation and points CURRENT at it;
+        returns the new generation number. Sections not listed in `changed`
+        (section keys; all if None) are hard-linked from the current generation
+        instead of being written again. Call with publish_lock() held.
+        """
+        previous = self.current_generation()
+        generation = previous + 1
+        target = self._generation_dir(generation)
+        shutil.rmtree(target, ignore_errors=True)
+        staging = tempfile.mkdtemp(dir=self.root, prefix=".gen-")
+        try:
+            manifest = self._write_generation(staging, snapshot, changed, self._generation_dir(previous))
+            manifest["generation"] = generation
+            with open(os.path.join(staging, "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".CURRENT.")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"generation": generation}, f)
+        os.replace(tmp_path, os.path.join(self.root, "CURRENT"))
+        self._prune(generation)
+        return generation
+
+    def _write_generation(self, directory: str, snapshot: DataSnapshot, changed, previous_dir: str) -> dict:
+        previous_manifest = self._read_manifest(previous_dir)
+        manifest = {"sections": {}, "report": snapshot.report}
+        for key, value in snapshot.unified.items():
+            reuse = (changed is not None and key not in changed and previous_manifest
+                     and key in previous_manifest["sections"])
+            if reuse:
+                info = previous_manifest["sections"][key]
+                try:
+                    os.link(os.path.join(previous_dir, info["file"]), os.path.join(directory, info["file"]))
+                    manifest["sections"][key] = info
+                    continue
+                except OSError:
+                    pass
+            if isinstance(value, pd.DataFrame):
+                value, json_columns = encode_nested_columns(value)
+                info = {"kind": "frame", "file": f"{key}.arrow", "json_columns": json_columns}
+                table = pa.Table.from_pandas(value, preserve_index=False)
+                with pa.OSFile(os.path.join(directory, info["file"]), "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+            else:
+                info = {"kind": "dict", "file": f"{key}.json"}
+                with open(os.path.join(directory, info["file"]), "w") as f:
+                    json.dump(value, f)
+            manifest["sections"][key] = info
+
+        data_cache = snapshot.data_cache
+        with open(os.path.join(directory, "payload.json"), "wb") as f:
+            f.write(data_cache.payload)
+        manifest["payload"] = {
+            "etag": data_cache.etag,
+            "offsets": data_cache.section_offsets(),
+            "etags": {key: data_cache.section_etag(key) for key in SECTION_KEYS},
+        }
+        return manifest
+
+    @staticmethod
+    def _read_manifest(directory: str) -> dict:
+        try:
+            with open(os.path.join(directory, "manifest.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _prune(self, generation: int):
+        for name in os.listdir(self.root):
+            if name.startswith("gen-"):
+                try:
+                    number = int(name[4:])
+                except ValueError:
+                    continue
+                if number <= generation - self.KEEP_GENERATIONS:
+                    shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def attach(self, generation: int = None, keep_raw: bool = True) -> DataSnapshot:
+        """
+        Returns a DataSnapshot for `generation` (the latest if None) backed by
+        memory maps of its files, or None if it does not exist. Numeric, date and
+        string columns and the encoded payload are read in place; only nested
+        (JSON-encoded) columns, categorical codes and dict sections are copied.
+        """
+        generation = generation or self.current_generation()
+        directory = self._generation_dir(generation)
+        manifest = self._read_manifest(directory)
+        if not generation or manifest is None:
+            return None
+
+        unified = {}
+        for key, info in manifest["sections"].items():
+            path = os.path.join(directory, info["file"])
+            if info["kind"] == "dict":
+                with open(path, "r") as f:
+                    unified[key] = json.load(f)
+                continue
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            df = table.to_pandas(split_blocks=True, types_mapper=_ARROW_STRING_TYPES.get)
+            unified[key] = decode_nested_columns(df, info["json_columns"])
+
+        with open(os.path.join(directory, "payload.json"), "rb") as f:
+            payload = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        info = manifest["payload"]
+        data_cache = SerializedDataCache.from_payload(
+            payload, {key: tuple(span) for key, span in info["offsets"].items()}, info["etags"], info["etag"])
+        return DataSnapshot(unified, manifest["report"], generation=generation,
+                            data_cache=data_cache, keep_raw=keep_raw)
+
+    def wait_for_generation(self, timeout: float, interval: float = 0.2) -> int:
+        """Waits up to `timeout` seconds for a first generation; returns it (0 on timeout)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            generation = self.current_generation()
+            if generation or time.monotonic() >= deadline:
+                return generation
+            time.sleep(interval)
@@ -1,9 +1,19 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
-from main import app
+from main import app, data_manager
 
 client = TestClient(app)
 
+
+@pytest.fixture(scope="module", autouse=True)
+def started_app():
+    # Entering the client runs the app's lifespan, which loads the datasets in the background.
+    with client:
+        assert data_manager.wait_until_loaded(timeout=120), "The datasets should load."
+        yield
+
+
 def test_get_all_data():
     response = client.get("/api/data")
     assert response.status_code == 200, "GET /api/data should return status code 200."
@@ -30,6 +40,25 @@ def test_get_csv_data():
     if data:
         assert "membership_id" in data[0], "Each CSV record should contain 'membership_id'."
 
+def test_get_csv_data_reports_load_errors(monkeypatch):
+    import main
+
+    async def failing_raw_body(snapshot, source):
+        raise OSError("dataset2.csv is unreadable")
+
+    monkeypatch.setattr(main, "raw_body", failing_raw_body)
+    response = client.get("/api/data/csv")
+    assert response.status_code == 503, "A CSV that cannot be read should not be served as a 200."
+    assert "dataset2.csv is unreadable" in response.json()["detail"]
+
+def test_get_csv_data_unavailable_in_memory_limit_mode(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "CSV_MEMORY_LIMIT_MB", "256")
+    response = client.get("/api/data/csv")
+    assert response.status_code == 503, "The raw CSV endpoint should report 503 when the CSV is streamed in chunks."
+    assert "CSV_MEMORY_LIMIT_MB" in response.json()["detail"]
+
 def test_get_pdf_data():
     response = client.get("/api/data/pdf")
     assert response.status_code == 200, "GET /api/data/pdf should return status code 200."
@@ -44,3 +73,171 @@ def test_get_pptx_data():
     data = response.json().get("data")
     assert isinstance(data, dict), "PPTX endpoint should return a dictionary."
     assert "summary_metrics" in data, "PPTX data should contain 'summary_metrics'."
+
+def test_get_all_data_etag():
+    response = client.get("/api/data")
+    etag = response.headers.get("etag")
+    assert etag, "GET /api/data should return an ETag header."
+    cached = client.get("/api/data", headers={"If-None-Match": etag})
+    assert cached.status_code == 304, "A matching If-None-Match should return 304 Not Modified."
+    assert cached.content == b"", "A 304 response should not include a body."
+
+def test_get_section_data():
+    response = client.get("/api/data/membership_activity")
+    assert response.status_code == 200, "GET /api/data/membership_activity should return status code 200."
+    body = response.json()
+    assert isinstance(body["data"], list), "Section data should be a list of records."
+    assert body["total"] == len(body["data"]), "Total should match the full section size."
+
+def test_get_section_data_paginated():
+    response = client.get(
+        "/api/data/membership_activity",
+        params={"limit": 5, "offset": 2, "fields": "membership_id,revenue", "sort": "-revenue"}
+    )
+    assert response.status_code == 200, "Paginated section request should return status code 200."
+    body = response.json()
+    assert len(body["data"]) == 5, "Limit should cap the number of returned rows."
+    assert set(body["data"][0]) == {"membership_id", "revenue"}, "Fields should project the columns."
+    revenues = [r["revenue"] for r in body["data"] if r["revenue"] is not None]
+    assert revenues == sorted(revenues, reverse=True), "Rows should be sorted by descending revenue."
+    assert body["offset"] == 2 and body["limit"] == 5
+
+def test_get_section_data_errors():
+    assert client.get("/api/data/unknown_section").status_code == 404, "Unknown sections should return 404."
+    response = client.get("/api/data/membership_activity", params={"fields": "nope"})
+    assert response.status_code == 400, "Unknown fields should return 400."
+
+def test_query_membership():
+    response = client.get("/api/membership/query", params={"membership_type": "VIP", "limit": 10})
+    assert response.status_code == 200, "GET /api/membership/query should return status code 200."
+    body = response.json()
+    assert len(body["data"]) <= 10, "Limit should cap the number of returned rows."
+    assert all(r["membership_type"] == "VIP" for r in body["data"]), "Rows should match the filter."
+    assert body["total"] <= body["unfiltered_total"]
+
+def test_query_membership_search():
+    response = client.get("/api/membership/query", params={"search": "vip", "limit": 10})
+    assert response.status_code == 200
+    body = response.json()
+    assert all("vip" in (r["membership_type"] or "").lower() or "vip" in (r["membership_id"] or "").lower()
+               or "vip" in (r["activity"] or "").lower() or "vip" in (r["location"] or "").lower()
+               for r in body["data"]), "Rows should contain the search text."
+    assert body["total"] <= body["unfiltered_total"]
+
+def test_aggregate_membership():
+    response = client.get(
+        "/api/membership/aggregate",
+        params={"group_by": "year,quarter,location", "metrics": "revenue", "agg": "sum,count"}
+    )
+    assert response.status_code == 200, "GET /api/membership/aggregate should return status code 200."
+    data = response.json()["data"]
+    assert data, "Aggregation should return at least one group."
+    assert {"year", "quarter", "location", "revenue_sum", "revenue_count"} <= set(data[0])
+    assert client.get("/api/membership/aggregate", params={"agg": "median"}).status_code == 400
+    assert client.get("/api/membership/aggregate", params={"group_by": "year,year"}).status_code == 400
+
+def test_performance_pivot():
+    response = client.get("/api/performance/pivot")
+    assert response.status_code == 200, "GET /api/performance/pivot should return status code 200."
+    pivot = response.json()
+    shape = (len(pivot["companies"]), len(pivot["quarters"]))
+    for key in ["revenue", "missing", "zero"]:
+        assert (len(pivot[key]), len(pivot[key][0])) == shape, f"'{key}' should be a dense company x quarter grid."
+    missing = [[cell for cell, flag in zip(row, flags) if flag] for row, flags in zip(pivot["revenue"], pivot["missing"])]
+    assert all(cell == 0 for row in missing for cell in row), "Missing cells should be sent as 0."
+    cached = client.get("/api/performance/pivot", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+def test_reconciliation():
+    response = client.get("/api/reconciliation", params={"tolerance": 0.05})
+    assert response.status_code == 200, "GET /api/reconciliation should return status code 200."
+    result = response.json()
+    assert result["tolerance"] == 0.05
+    assert {check["source"] for check in result["checks"]} == {"pdf", "pptx"}
+    assert result["mismatches"] == sum(not check["match"] for check in result["checks"])
+    assert client.get("/api/reconciliation", params={"tolerance": -1}).status_code == 422
+
+def test_append_membership_rows():
+    before = client.get("/api/membership/query", params={"limit": 0}).json()["unfiltered_total"]
+    response = client.post("/api/membership/rows", json=[{
+        "date": "2024-02-01", "membership_id": "M900", "membership_type": "VIP", "activity": "Gym",
+        "revenue": 10.0, "duration (minutes)": 45, "location": "Downtown"
+    }])
+    assert response.status_code == 200, "POST /api/membership/rows should return status code 200."
+    assert response.json()["total"] == before + 1, "The row should be appended."
+    assert client.post("/api/membership/rows", json=[{"date": "2024-02-01"}]).status_code == 400
+
+def test_metrics_endpoint():
+    client.get("/api/data/company_info")
+    response = client.get("/metrics")
+    assert response.status_code == 200, "GET /metrics should return status code 200."
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/data/{section}"' in response.text, "Requests should be labelled with the route template."
+    assert "app_http_request_duration_seconds_bucket" in response.text
+
+def test_section_as_arrow_stream():
+    import pyarrow as pa
+    response = client.get("/api/data/membership_activity?limit=5&sort=-revenue",
+                          headers={"Accept": "application/vnd.apache.arrow.stream"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 5, "The Arrow stream should hold the requested page."
+    assert int(response.headers["x-total-count"]) >= 5
+    expected = client.get("/api/data/membership_activity?limit=5&sort=-revenue").json()["data"]
+    assert table.column("revenue").to_pylist() == [row["revenue"] for row in expected]
+
+def test_section_as_ndjson():
+    response = client.get("/api/data/company_info", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == client.get("/api/data/company_info").json()["data"], "NDJSON should hold one row per line."
+
+def test_json_is_compressed_when_accepted():
+    response = client.get("/api/data", headers={"Accept-Encoding": "gzip"})
+    assert response.headers.get("content-encoding") == "gzip", "Large JSON bodies should be gzip-compressed."
+    assert "data" in response.json()
+    etag = response.headers["etag"]
+    assert etag.endswith('-gzip"'), "The compressed representation should have its own ETag."
+    cached = client.get("/api/data", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert cached.status_code == 304
+    plain = client.get("/api/data", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == response.json()
+
+def test_memory_report():
+    response = client.get("/api/memory")
+    assert response.status_code == 200, "GET /api/memory should return status code 200."
+    report = response.json()
+    assert set(report["sections"]) == {
+        "company_info", "employee_data", "company_performance",
+        "membership_activity", "aggregated_performance", "presentation"
+    }
+    assert report["sections"]["membership_activity"]["columns"]["membership_type"]["dtype"] == "category"
+    assert report["resident_memory_bytes"] > 0
+
+def test_company_and_employee_lookups():
+    response = client.get("/api/companies/1")
+    assert response.status_code == 200, "GET /api/companies/{id} should return status code 200."
+    assert [company["name"] for company in response.json()["data"]] == ["FitPro"]
+    employee = client.get("/api/employees/E001").json()["data"][0]
+    assert employee["name"] == "Alice" and employee["company_id"] == 1
+    assert client.get("/api/companies/999").status_code == 404
+    assert client.get("/api/employees/E999").status_code == 404
+
+    response = client.get("/api/employees", params={"company_id": "1", "role": employee["role"]})
+    assert response.status_code == 200, "GET /api/employees should return status code 200."
+    assert "E001" in [row["id"] for row in response.json()["data"]]
+    rows = client.get("/api/employees", params={"hired_from": "2020-01-01", "hired_to": "2020-12-31"}).json()
+    assert rows["total"] > 0 and all("2020-01-01" <= row["hired_date"] <= "2020-12-31" for row in rows["data"])
+
+def test_health_and_readiness():
+    assert client.get("/healthz").json() == {"status": "ok"}
+    response = client.get("/readyz")
+    assert response.status_code == 200, "GET /readyz should return 200 once the datasets are loaded."
+    status = response.json()
+    assert status["ready"]
+    assert {source: info["state"] for source, info in status["sources"].items()} == {
+        "json": "ready", "csv": "ready", "pdf": "ready", "pptx": "ready"
+    }
@@ -0,0 +1,41 @@
+import pytest
+import pandas as pd
+from benchmarks.synthetic import make_datasets
+from data_ingestion import DataIngestion
+from data_processor import DataProcessor
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return make_datasets(str(tmp_path), companies=3, employees_per_company=2, quarters=2,
+                         csv_rows=50, pdf_pages=2, pptx_slides=5)
+
+
+def test_synthetic_datasets_go_through_the_pipeline(paths):
+    ingestion = DataIngestion(**paths, pdf_workers=1)
+    processor = DataProcessor(ingestion.load_json(), ingestion.load_csv(),
+                              ingestion.load_pdf(), ingestion.load_pptx())
+    unified = processor.merge_all_data()
+    assert len(unified["company_info"]) == 3, "Every synthetic company should be loaded."
+    assert len(unified["employee_data"]) == 6, "Every synthetic employee should be loaded."
+    assert len(unified["company_performance"]) == 6, "Each company should have one record per quarter."
+    assert len(unified["membership_activity"]) == 50, "Every synthetic CSV row should be loaded."
+    assert isinstance(unified["aggregated_performance"], pd.DataFrame) and len(unified["aggregated_performance"]) > 0
+    assert unified["presentation"]["summary_metrics"]["Total Revenue"] == 10400000
+    assert len(unified["presentation"]["quarterly_metrics"]) == 4
+
+
+def test_api_benchmark_reports_cold_and_uncached_latencies(paths, monkeypatch):
+    import main
+    from benchmarks.run_benchmarks import ENDPOINTS, bench_api
+    from data_executor import CoalescingExecutor
+    # The app's executor is shut down when another test leaves the client's lifespan.
+    monkeypatch.setattr(main, "data_executor", CoalescingExecutor(max_workers=1))
+    ingestion = DataIngestion(**paths, pdf_workers=1)
+    unified = DataProcessor(ingestion.load_json(), ingestion.load_csv(),
+                            ingestion.load_pdf(), ingestion.load_pptx()).merge_all_data()
+    results = bench_api(unified, requests=3)
+    assert list(results) == ENDPOINTS
+    for metrics in results.values():
+        assert metrics["requests"] == 3 and metrics["cold_ms"] > 0
+        assert metrics["p50_ms"] <= metrics["max_ms"]
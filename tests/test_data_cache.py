@@ -0,0 +1,86 @@
+import os
+import shutil
+import pytest
+import pandas as pd
+import data_cache
+from data_ingestion import DataIngestion, IngestionError
+from data_cache import (ColumnarCache, build_sources, build_unified, decode_nested_columns,
+                        encode_nested_columns, merge_sections)
+from data_serializer import SerializedDataCache
+
+
+@pytest.fixture
+def ingestion(tmp_path):
+    base_path = os.path.join(os.getcwd(), "datasets")
+    for name in ["dataset1.json", "dataset2.csv", "dataset3.pdf", "dataset4.pptx"]:
+        shutil.copy(os.path.join(base_path, name), tmp_path / name)
+    return DataIngestion(
+        json_path=str(tmp_path / "dataset1.json"),
+        csv_path=str(tmp_path / "dataset2.csv"),
+        pdf_path=str(tmp_path / "dataset3.pdf"),
+        pptx_path=str(tmp_path / "dataset4.pptx")
+    )
+
+
+def test_cached_build_matches_fresh_build(ingestion, tmp_path):
+    cache = ColumnarCache(str(tmp_path / "cache"))
+    fresh = build_unified(ingestion)
+    build_unified(ingestion, cache)
+    cached = build_unified(ingestion, cache)
+    assert list(cached) == list(fresh), "Cached build should have the same sections."
+    assert isinstance(cached["membership_activity"]["location"].dtype, pd.CategoricalDtype), \
+        "Dtypes should survive the round trip."
+    assert SerializedDataCache(cached).payload == SerializedDataCache(fresh).payload, \
+        "Cached frames should serialize exactly like freshly parsed ones."
+
+
+def test_only_changed_source_is_reparsed(ingestion, tmp_path, monkeypatch):
+    cache = ColumnarCache(str(tmp_path / "cache"))
+    build_unified(ingestion, cache)
+
+    with open(ingestion.csv_path, "a") as f:
+        f.write("2025-04-02,M999,VIP,Gym,50.0,45,Downtown\n")
+
+    loaded = []
+    original = data_cache.process_files
+    monkeypatch.setattr(data_cache, "process_files",
+                        lambda ingestion, source, *args: loaded.append(source) or original(ingestion, source, *args))
+    unified = build_unified(ingestion, cache)
+    assert loaded == ["csv"], "Only the changed CSV should be parsed again."
+    assert unified["membership_activity"]["membership_id"].iloc[-1] == "M999"
+
+
+def test_stale_or_missing_cache_returns_none(ingestion, tmp_path):
+    cache = ColumnarCache(str(tmp_path / "cache"))
+    assert cache.load("json", ingestion.json_path) is None, "An empty cache should miss."
+    build_unified(ingestion, cache)
+    assert cache.load("json", ingestion.json_path) is not None, "A fresh cache should hit."
+    with open(ingestion.json_path, "a") as f:
+        f.write("\n")
+    assert cache.load("json", ingestion.json_path) is None, "A changed source should miss."
+
+
+def test_build_sources_reports_cache_hits(ingestion, tmp_path):
+    cache = ColumnarCache(str(tmp_path / "cache"))
+    first = build_sources(ingestion, cache=cache)
+    assert not any(result["cached"] for result in first.values()), "A cold cache should parse every source."
+    second = build_sources(ingestion, cache=cache, sources=["csv", "pdf"])
+    assert list(second) == ["csv", "pdf"], "Only the requested sources should be built."
+    assert all(result["cached"] for result in second.values()), "Unchanged sources should come from the cache."
+
+
+def test_failed_source_raises_ingestion_error(ingestion, tmp_path):
+    ingestion.pdf_path = "datasets/missing.pdf"
+    results = build_sources(ingestion, cache=ColumnarCache(str(tmp_path / "cache")))
+    assert not results["pdf"]["ok"] and results["json"]["ok"], "Failures should be reported per source."
+    with pytest.raises(IngestionError, match="pdf"):
+        merge_sections(results)
+
+
+def test_nested_columns_round_trip():
+    df = pd.DataFrame({"id": [1, 2, 3], "employees": [[{"id": "E1"}], None, []], "name": ["A", None, "C"]})
+    encoded, json_columns = encode_nested_columns(df)
+    assert json_columns == ["employees"]
+    assert encoded["employees"].tolist() == ['[{"id": "E1"}]', None, "[]"]
+    assert "employees" in df and df["employees"][0] == [{"id": "E1"}], "The input frame should not be modified."
+    pd.testing.assert_frame_equal(decode_nested_columns(encoded.copy(), json_columns), df)
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+import pytest
+from data_executor import CoalescingExecutor
+
+
+def test_concurrent_calls_with_the_same_key_share_one_computation():
+    executor = CoalescingExecutor(max_workers=4)
+    calls = []
+
+    def build(value):
+        calls.append(value)
+        time.sleep(0.05)
+        return value * 2
+
+    async def burst():
+        return await asyncio.gather(*[executor.run(("section", 1), build, 21) for _ in range(10)])
+
+    assert asyncio.run(burst()) == [42] * 10
+    assert calls == [21], "Simultaneous requests for the same key should trigger one computation."
+    assert asyncio.run(executor.run(("section", 1), build, 21)) == 42
+    assert calls == [21], "A completed result should be served from the cache."
+    executor.shutdown()
+
+
+def test_results_are_computed_off_the_calling_thread():
+    executor = CoalescingExecutor(max_workers=1)
+    thread = asyncio.run(executor.run("key", lambda: threading.current_thread()))
+    assert thread is not threading.current_thread()
+    executor.shutdown()
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    executor = CoalescingExecutor(max_workers=2)
+    attempts = []
+
+    def fail():
+        attempts.append(1)
+        time.sleep(0.02)
+        raise ValueError("bad field")
+
+    async def burst():
+        return await asyncio.gather(*[executor.run("key", fail) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(burst())
+    assert all(isinstance(result, ValueError) for result in results)
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run("key", fail))
+    assert len(attempts) == 2, "A failed computation should be retried by the next request."
+    executor.shutdown()
+
+
+def test_cache_is_bounded():
+    executor = CoalescingExecutor(max_workers=1, cache_size=2)
+    for key in range(3):
+        asyncio.run(executor.run(key, lambda key=key: key))
+    assert list(executor._results) == [1, 2], "The least recently used result should be evicted."
+    executor.shutdown()
+
+
+def test_cache_is_bounded_by_total_bytes():
+    executor = CoalescingExecutor(max_workers=1, cache_bytes=100)
+    calls = []
+
+    def build(size):
+        calls.append(size)
+        return b"x" * size
+
+    async def fetch(key, size):
+        return await executor.run(key, build, size)
+
+    asyncio.run(fetch("a", 60))
+    asyncio.run(fetch("b", 30))
+    assert executor.cached_bytes == 90
+    asyncio.run(fetch("c", 30))
+    assert executor.cached_bytes == 60, "The least recently used result should be evicted to stay under the budget."
+    asyncio.run(fetch("a", 60))
+    assert calls == [60, 30, 30, 60]
+
+    asyncio.run(fetch("big", 500))
+    asyncio.run(fetch("big", 500))
+    assert calls[-2:] == [500, 500], "Results larger than the budget should not be cached."
+    assert executor.cached_bytes <= 100
+    executor.shutdown()
+
+
+def test_cancelling_one_waiter_does_not_cancel_the_shared_computation():
+    executor = CoalescingExecutor(max_workers=1)
+    blocker = threading.Event()
+    executor._pool.submit(blocker.wait)
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run_uncached("key", lambda: 42))
+        second = asyncio.ensure_future(executor.run_uncached("key", lambda: 42))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        blocker.set()
+        return await second
+
+    assert asyncio.run(scenario()) == 42
+    executor.shutdown()
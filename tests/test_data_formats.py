@@ -0,0 +1,50 @@
+import gzip
+import pandas as pd
+import pytest
+import pyarrow as pa
+from data_formats import (ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE, compress, encode_arrow,
+                          iter_ndjson, negotiate_encoding, negotiate_media_type)
+
+
+def test_negotiate_media_type():
+    assert negotiate_media_type(None) == JSON_MEDIA_TYPE
+    assert negotiate_media_type("*/*") == JSON_MEDIA_TYPE
+    assert negotiate_media_type(ARROW_MEDIA_TYPE) == ARROW_MEDIA_TYPE
+    assert negotiate_media_type(f"application/json;q=0.5, {NDJSON_MEDIA_TYPE}") == NDJSON_MEDIA_TYPE
+    assert negotiate_media_type(f"{ARROW_MEDIA_TYPE};q=0, application/json") == JSON_MEDIA_TYPE
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("gzip;q=0, br;q=0, *") is None, "q=0 should refuse an encoding that * would allow."
+    assert negotiate_encoding("gzip;q=0, *") != "gzip"
+    assert negotiate_encoding("*") in ("gzip", "br")
+    assert gzip.decompress(compress(b"abc" * 100, "gzip")) == b"abc" * 100
+
+
+def test_brotli_compression():
+    brotli = pytest.importorskip("brotli")
+    assert negotiate_encoding("gzip, br") == "br", "br should be preferred when installed."
+    assert brotli.decompress(compress(b"abc" * 100, "br")) == b"abc" * 100
+
+
+def test_encode_arrow_keeps_types_and_flattens_nested_values():
+    df = pd.DataFrame({
+        "type": pd.Categorical(["VIP", "Basic"]),
+        "date": pd.to_datetime(["2024-01-01", "2024-01-02"]),
+        "employees": [[{"id": "E1"}], []],
+    })
+    table = pa.ipc.open_stream(encode_arrow(df)).read_all()
+    assert pa.types.is_dictionary(table.schema.field("type").type), "Categoricals should stay dictionary-encoded."
+    assert pa.types.is_timestamp(table.schema.field("date").type)
+    assert table.column("employees").to_pylist() == ['[{"id": "E1"}]', "[]"]
+
+
+def test_iter_ndjson_streams_rows_in_chunks():
+    df = pd.DataFrame({"a": [1, 2, 3], "b": [0.5, None, 1.5]})
+    chunks = list(iter_ndjson(df, chunk_rows=2))
+    assert len(chunks) == 2, "Rows should be produced chunk by chunk."
+    assert b"".join(chunks) == b'{"a":1,"b":0.5}\n{"a":2,"b":null}\n{"a":3,"b":1.5}\n'
@@ -1,7 +1,9 @@
+import io
+import json
 import os
 import pytest
 import pandas as pd
-from data_ingestion import DataIngestion
+from data_ingestion import DataIngestion, iter_json_array
 
 @pytest.fixture
 def ingestion():
@@ -45,3 +47,122 @@ def test_load_pptx(ingestion):
     # Check for the required keys in the PPTX output
     for key in ["summary_metrics", "quarterly_metrics", "revenue_breakdown"]:
         assert key in pptx_data, f"Expected key '{key}' not found in PPTX data."
+
+def test_iter_json_companies_matches_load_json(ingestion):
+    companies = list(ingestion.iter_json_companies())
+    assert companies == ingestion.load_json()["companies"], "Streaming should yield the same companies."
+
+def test_iter_json_array_across_small_reads():
+    document = {"before": {"skip": [1, 2.5, "x"]}, "items": [{"id": 12345, "v": -0.5e3}, [], "s\"]", 7], "after": None}
+    for indent in (None, 2):
+        f = io.StringIO(json.dumps(document, indent=indent))
+        assert list(iter_json_array(f, "items", read_size=3)) == document["items"], \
+            "Values split across reads (including numbers) should decode intact."
+    with pytest.raises(KeyError):
+        list(iter_json_array(io.StringIO('{"other": []}'), "items"))
+
+def test_iter_csv_chunks(ingestion):
+    full = ingestion.load_csv()
+    chunks = list(ingestion.iter_csv_chunks(chunksize=30))
+    assert len(chunks) == -(-len(full) // 30), "The CSV should be split into chunks of the requested size."
+    assert sum(len(chunk) for chunk in chunks) == len(full), "Chunks should cover every row."
+    first = chunks[0]
+    assert pd.api.types.is_datetime64_any_dtype(first["date"]), "Dates should be parsed while streaming."
+    assert isinstance(first["membership_type"].dtype, pd.CategoricalDtype), "Membership type should be categorical."
+    for col in first.columns:
+        assert col == col.lower(), f"Column '{col}' should be lowercase."
+
+def test_csv_chunksize_respects_memory_limit(ingestion):
+    small = ingestion.csv_chunksize(memory_limit_mb=0.01)
+    large = ingestion.csv_chunksize(memory_limit_mb=10)
+    assert 1 <= small < large, "A larger memory ceiling should allow larger chunks."
+
+def test_load_all(ingestion):
+    results = ingestion.load_all()
+    assert list(results) == ["json", "csv", "pdf", "pptx"], "Every source should have a result."
+    for source, result in results.items():
+        assert result["ok"], f"Source '{source}' should load without errors."
+        assert result["seconds"] >= 0, "Each result should record its duration."
+    assert isinstance(results["csv"]["data"], pd.DataFrame), "Loaded data should be returned in the result."
+
+def test_load_all_reports_failures(ingestion):
+    ingestion.csv_path = "datasets/missing.csv"
+    results = ingestion.load_all(sources=["json", "csv"])
+    assert results["json"]["ok"], "A failing source should not affect the others."
+    assert not results["csv"]["ok"], "The missing CSV should be reported as failed."
+    assert "FileNotFoundError" in results["csv"]["error"], "The error should name the exception."
+
+def make_multipage_pdf(source_pdf, path, pages):
+    """Writes a PDF made of `pages` copies of the first page of source_pdf."""
+    import pypdfium2
+    src = pypdfium2.PdfDocument(source_pdf)
+    dst = pypdfium2.PdfDocument.new()
+    for _ in range(pages):
+        dst.import_pages(src, [0])
+    dst.save(str(path))
+
+def test_iter_pdf_rows_sharded_matches_sequential(ingestion, tmp_path):
+    pdf_path = tmp_path / "report.pdf"
+    make_multipage_pdf(ingestion.pdf_path, pdf_path, 5)
+    single_page = ingestion.load_pdf()
+
+    sequential = DataIngestion(pdf_path=str(pdf_path), pdf_workers=1).load_pdf()
+    sharded = DataIngestion(pdf_path=str(pdf_path), pdf_workers=2)
+    sharded.PDF_PAGES_PER_SHARD = 2
+    rows = list(sharded.iter_pdf_rows())
+    assert rows == sequential, "Sharded extraction should return rows in page order."
+    assert rows == single_page * 5, "Every page's rows should be included."
+
+def test_pdf_page_cache_extracts_only_new_pages(ingestion, tmp_path, monkeypatch):
+    import pdfplumber.page
+    pdf_path = tmp_path / "report.pdf"
+    cache_dir = str(tmp_path / "pages")
+    make_multipage_pdf(ingestion.pdf_path, pdf_path, 3)
+    first = DataIngestion(pdf_path=str(pdf_path), pdf_workers=1, pdf_page_cache_dir=cache_dir).load_pdf()
+
+    extracted = []
+    original = pdfplumber.page.Page.extract_table
+    monkeypatch.setattr(pdfplumber.page.Page, "extract_table",
+                        lambda self, *a, **k: extracted.append(self.page_number) or original(self, *a, **k))
+    make_multipage_pdf(ingestion.pdf_path, pdf_path, 4)
+    second = DataIngestion(pdf_path=str(pdf_path), pdf_workers=1, pdf_page_cache_dir=cache_dir).load_pdf()
+    assert extracted == [4], "Only the appended page should be extracted."
+    assert second[:len(first)] == first, "Cached pages should return the same rows."
+
+def test_read_csv_tail(ingestion, tmp_path):
+    csv_path = tmp_path / "membership.csv"
+    with open(ingestion.csv_path) as f:
+        csv_path.write_text(f.read())
+    tail_ingestion = DataIngestion(csv_path=str(csv_path))
+    offset = os.path.getsize(csv_path)
+    with open(csv_path, "a") as f:
+        f.write("2025-04-02,M999,VIP,Gym,50.0,45,Downtown\n2025-04-03,M1000,Basic")
+    rows, new_offset = tail_ingestion.read_csv_tail(offset)
+    assert list(rows["membership_id"]) == ["M999"], "Only complete appended lines should be read."
+    assert "duration (minutes)" in rows.columns, "Tail rows should use the normalized column names."
+    assert new_offset == offset + len("2025-04-02,M999,VIP,Gym,50.0,45,Downtown\n")
+
+def test_pptx_slides_are_memoized_by_content(ingestion, tmp_path, monkeypatch):
+    from pptx import Presentation
+    import data_ingestion
+    deck = Presentation(ingestion.pptx_path)
+    for index in range(40):
+        deck.slides.add_slide(deck.slide_layouts[5]).shapes.title.text = f"Appendix {index}"
+    pptx_path = tmp_path / "deck.pptx"
+    deck.save(pptx_path)
+    cache_dir = str(tmp_path / "slides")
+    first = DataIngestion(pptx_path=str(pptx_path), pptx_slide_cache_dir=cache_dir).load_pptx()
+    assert first == ingestion.load_pptx(), "Extra slides should not change the result."
+
+    for shape in deck.slides[2].shapes:
+        if shape.has_text_frame and "Gym" in shape.text:
+            shape.text_frame.text = shape.text.replace("Gym: 40%", "Gym: 41%")
+    deck.save(pptx_path)
+    parsed = []
+    original = data_ingestion._pptx_slide_content
+    monkeypatch.setattr(data_ingestion, "_pptx_slide_content",
+                        lambda xml: parsed.append(xml) or original(xml))
+    second = DataIngestion(pptx_path=str(pptx_path), pptx_slide_cache_dir=cache_dir).load_pptx()
+    assert len(parsed) == 1, "Only the changed slide should be parsed again."
+    assert second["revenue_breakdown"]["Gym"] == 41
+    assert second["summary_metrics"] == first["summary_metrics"]
@@ -0,0 +1,140 @@
+import os
+import shutil
+import pytest
+import pandas as pd
+from data_ingestion import DataIngestion
+from data_manager import DataManager, DatasetWatcher
+
+
+@pytest.fixture
+def ingestion(tmp_path):
+    base_path = os.path.join(os.getcwd(), "datasets")
+    for name in ["dataset1.json", "dataset2.csv", "dataset3.pdf", "dataset4.pptx"]:
+        shutil.copy(os.path.join(base_path, name), tmp_path / name)
+    return DataIngestion(
+        json_path=str(tmp_path / "dataset1.json"),
+        csv_path=str(tmp_path / "dataset2.csv"),
+        pdf_path=str(tmp_path / "dataset3.pdf"),
+        pptx_path=str(tmp_path / "dataset4.pptx")
+    )
+
+
+def append_membership_row(ingestion):
+    with open(ingestion.csv_path, "a") as f:
+        f.write("2025-04-02,M999,VIP,Gym,50.0,45,Downtown\n")
+
+
+def test_reload_rebuilds_only_changed_source(ingestion):
+    manager = DataManager(ingestion)
+    old = manager.load()
+    append_membership_row(ingestion)
+    new = manager.reload(["csv"])
+
+    assert new is manager.current and new.generation == old.generation + 1, "A new snapshot should be published."
+    assert len(new.unified["membership_activity"]) == len(old.unified["membership_activity"]) + 1
+    assert len(old.membership_engine.df) == len(old.unified["membership_activity"]), \
+        "The previous snapshot should be left untouched."
+    assert new.unified["company_info"] is old.unified["company_info"], "Unchanged sections should be reused."
+    assert new.data_cache.section("company_info") is old.data_cache.section("company_info")
+    assert new.data_cache.etag != old.data_cache.etag, "The full payload ETag should change."
+
+
+def test_failed_reload_keeps_current_snapshot(ingestion):
+    manager = DataManager(ingestion)
+    old = manager.load()
+    os.remove(ingestion.pdf_path)
+    assert manager.reload(["pdf"]) is old, "A failed reload should keep the previous snapshot."
+    assert "pdf" in str(manager.last_reload_error)
+
+
+def test_lazy_source_is_loaded_on_first_use(ingestion):
+    manager = DataManager(ingestion, lazy_sources=["pdf"])
+    snapshot = manager.load()
+    assert "aggregated_performance" not in snapshot.unified, "A lazy source should not be parsed up front."
+    assert manager.status()["sources"]["pdf"]["state"] == "lazy"
+    assert manager.ensure_loaded(["csv"]) is snapshot, "Loaded sources should not trigger a reload."
+
+    loaded = manager.ensure_loaded(["pdf"])
+    assert not loaded.unified["aggregated_performance"].empty
+    assert loaded.membership_engine is snapshot.membership_engine, "Other sources should be reused."
+    assert manager.status()["sources"]["pdf"]["state"] == "ready"
+
+
+def test_background_load_reports_failed_sources(ingestion, caplog):
+    os.remove(ingestion.pdf_path)
+    manager = DataManager(ingestion)
+    manager.start_loading()
+    assert not manager.wait_until_loaded(timeout=60), "No snapshot should be published when a source fails."
+    assert any(record.exc_info for record in caplog.records if record.name == "data_manager"), \
+        "The load failure should be logged with its traceback."
+    status = manager.status()
+    assert not status["ready"] and manager.load_error is not None
+    assert status["sources"]["pdf"]["state"] == "failed" and status["sources"]["pdf"]["error"]
+    assert status["sources"]["csv"]["error"] is None
+
+
+def test_watcher_reports_settled_changes(ingestion):
+    watcher = DatasetWatcher(ingestion, on_change=None)
+    pending = {}
+    assert watcher.poll(pending) == [], "Nothing changed yet."
+    append_membership_row(ingestion)
+    assert watcher.poll(pending) == [], "A new change should wait one interval to settle."
+    assert watcher.poll(pending) == ["csv"], "A settled change should be reported."
+    assert watcher.poll(pending) == [], "A change should be reported only once."
+
+
+def test_appended_csv_tail_is_processed_incrementally(ingestion):
+    manager = DataManager(ingestion)
+    old = manager.load()
+    append_membership_row(ingestion)
+    new = manager.reload(["csv"])
+
+    assert new.membership_engine.df["membership_id"].iloc[-1] == "M999", "The appended row should be added."
+    assert new.report is old.report, "The CSV should not be re-parsed in full."
+    rebuilt = DataManager(ingestion).load()
+    assert new.data_cache.payload == rebuilt.data_cache.payload, \
+        "Incremental results should match a full rebuild."
+
+
+def test_edited_csv_is_reloaded_in_full_even_when_rows_are_appended(ingestion):
+    manager = DataManager(ingestion)
+    manager.load()
+    append_membership_row(ingestion)
+    manager.reload(["csv"])
+    with open(ingestion.csv_path) as f:
+        text = f.read()
+    with open(ingestion.csv_path, "w") as f:
+        f.write(text.replace("M001,Basic,Gym,113.82", "M001,Basic,Gym,999.99", 1))
+    append_membership_row(ingestion)
+    new = manager.reload(["csv"])
+    assert new.unified["membership_activity"]["revenue"].max() == 999.99, "An edit before the offset should be seen."
+    rebuilt = DataManager(ingestion).load()
+    assert new.data_cache.payload == rebuilt.data_cache.payload
+
+
+def test_append_membership_rows(ingestion):
+    manager = DataManager(ingestion)
+    old = manager.load()
+    rows = pd.DataFrame([{
+        "Date": "2023-11-05", "Membership_ID": "M500", "Membership_Type": "Basic", "Activity": "Gym",
+        "Revenue": 12.5, "Duration (Minutes)": 30, "Location": "Downtown"
+    }])
+    new = manager.append_membership_rows(rows)
+    totals = new.membership_aggregates.rollup(group_by=["year"], metrics=["revenue"], aggregations=["sum"])
+    assert 2023 in set(totals["year"]), "Aggregates should include the appended row."
+    assert len(new.unified["membership_activity"]) == len(old.unified["membership_activity"]) + 1
+    with pytest.raises(ValueError):
+        manager.append_membership_rows(pd.DataFrame([{"date": "2024-01-01"}]))
+
+
+def test_compact_mode_serves_the_same_data_with_less_memory(ingestion):
+    regular = DataManager(ingestion).load()
+    compact = DataManager(ingestion, compact=True).load()
+    assert compact.data_cache.payload == regular.data_cache.payload, "Compact dtypes should not change the output."
+    report = compact.memory_report()
+    assert report["sections_bytes"] < regular.memory_report()["sections_bytes"]
+    assert report["sections"]["employee_data"]["columns"]["hired_date"]["dtype"] == "datetime64[ns]"
+    compact.raw_source(ingestion, "json")
+    assert compact.memory_report()["raw_sources"] == {}, "Compact mode should not keep raw sources."
+    regular.raw_source(ingestion, "json")
+    assert "json" in regular.memory_report()["raw_sources"]
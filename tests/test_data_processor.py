@@ -3,7 +3,7 @@ import pytest
 import pandas as pd
 import datetime
 from data_ingestion import DataIngestion
-from data_processor import DataProcessor
+from data_processor import DataProcessor, compact_frame
 
 
 @pytest.fixture
@@ -111,3 +111,79 @@ def test_merge_all_data(processor):
     assert isinstance(merged["membership_activity"], pd.DataFrame), "membership_activity should be a DataFrame."
     assert isinstance(merged["aggregated_performance"], pd.DataFrame), "aggregated_performance should be a DataFrame."
     assert isinstance(merged["presentation"], dict), "presentation should be a dictionary."
+
+
+def test_process_membership_data_dtypes(processor):
+    """
+    Test that membership activity keeps compact, vectorized dtypes.
+    """
+    df = processor.process_membership_data()
+    assert pd.api.types.is_datetime64_any_dtype(df["date"]), "The 'date' column should be datetime64."
+    assert df["year"].dtype == "int16", "Year should be stored as int16."
+    for col in ["membership_type", "activity", "location", "quarter"]:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype), f"Column '{col}' should be categorical."
+    expected_quarters = ["Q" + str((d.month - 1) // 3 + 1) for d in df["date"]]
+    assert list(df["quarter"]) == expected_quarters, "Quarter should match the month of each date."
+
+
+def test_process_json_data_matches_json_normalize():
+    """
+    Test that the single-pass JSON processing builds the same tables as pd.json_normalize,
+    including irregular records and companies streamed from an iterator.
+    """
+    companies = [
+        {"id": 1, "name": "A", "employees": [{"id": "E1", "pay": {"base": 10}}], "extra": {"a": {"b": 1}},
+         "performance": {"Q1": {"revenue": 5, "profit_margin": 1.5}}},
+        {"id": 2, "name": None, "employees": [], "extra": {}},
+        {"id": 3, "employees": None, "tags": ["x"], "performance": {"Q2": {"revenue": 7}}},
+        {"id": 4, "employees": [{"id": "E2", "role": "Coach"}, {"id": "E3"}]},
+    ]
+    result = DataProcessor(None, json_companies=iter(companies)).process_json_data()
+    pd.testing.assert_frame_equal(result["companies"], pd.json_normalize(companies, sep="_"))
+    pd.testing.assert_frame_equal(
+        result["employees"], pd.json_normalize(companies, "employees", ["id"], meta_prefix="company_"))
+    assert result["performance"]["company_id"].tolist() == [1, 3]
+
+    base_path = os.path.join(os.getcwd(), "datasets")
+    ingestion = DataIngestion(json_path=os.path.join(base_path, "dataset1.json"))
+    streamed = DataProcessor(None, json_companies=ingestion.iter_json_companies()).process_json_data()
+    loaded = DataProcessor(ingestion.load_json()).process_json_data()
+    for key in ["companies", "employees", "performance"]:
+        pd.testing.assert_frame_equal(streamed[key], loaded[key])
+
+
+def test_process_membership_chunks_matches_full_load(processor):
+    """
+    Test that streaming the CSV in chunks gives the same result as loading it whole.
+    """
+    ingestion = DataIngestion(csv_path=os.path.join(os.getcwd(), "datasets", "dataset2.csv"))
+    streamed = DataProcessor({}, csv_chunks=ingestion.iter_csv_chunks(chunksize=17)).process_membership_data()
+    full = processor.process_membership_data()
+    pd.testing.assert_frame_equal(streamed, full, check_categorical=True)
+    assert isinstance(streamed["location"].dtype, pd.CategoricalDtype), "Location should stay categorical."
+    assert list(streamed["activity"].cat.categories) == sorted(full["activity"].unique()), \
+        "Categories should not depend on chunk boundaries."
+
+
+def test_compact_frame_keeps_columns_with_invalid_dates():
+    from data_serializer import encode_json
+    df = pd.DataFrame({"hired_date": ["2020-01-15", "2024-02-30", None, "2021-03-12"]})
+    compact = compact_frame(df)
+    assert not pd.api.types.is_datetime64_any_dtype(compact["hired_date"]), "A malformed date should not become NaT."
+    assert encode_json(compact) == encode_json(df)
+
+
+def test_compact_frame_shrinks_dtypes_without_changing_values(processor):
+    from data_serializer import encode_json
+    employees = processor.process_json_data()["employees"]
+    compact = compact_frame(employees)
+    assert str(compact["hired_date"].dtype) == "datetime64[ns]", "ISO date strings should become datetime64."
+    assert compact["cashmoneh"].dtype.itemsize < employees["cashmoneh"].dtype.itemsize, "Integers should be downcast."
+    assert compact.memory_usage(deep=True).sum() < employees.memory_usage(deep=True).sum()
+    assert encode_json(compact) == encode_json(employees), "Compact frames should encode to the same JSON."
+
+    df = pd.DataFrame({"kind": ["a", "a", "b", "a"], "price": [1.5, 2.0, 0.25, 4.0], "exact": [0.1, 0.2, 0.3, 0.4]})
+    compact = compact_frame(df)
+    assert isinstance(compact["kind"].dtype, pd.CategoricalDtype), "Repetitive strings should become categoricals."
+    assert str(compact["price"].dtype) == "float32", "Floats exactly representable in float32 should be downcast."
+    assert str(compact["exact"].dtype) == "float64", "Floats that would lose precision should be kept."
@@ -0,0 +1,200 @@
+import pandas as pd
+import pytest
+from data_query import CompanyIndex, MembershipAggregates, MembershipQueryEngine, performance_pivot, reconcile, select_page
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "id": ["a", "b", "c", "d"],
+        "year": [2024, 2023, 2024, 2023],
+        "revenue": [10.0, 30.0, 20.0, None]
+    })
+
+
+def test_select_page_limit_offset(frame):
+    page, total = select_page(frame, offset=1, limit=2)
+    assert total == 4, "Total should count every row in the section."
+    assert list(page["id"]) == ["b", "c"], "Offset and limit should slice rows."
+
+
+def test_select_page_sort_and_fields(frame):
+    page, _ = select_page(frame, fields="id", sort="year,-revenue")
+    assert list(page.columns) == ["id"], "Fields should project the requested columns."
+    assert list(page["id"]) == ["b", "d", "c", "a"], "Rows should be sorted by year then descending revenue."
+
+
+def test_select_page_rejects_unknown_columns(frame):
+    with pytest.raises(ValueError):
+        select_page(frame, fields="id,missing")
+    with pytest.raises(ValueError):
+        select_page(frame, sort="-missing")
+
+
+@pytest.fixture
+def engine():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2024-03-01", "2024-01-15", "2024-05-02", "2024-02-10"]).date,
+        "membership_id": ["M1", "M2", "M3", "M4"],
+        "membership_type": ["Basic", "VIP", "Basic", "Premium"],
+        "activity": ["Gym", "Pool", "Gym", "Yoga"],
+        "revenue": [10.0, 20.0, 30.0, None],
+        "duration (minutes)": [60, 30, 90, 45],
+        "location": ["Downtown", "Eastside", "Eastside", "Downtown"],
+        "year": [2024, 2024, 2024, 2024],
+        "quarter": ["Q1", "Q1", "Q2", "Q1"]
+    })
+    return MembershipQueryEngine(df)
+
+
+def test_engine_filters(engine):
+    rows = engine.filter(membership_type="Basic")
+    assert list(rows["membership_id"]) == ["M1", "M3"], "Filter should match the membership type."
+    rows = engine.filter(location=["Eastside"], date_from="2024-01-01", date_to="2024-03-01")
+    assert list(rows["membership_id"]) == ["M2"], "Date range should be inclusive and combine with filters."
+    assert engine.filter(activity="Unknown").empty, "Unknown values should match no rows."
+
+
+def test_engine_search(engine):
+    assert list(engine.filter(search="east")["membership_id"]) == ["M2", "M3"], "Search should match categories."
+    assert list(engine.filter(search="m4")["membership_id"]) == ["M4"], "Search should match membership IDs."
+    rows = engine.filter(search="gym", location="Eastside")
+    assert list(rows["membership_id"]) == ["M3"], "Search should combine with the other filters."
+    assert engine.filter(search="nothing").empty
+
+
+def test_engine_aggregate(engine):
+    result = engine.aggregate(group_by=["quarter"], metrics=["revenue"], aggregations=["sum", "count"])
+    assert list(result.columns) == ["quarter", "revenue_sum", "revenue_count"]
+    q1 = result[result["quarter"] == "Q1"].iloc[0]
+    assert q1["revenue_sum"] == 30.0, "Q1 revenue should be summed, ignoring missing values."
+    assert q1["revenue_count"] == 2
+
+    result = engine.aggregate(group_by=["location"], metrics=["duration (minutes)"],
+                              aggregations=["mean"], membership_type="Basic")
+    assert dict(zip(result["location"], result["duration (minutes)_mean"])) == {"Downtown": 60, "Eastside": 90}
+
+    with pytest.raises(ValueError):
+        engine.aggregate(group_by=["membership_id"])
+
+
+def test_engine_appended_matches_rebuilt(engine):
+    extra = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-20", "2024-06-30"]).date,
+        "membership_id": ["M5", "M6"],
+        "membership_type": ["VIP", "Basic"],
+        "activity": ["Pool", "Climbing"],
+        "revenue": [5.0, 6.0],
+        "duration (minutes)": [30, 60],
+        "location": ["Uptown", "Downtown"],
+        "year": [2024, 2024],
+        "quarter": ["Q1", "Q2"]
+    })
+    combined = pd.concat([engine.df, extra], ignore_index=True)
+    appended = engine.appended(combined)
+    rebuilt = MembershipQueryEngine(combined)
+    for filters in [{"date_from": "2024-01-16", "date_to": "2024-03-01"}, {"location": "Uptown"},
+                    {"activity": "Climbing", "date_to": "2024-12-31"}]:
+        assert list(appended.filter(**filters)["membership_id"]) == \
+            list(rebuilt.filter(**filters)["membership_id"]), f"Appended index should match for {filters}."
+    assert len(engine.df) == 4, "The original engine should be unchanged."
+
+
+def test_aggregates_update_and_rollup(engine):
+    df = engine.df
+    full = MembershipAggregates(df)
+    incremental = MembershipAggregates(df.iloc[:2]).updated(df.iloc[2:])
+    expected = engine.aggregate(group_by=["year", "quarter", "location"])
+    for aggregates in (full, incremental):
+        result = aggregates.rollup(group_by=["year", "quarter", "location"])
+        pd.testing.assert_frame_equal(result.astype(str), expected.astype(str))
+    by_year = incremental.rollup(group_by=["year"], metrics=["revenue"], aggregations=["mean"])
+    assert by_year["revenue_mean"].iloc[0] == pytest.approx(20.0), "Means should roll up from sums and counts."
+    by_activity = incremental.rollup(group_by=["activity", "year"])
+    pd.testing.assert_frame_equal(by_activity.astype(str),
+                                  engine.aggregate(group_by=["activity", "year"]).astype(str))
+    assert set(incremental._cuboids) >= {("year", "activity"), ("year",)}, "Cuboids should be kept for reuse."
+    with pytest.raises(ValueError):
+        full.rollup(group_by=["date"])
+    with pytest.raises(ValueError, match="Duplicate"):
+        full.rollup(group_by=["year", "year"])
+    with pytest.raises(ValueError, match="Duplicate"):
+        engine.aggregate(group_by=["year", "year"], location="Downtown")
+
+
+def test_aggregates_keep_rows_with_null_dimensions(engine):
+    df = engine.df.copy()
+    df.loc[1, "location"] = None
+    nulls = MembershipQueryEngine(df)
+    for aggregates in (MembershipAggregates(df), MembershipAggregates(df.iloc[:1]).updated(df.iloc[1:])):
+        for group_by in (["year"], ["location"], ["year", "quarter", "location"]):
+            pd.testing.assert_frame_equal(aggregates.rollup(group_by=group_by).astype(str),
+                                          nulls.aggregate(group_by=group_by).astype(str))
+    assert MembershipAggregates(df).rollup(group_by=["year"])["revenue_sum"].iloc[0] == pytest.approx(60.0), \
+        "Rows with a null location should still count towards coarser groupings."
+
+
+def test_reconcile_against_report_and_deck(engine):
+    aggregates = MembershipAggregates(engine.df)
+    report = pd.DataFrame({
+        "Year": [2024, 2024, 2023],
+        "Quarter": ["Q1", "Q2", "Q4"],
+        "Revenue (in $)": [30.0, 35.0, 5.0],
+        "Memberships Sold": [3, 1, 2],
+        "Avg Duration (Minutes)": [45, 90, 60]
+    })
+    presentation = {
+        "summary_metrics": {"Total Revenue": 60, "Total Memberships Sold": 4, "Top Location": "Downtown"},
+        "quarterly_metrics": [{"Quarter": "Q1", "Revenue (in $)": 30.0, "Memberships Sold": "3",
+                               "Avg Duration (Minutes)": "45"}],
+        "revenue_breakdown": {"Gym": 66.5, "Pool": 20}
+    }
+    result = reconcile(aggregates, report, presentation)
+    checks = {(c["source"], c.get("year"), c.get("quarter") or c.get("activity"), c["metric"]): c
+              for c in result["checks"]}
+    assert result["year"] == 2024, "The deck should default to the latest year."
+    assert all(checks[("pdf", 2024, "Q1", metric)]["match"]
+               for metric in ["revenue", "memberships_sold", "avg_duration"])
+    assert checks[("pdf", 2024, "Q2", "revenue")]["difference"] == pytest.approx(-5.0)
+    assert checks[("pdf", 2023, "Q4", "revenue")]["computed"] is None, "Periods missing from the cube should not match."
+    assert checks[("pptx", 2024, "Q1", "memberships_sold")]["match"], "Numeric strings should be compared as numbers."
+    assert checks[("pptx", 2024, "Q2", "revenue")]["reported"] is None
+    assert checks[("pptx", 2024, None, "total_revenue")]["match"]
+    assert checks[("pptx", 2024, None, "top_location")]["computed"] == "Eastside"
+    assert checks[("pptx", 2024, "Gym", "revenue_share")]["match"], "Shares should match within the tolerance."
+    assert not checks[("pptx", 2024, "Pool", "revenue_share")]["match"]
+    assert result["mismatches"] == sum(not c["match"] for c in result["checks"])
+
+
+def test_performance_pivot_flags_missing_and_zero_cells():
+    performance = pd.DataFrame({
+        "company_id": [1, 1, 2, 2, 1, None],
+        "quarter": ["Q1", "Q2", "Q1", "Q2", "Q1", "Q3"],
+        "revenue": [5.0, 0.0, None, 7.0, 9.0, 4.0]
+    })
+    pivot = performance_pivot(performance)
+    assert pivot["companies"] == [1, 2] and pivot["quarters"] == ["Q1", "Q2", "Q3"]
+    assert pivot["revenue"].tolist() == [[5.0, 0.0, 0.0], [0.0, 7.0, 0.0]], "The first record of a cell should win."
+    assert pivot["missing"].tolist() == [[False, False, True], [True, False, True]]
+    assert pivot["zero"].tolist() == [[False, True, False], [False, False, False]]
+    assert performance_pivot(pd.DataFrame())["companies"] == []
+
+
+def test_company_index_lookups():
+    companies = pd.DataFrame({"id": [1, 2], "name": ["FitPro", "Gym Co"]}, index=[5, 6])
+    employees = pd.DataFrame({
+        "id": ["E1", "E2", "E3", "E4"],
+        "role": ["Trainer", "Manager", "Trainer", "Trainer"],
+        "hired_date": ["2020-01-15", "2019-06-22", None, "2021-03-12"],
+        "company_id": [1, 1, 2, 2]
+    })
+    index = CompanyIndex(companies, employees)
+    assert list(index.company("2")["name"]) == ["Gym Co"], "Ids should match as text."
+    assert index.company(3).empty and index.employee("E9").empty
+    assert list(index.employee("E3")["role"]) == ["Trainer"]
+    assert list(index.filter_employees(company_id=["1"])["id"]) == ["E1", "E2"]
+    assert list(index.filter_employees(role="Trainer", company_id=[2])["id"]) == ["E3", "E4"]
+    assert list(index.filter_employees(hired_from="2019-06-22", hired_to="2020-01-15")["id"]) == ["E1", "E2"], \
+        "Hire date ranges should be inclusive and skip missing dates."
+    assert list(index.filter_employees(role="Trainer", hired_from="2020-06-01")["id"]) == ["E4"]
+    assert len(index.filter_employees()) == 4
@@ -0,0 +1,106 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import data_serializer
+from data_serializer import SerializedDataCache, encode_json, etag_matches
+
+
+@pytest.fixture
+def unified():
+    return {
+        "company_info": pd.DataFrame({"id": [1, 2], "name": ["A", "B"]}),
+        "employee_data": pd.DataFrame({"id": ["E1"], "company_id": [1]}),
+        "company_performance": pd.DataFrame({"company_id": [1], "revenue": [np.nan]}),
+        "membership_activity": pd.DataFrame({"membership_id": ["M1"], "revenue": [1.5]}),
+        "aggregated_performance": pd.DataFrame({"Year": [2024]}),
+        "presentation": {"summary_metrics": {"Total Revenue": 10}}
+    }
+
+
+def test_payload_contains_all_sections(unified):
+    cache = SerializedDataCache(unified)
+    data = json.loads(cache.payload)["data"]
+    assert list(data) == list(unified), "Payload should contain every section in order."
+    assert data["company_performance"][0]["revenue"] is None, "NaN should be encoded as null."
+    assert json.loads(cache.section("company_info")) == data["company_info"]
+
+
+def test_rebuild_changes_etag(unified):
+    cache = SerializedDataCache(unified)
+    etag = cache.etag
+    assert cache.generation == 1
+    cache.rebuild(unified)
+    assert cache.etag == etag, "Unchanged data should keep the same ETag."
+    unified["company_info"] = unified["company_info"].head(1)
+    cache.rebuild(unified)
+    assert cache.etag != etag, "Changed data should produce a new ETag."
+    assert cache.generation == 3
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"def"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_rebuild_only_changed_sections(unified):
+    cache = SerializedDataCache(unified)
+    clone = cache.copy()
+    unified["company_info"] = unified["company_info"].head(1)
+    unified["membership_activity"] = unified["membership_activity"].iloc[0:0]
+    clone.rebuild(unified, changed=["company_info"])
+    assert len(json.loads(clone.section("company_info"))) == 1, "Changed sections should be re-encoded."
+    assert clone.section("membership_activity") == cache.section("membership_activity"), \
+        "Unchanged sections should keep their encoded bytes."
+    assert len(json.loads(cache.section("company_info"))) == 2, "The original cache should be unaffected."
+
+
+def test_encode_frame_handles_missing_values_dates_and_numpy_types(monkeypatch):
+    monkeypatch.setattr(data_serializer, "FRAME_ENCODE_CHUNK_ROWS", 2)
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-02", None, "2024-03-04"]),
+        "when": pd.to_datetime(["2024-01-02 10:30", "2024-01-03 00:00", None]),
+        "year": np.array([2024, 2024, 2023], dtype="int16"),
+        "type": pd.Categorical(["VIP", "Basic", "VIP"]),
+        "revenue": [1.5, np.nan, 3.0],
+        "count": pd.array([1, pd.NA, 3], dtype="Int64"),
+        "nested": [[{"id": "E1"}], [], None],
+    })
+    encoded = json.loads(encode_json({"data": df, "total": np.int64(3)}))
+    assert encoded["total"] == 3
+    assert encoded["data"] == [
+        {"date": "2024-01-02", "when": "2024-01-02T10:30:00", "year": 2024, "type": "VIP",
+         "revenue": 1.5, "count": 1, "nested": [{"id": "E1"}]},
+        {"date": None, "when": "2024-01-03T00:00:00", "year": 2024, "type": "Basic",
+         "revenue": None, "count": None, "nested": []},
+        {"date": "2024-03-04", "when": None, "year": 2023, "type": "VIP",
+         "revenue": 3.0, "count": 3, "nested": None},
+    ], "Rows should survive chunking with NaN/NA/NaT as null and dates as ISO strings."
+    assert encode_json(df.iloc[0:0]) == b"[]"
+
+
+def test_append_rows_matches_full_rebuild(unified):
+    cache = SerializedDataCache(unified)
+    etag, section_etag = cache.etag, cache.section_etag("membership_activity")
+    batches = [pd.DataFrame({"membership_id": [f"M{i}"], "revenue": [float(i)]}) for i in (2, 3)]
+    for rows in batches:
+        cache.append_rows("membership_activity", rows)
+
+    unified["membership_activity"] = pd.concat([unified["membership_activity"]] + batches, ignore_index=True)
+    rebuilt = SerializedDataCache(unified)
+    assert cache.etag != etag
+    assert cache.section_etag("membership_activity") != section_etag
+    assert cache.section("membership_activity") == rebuilt.section("membership_activity")
+    assert cache.payload == rebuilt.payload
+    start, end = cache.section_offsets()["membership_activity"]
+    assert cache.payload[start:end] == rebuilt.section("membership_activity")
+
+
+def test_append_rows_to_empty_section(unified):
+    unified["membership_activity"] = unified["membership_activity"].iloc[0:0]
+    cache = SerializedDataCache(unified)
+    cache.append_rows("membership_activity", pd.DataFrame({"membership_id": ["M1"], "revenue": [1.5]}))
+    assert json.loads(cache.section("membership_activity")) == [{"membership_id": "M1", "revenue": 1.5}]
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import pytest
+import pandas as pd
+from data_cache import ColumnarCache, build_sources, build_unified
+from data_ingestion import DataIngestion
+from data_serializer import encode_json
+from data_sources import MembershipCsvAdapter, SourceAdapter, adapter_for, register_adapter
+
+
+@pytest.fixture
+def split_ingestion(tmp_path):
+    """The sample datasets, with the companies and the membership rows split across several files."""
+    base_path = os.path.join(os.getcwd(), "datasets")
+    with open(os.path.join(base_path, "dataset1.json")) as f:
+        companies = json.load(f)["companies"]
+    for index, company in enumerate(companies):
+        with open(tmp_path / f"companies-{index}.json", "w") as f:
+            json.dump({"companies": [company]}, f)
+    membership = pd.read_csv(os.path.join(base_path, "dataset2.csv"))
+    for index, location in enumerate(sorted(membership["Location"].unique())):
+        membership[membership["Location"] == location].to_csv(tmp_path / f"membership-{index}.csv", index=False)
+    shutil.copy(os.path.join(base_path, "dataset3.pdf"), tmp_path / "report.pdf")
+    shutil.copy(os.path.join(base_path, "dataset4.pptx"), tmp_path / "deck.pptx")
+    return DataIngestion(
+        json_path=str(tmp_path / "companies-*.json"),
+        csv_path=str(tmp_path / "membership-*.csv"),
+        pdf_path=str(tmp_path / "*.pdf"),
+        pptx_path=str(tmp_path / "deck.pptx")
+    )
+
+
+def test_glob_sources_match_single_files(split_ingestion):
+    unified = build_unified(split_ingestion, parallel=False)
+    reference = build_unified(DataIngestion(), parallel=False)
+    assert len(split_ingestion.source_files("csv")) > 1, "The CSV should be split across files."
+    for key in ["company_info", "employee_data", "company_performance", "aggregated_performance"]:
+        pd.testing.assert_frame_equal(unified[key], reference[key])
+    sort = ["date", "membership_id", "activity"]
+    membership = unified["membership_activity"].sort_values(sort, ignore_index=True)
+    expected = reference["membership_activity"].sort_values(sort, ignore_index=True)
+    assert isinstance(membership["location"].dtype, pd.CategoricalDtype), "Categoricals should survive the merge."
+    assert encode_json(membership) == encode_json(expected), "Every membership row should be read once."
+
+    raw = split_ingestion.load_source("json")
+    assert raw == DataIngestion().load_json(), "Raw files of a glob should be combined."
+
+
+def test_changed_file_of_a_glob_invalidates_the_cache(split_ingestion, tmp_path):
+    cache = ColumnarCache(str(tmp_path / "cache"))
+    build_sources(split_ingestion, cache=cache, sources=["csv"], parallel=False)
+    assert build_sources(split_ingestion, cache=cache, sources=["csv"], parallel=False)["csv"]["cached"]
+    with open(tmp_path / "membership-9.csv", "w") as f:
+        f.write("Date,Membership_ID,Membership_Type,Activity,Revenue,Duration (Minutes),Location\n"
+                "2025-04-02,M999,VIP,Gym,50.0,45,Downtown\n")
+    result = build_sources(split_ingestion, cache=cache, sources=["csv"], parallel=False)["csv"]
+    assert not result["cached"], "A new file matching the pattern should be picked up."
+    assert result["data"]["membership_activity"]["membership_id"].iloc[-1] == "M999"
+
+
+def test_registered_adapter_reads_new_format(tmp_path):
+    class MembershipTsvAdapter(MembershipCsvAdapter):
+        extensions = (".tsv",)
+
+        def iter_batches(self, ingestion, path, memory_limit_mb=None):
+            df = pd.read_csv(path, sep="\t")
+            for start in range(0, len(df), 50):
+                yield df.iloc[start:start + 50].copy()
+
+    with pytest.raises(ValueError):
+        adapter_for("csv", str(tmp_path / "rows.tsv"))
+    register_adapter(MembershipTsvAdapter())
+    pd.read_csv(os.path.join("datasets", "dataset2.csv")).to_csv(tmp_path / "rows.tsv", sep="\t", index=False)
+    ingestion = DataIngestion(csv_path=str(tmp_path / "*.tsv"))
+    result = build_sources(ingestion, sources=["csv"], parallel=False)["csv"]
+    expected = build_sources(DataIngestion(), sources=["csv"], parallel=False)["csv"]
+    assert result["ok"], result["error"]
+    assert encode_json(result["data"]["membership_activity"]) == encode_json(expected["data"]["membership_activity"])
+
+
+def test_incomplete_adapter_cannot_be_registered():
+    class IncompleteAdapter(SourceAdapter):
+        source = "csv"
+        extensions = (".txt",)
+
+    with pytest.raises(TypeError):
+        register_adapter(IncompleteAdapter())
@@ -0,0 +1,53 @@
+import pandas as pd
+from data_ingestion import run_source_tasks
+from metrics import Metrics, metrics
+
+
+def make_frame(rows):
+    return pd.DataFrame({"a": range(rows)})
+
+
+def test_stage_records_duration_and_rows():
+    registry = Metrics()
+    load = registry.stage("load")(make_frame)
+    load(3)
+    load(4)
+    text = registry.render()
+    assert 'app_stage_calls_total{stage="load"} 2' in text, "Each call should be counted."
+    assert 'app_stage_rows_total{stage="load"} 7' in text, "Rows of DataFrame results should be summed."
+    assert 'app_stage_last_memory_delta_bytes{stage="load"}' in text
+
+
+def test_disabled_metrics_record_nothing():
+    registry = Metrics(enabled=False)
+    assert registry.stage("load")(make_frame)(3).shape == (3, 1), "The wrapped function should still run."
+    registry.record_request("GET", "/api/data", 200, 0.01, 10)
+    text = registry.render()
+    assert "app_metrics_enabled 0" in text
+    assert 'stage="load"' not in text and "/api/data" not in text, "Nothing should be recorded when disabled."
+
+
+def test_request_histogram_is_cumulative():
+    registry = Metrics()
+    registry.record_request("GET", "/api/data", 200, 0.02, 100)
+    registry.record_request("GET", "/api/data", 304, 0.3, 0)
+    text = registry.render()
+    assert 'app_http_request_duration_seconds_bucket{method="GET",route="/api/data",le="0.025"} 1' in text
+    assert 'app_http_request_duration_seconds_bucket{method="GET",route="/api/data",le="0.5"} 2' in text
+    assert 'app_http_request_duration_seconds_bucket{method="GET",route="/api/data",le="+Inf"} 2' in text
+    assert 'app_http_requests_total{method="GET",route="/api/data",status="304"} 1' in text
+    assert 'app_http_response_size_bytes_sum{method="GET",route="/api/data"} 100' in text
+
+
+def counted_task(rows):
+    return len(metrics.stage("worker_stage")(make_frame)(rows))
+
+
+def test_stages_from_worker_processes_are_merged():
+    metrics.reset()
+    results = run_source_tasks({"a": (counted_task, (2,)), "b": (counted_task, (5,))}, parallel=True)
+    assert all(result["ok"] for result in results.values())
+    assert "stages" not in results["a"], "Captured stage events should not leak into the results."
+    text = metrics.render()
+    assert 'app_stage_calls_total{stage="worker_stage"} 2' in text, "Stages run in workers should be reported."
+    assert 'app_stage_rows_total{stage="worker_stage"} 7' in text
@@ -0,0 +1,63 @@
+import os
+import shutil
+import pytest
+import pandas as pd
+from data_ingestion import DataIngestion
+from data_manager import DataManager
+from data_serializer import encode_json
+from shared_dataset import SharedDatasetStore
+
+
+@pytest.fixture
+def ingestion(tmp_path):
+    base_path = os.path.join(os.getcwd(), "datasets")
+    for name in ["dataset1.json", "dataset2.csv", "dataset3.pdf", "dataset4.pptx"]:
+        shutil.copy(os.path.join(base_path, name), tmp_path / name)
+    return DataIngestion(
+        json_path=str(tmp_path / "dataset1.json"),
+        csv_path=str(tmp_path / "dataset2.csv"),
+        pdf_path=str(tmp_path / "dataset3.pdf"),
+        pptx_path=str(tmp_path / "dataset4.pptx")
+    )
+
+
+def test_workers_attach_to_the_loader_snapshot(ingestion, tmp_path):
+    loader = DataManager(ingestion, shared_store=SharedDatasetStore(str(tmp_path / "shared")))
+    published = loader.load()
+    assert loader.shared_store.is_loader and published.generation == 1
+
+    worker = DataManager(ingestion, shared_store=SharedDatasetStore(str(tmp_path / "shared")))
+    attached = worker.load()
+    assert not worker.shared_store.is_loader, "Only one process should load the sources."
+    assert attached.generation == 1
+    assert isinstance(attached.data_cache.payload, memoryview), "The payload should be read from the memory map."
+    assert bytes(attached.data_cache.payload) == published.data_cache.payload
+    for key, value in published.unified.items():
+        assert encode_json(attached.unified[key]) == encode_json(value), f"'{key}' should match the loader's copy."
+    totals = attached.membership_engine.aggregate(group_by=["location"])
+    assert totals.equals(published.membership_engine.aggregate(group_by=["location"]))
+
+
+def test_changes_build_on_the_latest_generation(ingestion, tmp_path):
+    loader = DataManager(ingestion, shared_store=SharedDatasetStore(str(tmp_path / "shared")))
+    loader.load()
+    worker = DataManager(ingestion, shared_store=SharedDatasetStore(str(tmp_path / "shared")))
+    worker.load()
+
+    rows = pd.DataFrame([{
+        "Date": "2023-11-05", "Membership_ID": "M500", "Membership_Type": "Basic", "Activity": "Gym",
+        "Revenue": 12.5, "Duration (Minutes)": 30, "Location": "Downtown"
+    }])
+    appended = worker.append_membership_rows(rows)
+    assert appended.generation == 2, "Appends should be published as a new generation."
+
+    reloaded = loader.reload(["pdf"])
+    assert reloaded.generation == 3
+    assert reloaded.unified["membership_activity"]["membership_id"].iloc[-1] == "M500", \
+        "A reload should keep rows appended by another process."
+    worker._sync_shared()
+    assert worker.current.generation == 3
+    assert bytes(worker.current.data_cache.payload) == bytes(reloaded.data_cache.payload)
+    assert os.path.samefile(tmp_path / "shared" / "gen-000002" / "company_info.arrow",
+                            tmp_path / "shared" / "gen-000003" / "company_info.arrow"), \
+        "Unchanged sections should be linked, not rewritten."